@@ -1,5 +1,7 @@
+import asyncio
 import logging
-from src.generation.llm_wrapper import OllamaWrapper
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper, AsyncOllamaWrapper
 from src.generation.prompt_templates import get_proposal_template, get_itinerary_template
 
 logger = logging.getLogger(__name__)
@@ -7,9 +9,19 @@ logger = logging.getLogger(__name__)
 class ProposalGenerator:
     """Generates travel proposals based on customer information and relevant packages with enhanced data utilization."""
     
-    def __init__(self, ollama_client=None):
-        """Initialize the proposal generator."""
+    def __init__(self, ollama_client=None, async_ollama_client=None, detail_store=None):
+        """
+        Initialize the proposal generator.
+        
+        Args:
+            ollama_client: Optional OllamaWrapper
+            async_ollama_client: Optional AsyncOllamaWrapper for the async and batch paths
+            detail_store: Optional PackageDetailStore holding the enrichment fields
+                kept out of the package documents
+        """
         self.ollama = ollama_client or OllamaWrapper()
+        self.async_ollama = async_ollama_client
+        self.detail_store = detail_store
     
     def generate_proposal(self, customer_info, packages):
         """
@@ -23,82 +35,209 @@ class ProposalGenerator:
             str: Generated detailed proposal text with day-by-day itinerary
         """
         try:
-            # Extract useful information from packages to inspire the proposal
-            enriched_data = self._extract_enriched_data(packages)
+            itinerary_prompt, system_prompt_itinerary, enriched_data = self._prepare_itinerary_request(customer_info, packages)
             
-            # Use destination from customer info or from packages
-            destination = customer_info.get('destination')
-            if not destination and enriched_data['possible_destinations']:
-                destination = enriched_data['possible_destinations'][0]
-            
-            # If no destination is specified, use a generic one
-            if not destination:
-                destination = "your chosen destination"
+            itinerary = self.ollama.generate(itinerary_prompt, system_prompt_itinerary)
             
-            # Generate detailed itinerary
-            duration_days = 5  # Default to 5 days if not specified
-            if customer_info.get('duration') and customer_info['duration'] not in [None, 'None']:
-                try:
-                    duration_str = customer_info['duration'].lower()
-                    if 'week' in duration_str:
-                        # Extract the number before "week" or "weeks"
-                        week_count = int(''.join(filter(str.isdigit, duration_str.split('week')[0])))
-                        duration_days = week_count * 7  # Convert weeks to days
-                    else:
-                        # Handle days directly
-                        duration_days = int(''.join(filter(str.isdigit, duration_str)))
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"Error parsing duration '{duration_str}': {e}")
+            return self._finalize_itinerary(itinerary, enriched_data)
             
-                
+        except Exception as e:
+            logger.error(f"Error generating proposal: {e}")
+            return self._generate_fallback_proposal(customer_info)
+    
+    async def generate_proposal_async(self, customer_info, packages):
+        """
+        Async variant of generate_proposal that does not block the event loop.
+        
+        Args:
+            customer_info: Dictionary with extracted customer information
+            packages: List of relevant travel packages
             
+        Returns:
+            str: Generated detailed proposal text with day-by-day itinerary
+        """
+        if self.async_ollama is None:
+            self.async_ollama = AsyncOllamaWrapper(self.ollama.config)
+        
+        try:
+            itinerary_prompt, system_prompt_itinerary, enriched_data = await self._prepare_itinerary_request_async(
+                customer_info, packages)
             
-            travel_type = customer_info.get('travel_type') or "vacation"
-            travelers = customer_info.get('travelers') or "2"
-            budget = customer_info.get('budget')
+            itinerary = await self.async_ollama.generate(itinerary_prompt, system_prompt_itinerary)
             
-            # Activities and interests for the itinerary
-            interests = []
-            if customer_info.get('interests'):
-                interests.append(customer_info.get('interests'))
-            if enriched_data['activities']:
-                interests.extend(enriched_data['activities'][:5])  # Add up to 5 activities
-                
-            interests_text = ", ".join(interests) if interests else ""
+            return self._finalize_itinerary(itinerary, enriched_data)
             
-            # Generate the itinerary prompt with additional details
-            itinerary_prompt = get_itinerary_template(
-                destination=destination,
-                travel_type=travel_type,
-                days=duration_days,
-                travelers=travelers,
-                budget=budget,
-                interests=interests_text
-            )
+        except Exception as e:
+            logger.error(f"Error generating proposal: {e}")
+            return self._generate_fallback_proposal(customer_info)
+    
+    def generate_proposal_stream(self, customer_info, packages):
+        """
+        Generate a proposal like generate_proposal, yielding text as it is produced.
+        
+        Email-like formatting is removed line by line, so each yielded chunk is
+        already cleaned and the chunks concatenate to the same text that
+        generate_proposal would return. Unlike generate_proposal, a failure is
+        raised rather than answered with the fallback proposal, so callers never
+        mistake a partial or canned text for a finished one.
+        
+        Args:
+            customer_info: Dictionary with extracted customer information
+            packages: List of relevant travel packages
             
-            # Add enriched information to the prompt in a structured way
-            itinerary_prompt += self._format_enriched_data_for_prompt(destination, enriched_data)
+        Yields:
+            str: Cleaned proposal text fragments
             
-            # Generate the detailed itinerary
-            system_prompt_itinerary = self._get_enhanced_system_prompt(enriched_data)
+        Raises:
+            OllamaStreamError: If generation fails or the stream ends early
+        """
+        try:
+            itinerary_prompt, system_prompt_itinerary, enriched_data = self._prepare_itinerary_request(customer_info, packages)
+            cleaner = _StreamingItineraryCleaner(self)
             
-            itinerary = self.ollama.generate(itinerary_prompt, system_prompt_itinerary)
+            for token in self.ollama.generate_stream(itinerary_prompt, system_prompt_itinerary):
+                chunk = cleaner.feed(token)
+                if chunk:
+                    yield chunk
             
-            # Clean up the itinerary to remove any email-like formatting
-            itinerary = self._clean_itinerary_format(itinerary)
+            chunk = cleaner.flush() + self._format_appendix_suffix(enriched_data)
+            if chunk:
+                yield chunk
+                
+        except Exception as e:
+            logger.error(f"Error streaming proposal: {e}")
+            raise
+    
+    async def generate_proposal_stream_async(self, customer_info, packages):
+        """
+        Async variant of generate_proposal_stream.
+        
+        Args:
+            customer_info: Dictionary with extracted customer information
+            packages: List of relevant travel packages
             
-            # Add additional information sections after the main itinerary
-            enriched_info = self._format_enriched_data_for_appendix(enriched_data)
+        Yields:
+            str: Cleaned proposal text fragments
             
-            # Add the enriched info to the itinerary if available
-            if enriched_info:
-                itinerary += "\n" + enriched_info
+        Raises:
+            OllamaStreamError: If generation fails or the stream ends early
+        """
+        if self.async_ollama is None:
+            self.async_ollama = AsyncOllamaWrapper(self.ollama.config)
+        
+        try:
+            itinerary_prompt, system_prompt_itinerary, enriched_data = await self._prepare_itinerary_request_async(
+                customer_info, packages)
+            cleaner = _StreamingItineraryCleaner(self)
             
-            return itinerary
+            async for token in self.async_ollama.generate_stream(itinerary_prompt, system_prompt_itinerary):
+                chunk = cleaner.feed(token)
+                if chunk:
+                    yield chunk
             
+            chunk = cleaner.flush() + self._format_appendix_suffix(enriched_data)
+            if chunk:
+                yield chunk
+                
         except Exception as e:
-            logger.error(f"Error generating proposal: {e}")
-            return self._generate_fallback_proposal(customer_info)
+            logger.error(f"Error streaming proposal: {e}")
+            raise
+    
+    async def _prepare_itinerary_request_async(self, customer_info, packages):
+        """
+        Async variant of _prepare_itinerary_request.
+        
+        Enrichment is read from the detail store's SQLite file, so with a detail
+        store the request is prepared in a worker thread.
+        """
+        if self.detail_store is None:
+            return self._prepare_itinerary_request(customer_info, packages)
+        return await asyncio.to_thread(self._prepare_itinerary_request, customer_info, packages)
+    
+    def _prepare_itinerary_request(self, customer_info, packages):
+        """
+        Build the itinerary prompt and system prompt for a customer request.
+        
+        Returns:
+            tuple: (itinerary prompt, system prompt, enriched data)
+        """
+        # Extract useful information from packages to inspire the proposal
+        enriched_data = self._extract_enriched_data(packages)
+        
+        # Use destination from customer info or from packages
+        destination = customer_info.get('destination')
+        if not destination and enriched_data['possible_destinations']:
+            destination = enriched_data['possible_destinations'][0]
+        
+        # If no destination is specified, use a generic one
+        if not destination:
+            destination = "your chosen destination"
+        
+        # Generate detailed itinerary
+        duration_days = 5  # Default to 5 days if not specified
+        if customer_info.get('duration') and customer_info['duration'] not in [None, 'None']:
+            try:
+                duration_str = customer_info['duration'].lower()
+                if 'week' in duration_str:
+                    # Extract the number before "week" or "weeks"
+                    week_count = int(''.join(filter(str.isdigit, duration_str.split('week')[0])))
+                    duration_days = week_count * 7  # Convert weeks to days
+                else:
+                    # Handle days directly
+                    duration_days = int(''.join(filter(str.isdigit, duration_str)))
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Error parsing duration '{duration_str}': {e}")
+        
+            
+        
+        
+        travel_type = customer_info.get('travel_type') or "vacation"
+        travelers = customer_info.get('travelers') or "2"
+        budget = customer_info.get('budget')
+        
+        # Activities and interests for the itinerary
+        interests = []
+        if customer_info.get('interests'):
+            interests.append(customer_info.get('interests'))
+        if enriched_data['activities']:
+            interests.extend(enriched_data['activities'][:5])  # Add up to 5 activities
+            
+        interests_text = ", ".join(interests) if interests else ""
+        
+        # Generate the itinerary prompt with additional details
+        itinerary_prompt = get_itinerary_template(
+            destination=destination,
+            travel_type=travel_type,
+            days=duration_days,
+            travelers=travelers,
+            budget=budget,
+            interests=interests_text
+        )
+        
+        # Add enriched information to the prompt in a structured way
+        itinerary_prompt += self._format_enriched_data_for_prompt(destination, enriched_data)
+        
+        # Generate the detailed itinerary
+        system_prompt_itinerary = self._get_enhanced_system_prompt(enriched_data)
+        
+        return itinerary_prompt, system_prompt_itinerary, enriched_data
+    
+    def _finalize_itinerary(self, itinerary, enriched_data):
+        """Clean the generated itinerary and append any enriched information."""
+        # Clean up the itinerary to remove any email-like formatting
+        itinerary = self._clean_itinerary_format(itinerary)
+        
+        # Add additional information sections after the main itinerary
+        return itinerary + self._format_appendix_suffix(enriched_data)
+    
+    def _format_appendix_suffix(self, enriched_data):
+        """Text appended after the itinerary, or an empty string if there is none."""
+        enriched_info = self._format_enriched_data_for_appendix(enriched_data)
+        
+        # Add the enriched info to the itinerary if available
+        if enriched_info:
+            return "\n" + enriched_info
+        return ""
     
     def _extract_enriched_data(self, packages):
         """Extract all enriched data from packages into a structured format."""
@@ -144,9 +283,15 @@ class ProposalGenerator:
                 if not result['price_range'] or package_price < result['price_range']:
                     result['price_range'] = package_price
             
-            # Collect enriched data
-            if package.get('weather_data') and not result['weather_data']:
-                result['weather_data'] = package.get('weather_data')
+            # Collect enriched data, loading only the slices the prompt uses for
+            # packages whose enrichment is kept in the detail store
+            if not result['weather_data']:
+                if package.get('weather_data'):
+                    result['weather_data'] = package.get('weather_data')
+                else:
+                    daily = self._load_detail(package, 'weather_data', '$.daily')
+                    if daily:
+                        result['weather_data'] = {'daily': daily}
                 
             if package.get('country') and package.get('country') != "Unknown" and not result['country_info']:
                 result['country_info'] = {
@@ -154,8 +299,10 @@ class ProposalGenerator:
                     'continent': package.get('continent', 'Unknown')
                 }
                     
-            if package.get('local_info') and not result['country_info']:
-                local_info = package.get('local_info')
+            local_info = package.get('local_info')
+            if not local_info and not result['country_info']:
+                local_info = self._load_detail(package, 'local_info')
+            if local_info and not result['country_info']:
                 result['country_info'] = {
                     'capital': local_info.get('capital', 'Unknown'),
                     'currency': local_info.get('currency', 'Unknown'),
@@ -179,8 +326,15 @@ class ProposalGenerator:
                 result['has_city'] = True
                             
             # Get destination guide information
-            if package.get('destination_guide') and not result['destination_guide']:
-                result['destination_guide'] = package.get('destination_guide')
+            if not result['destination_guide']:
+                if package.get('destination_guide'):
+                    result['destination_guide'] = package.get('destination_guide')
+                else:
+                    # One character past the excerpt, so the prompt still marks the cut
+                    extract = self._load_detail(package, 'destination_guide', '$.extract',
+                                                max_chars=Config.PACKAGE_DETAILS["guide_excerpt_chars"] + 1)
+                    if extract is not None:
+                        result['destination_guide'] = {'extract': extract}
                 
             # Get highlights
             if package.get('highlights') and isinstance(package.get('highlights'), list):
@@ -190,6 +344,23 @@ class ProposalGenerator:
         
         return result
     
+    def _load_detail(self, package, field, path="$", max_chars=None):
+        """
+        Load part of an enrichment field kept out of a package document.
+        
+        Args:
+            package: Package document
+            field: Field name, e.g. "weather_data"
+            path: JSON path of the part to load
+            max_chars: Optional length limit for string values
+            
+        Returns:
+            The value at path, or None if there is no detail store or value
+        """
+        if self.detail_store is None or not package.get('id'):
+            return None
+        return self.detail_store.get_slice(package['id'], field, path, max_chars)
+    
     def _format_enriched_data_for_prompt(self, destination, enriched_data):
         """Format enriched data as additional sections for the itinerary prompt."""
         prompt_additions = "\n\n# Additional Information for Planning\n"
@@ -280,7 +451,8 @@ class ProposalGenerator:
         # Add destination guide excerpt if available
         if enriched_data['destination_guide'] and isinstance(enriched_data['destination_guide'], dict) and 'extract' in enriched_data['destination_guide']:
             # Use just a brief excerpt to avoid overwhelming the LLM
-            excerpt = enriched_data['destination_guide']['extract'][:500] + "..." if len(enriched_data['destination_guide']['extract']) > 500 else enriched_data['destination_guide']['extract']
+            excerpt_chars = Config.PACKAGE_DETAILS["guide_excerpt_chars"]
+            excerpt = enriched_data['destination_guide']['extract'][:excerpt_chars] + "..." if len(enriched_data['destination_guide']['extract']) > excerpt_chars else enriched_data['destination_guide']['extract']
             prompt_additions += f"\n## Travel Guide Information\n{excerpt}\n"
             
         return prompt_additions
@@ -317,20 +489,33 @@ class ProposalGenerator:
         skip_line = False
         
         for line in lines:
-            # Skip common email greeting patterns
-            if any(greeting in line.lower() for greeting in ['dear', 'hello', 'hi ', 'greetings', 'thank you', 'regards', 'sincerely']):
-                skip_line = True
-                continue
-                
-            # If we were skipping lines and found a meaningful header, start including again
-            if skip_line and (line.startswith('#') or line.startswith('## ')):
-                skip_line = False
-                
-            if not skip_line:
+            keep, skip_line = self._filter_itinerary_line(line, skip_line)
+            if keep:
                 cleaned_lines.append(line)
                 
         return '\n'.join(cleaned_lines)
     
+    def _filter_itinerary_line(self, line, skip_line):
+        """
+        Decide whether one itinerary line survives email-format cleaning.
+        
+        Args:
+            line: A single line of the itinerary
+            skip_line: Whether the previous lines were being skipped
+            
+        Returns:
+            tuple: (keep this line, skip state for the next line)
+        """
+        # Skip common email greeting patterns
+        if any(greeting in line.lower() for greeting in ['dear', 'hello', 'hi ', 'greetings', 'thank you', 'regards', 'sincerely']):
+            return False, True
+            
+        # If we were skipping lines and found a meaningful header, start including again
+        if skip_line and (line.startswith('#') or line.startswith('## ')):
+            skip_line = False
+            
+        return not skip_line, skip_line
+    
     def _generate_fallback_proposal(self, customer_info):
         """
         Generate a simple fallback proposal if the main generation fails.
@@ -358,4 +543,38 @@ class ProposalGenerator:
         - Estimated costs
         
         Your complete itinerary will be ready shortly.
-        """
\ No newline at end of file
+        """
+
+
+class _StreamingItineraryCleaner:
+    """Applies ProposalGenerator._clean_itinerary_format to a stream of tokens, one line at a time."""
+    
+    def __init__(self, generator):
+        self.generator = generator
+        self.buffer = ""
+        self.skip_line = False
+        self.emitted_line = False
+    
+    def feed(self, text):
+        """Add generated text and return the cleaned output for every completed line."""
+        self.buffer += text
+        if '\n' not in self.buffer:
+            return ""
+        
+        *lines, self.buffer = self.buffer.split('\n')
+        return ''.join(self._emit(line) for line in lines)
+    
+    def flush(self):
+        """Return the cleaned output for the final, unterminated line."""
+        line, self.buffer = self.buffer, ""
+        return self._emit(line)
+    
+    def _emit(self, line):
+        keep, self.skip_line = self.generator._filter_itinerary_line(line, self.skip_line)
+        if not keep:
+            return ""
+        
+        # Lines are joined with newlines, matching '\n'.join in _clean_itinerary_format
+        prefix = '\n' if self.emitted_line else ''
+        self.emitted_line = True
+        return prefix + line
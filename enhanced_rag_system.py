@@ -21,6 +21,7 @@ sys.path.append(str(project_dir))
 
 # Import standard components
 from src.email_processing.extractor import EmailExtractor
+from src.email_processing.rule_extractor import build_gazetteer
 from src.generation.llm_wrapper import OllamaWrapper
 
 # Import enhanced components
@@ -65,7 +66,8 @@ class EnhancedTravelRAG:
         self.extractor = EmailExtractor(ollama_client=self.ollama)
         
         # Initialize enhanced proposal generator
-        self.proposal_generator = ProposalGenerator(ollama_client=self.ollama)
+        self.proposal_generator = ProposalGenerator(ollama_client=self.ollama,
+                                                   detail_store=self.vector_store.detail_store)
         
         # Initialize caching
         self.response_cache = ResponseCache(
@@ -112,6 +114,9 @@ class EnhancedTravelRAG:
                 
             logger.info(f"Loaded {len(raw_packages)} packages from {packages_path}")
             
+            # Let the extractor recognize catalog destinations without the LLM
+            self.extractor.set_known_destinations(build_gazetteer(raw_packages))
+            
             # Standardize packages
             self.packages = standardize_packages(raw_packages)
             logger.info(f"Standardized {len(self.packages)} packages")
@@ -366,7 +371,7 @@ class EnhancedTravelRAG:
             'response_cache': self.response_cache.get_statistics(),
             'destination_cache': {
                 'destinations': self.destination_cache.get_all_destinations(),
-                'count': len(self.destination_cache.destinations)
+                'count': len(self.destination_cache)
             },
             'packages': {
                 'total': len(self.packages),
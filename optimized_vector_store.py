@@ -3,6 +3,7 @@ import pickle
 import numpy as np
 import logging
 import time
+import threading
 from pathlib import Path
 import faiss
 from typing import List, Dict, Tuple, Optional, Any, Union
@@ -10,36 +11,66 @@ import hashlib
 import json
 
 from src.config import Config
-from src.generation.llm_wrapper import OllamaWrapper
+from src.generation.llm_wrapper import OllamaWrapper, AsyncOllamaWrapper
+from src.knowledge_base.index_io import save_index_files, load_index_files
+from src.knowledge_base.index_factory import build_id_index, search_parameters, normalize_vectors, uses_inner_product
+from src.knowledge_base.metadata_filter import MetadataColumns
+from src.knowledge_base.package_details import PackageDetailStore, details_path, split_package
+from src.knowledge_base.sparse_index import BM25Index
+from src.knowledge_base.embedding_cache import QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 class OptimizedVectorStore:
     """Vector store with incremental updates and performance optimizations."""
     
-    def __init__(self, store_path=None, embedding_dimension=None, ollama_client=None):
+    def __init__(self, store_path=None, embedding_dimension=None, ollama_client=None, async_ollama_client=None,
+                 index_config=None, retrieval_config=None, detail_store=None):
         """Initialize the vector store."""
         self.store_path = store_path or Config.VECTOR_STORE_PATH
+        self.index_config = index_config or Config.VECTOR_INDEX
+        self.retrieval_config = retrieval_config or Config.RETRIEVAL
         self.embedder = ollama_client or OllamaWrapper()
+        self.async_embedder = async_ollama_client
         self.embedding_dimension = embedding_dimension or Config.EMBEDDING_DIMENSION
         
         # Core data structures
         self.index = None
         self.documents = []
         self.document_hashes = {}  # Track document hashes to detect changes
-        self.document_ids = {}     # Map document IDs to their positions in the vectors list
-        self.vectors = []
+        self.document_ids = {}     # Map document IDs to their positions in the vectors matrix
+        self.vectors = np.zeros((0, self.embedding_dimension), dtype=np.float32)
+        
+        # Stable int64 FAISS ids: one per row, never reused after a vector is removed
+        self.labels = np.zeros(0, dtype=np.int64)
+        self.label_rows = {}       # Map live FAISS ids to rows; ids missing here are dead
+        self.next_label = 0
+        self.stale_labels = 0      # Dead ids still in an index that cannot delete them
+        
+        # Filterable metadata (continent, country, price, duration, tags), one row per vector
+        self.metadata = MetadataColumns()
+        
+        # BM25 keyword index over the embedded text of each document, keyed by FAISS id
+        self.sparse_index = self._new_sparse_index()
+        
+        # Guards index and storage changes against concurrent searches and compaction
+        self._lock = threading.RLock()
+        self._compaction_thread = None
         
         # Metadata
         self.last_updated = None
         self.last_rebuild = None
+        self.last_compaction = None
         self.update_count = 0
-        self.cache_hits = 0
-        self.cache_misses = 0
         
-        # Embedding cache to avoid redundant embeddings
-        self.embedding_cache = {}
-        self.cache_max_size = 1000  # Maximum number of items in cache
+        # Recent query embeddings, so repeated queries skip the embedding call
+        self.query_cache = QueryEmbeddingCache(
+            max_size=Config.QUERY_EMBEDDING_CACHE.get("max_size", 1024),
+            ttl_seconds=Config.QUERY_EMBEDDING_CACHE.get("ttl_seconds", 3600)
+        )
+        
+        # Bulky enrichment fields (destination guides, weather, local info), kept out of self.documents
+        self.detail_store = detail_store or PackageDetailStore(details_path(self.store_path))
         
         # Load if store exists
         self.load()
@@ -74,53 +105,43 @@ class OptimizedVectorStore:
         Returns:
             Tuple of (embedding vector, text representation)
         """
-        # Generate text if not provided
-        if text is None:
-            text = self.generate_text_representation(document)
-        
-        # Create hash for the text
-        text_hash = self.text_to_hash(text)
-        
-        # Check cache
-        if text_hash in self.embedding_cache:
-            self.cache_hits += 1
-            return self.embedding_cache[text_hash], text
-        
-        # Generate embedding
-        self.cache_misses += 1
-        embedding = self.embedder.get_embeddings(text)
+        embeddings, texts = self.get_document_embeddings([document], [text])
+        return embeddings[0], texts[0]
+    
+    def get_document_embeddings(self, documents: List[Dict], 
+                                texts: Optional[List[Optional[str]]] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get embeddings for several documents in one batch.
         
-        # Convert to numpy array if it's a list
-        if isinstance(embedding, list):
-            embedding = np.array(embedding)
+        Unchanged texts are served by the embedder's persistent embedding cache,
+        so only new or edited documents reach Ollama.
         
-        # Ensure correct dimension
-        if embedding.shape[0] != self.embedding_dimension:
-            if embedding.shape[0] > self.embedding_dimension:
-                embedding = embedding[:self.embedding_dimension]
-            else:
-                padding = np.zeros(self.embedding_dimension - embedding.shape[0])
-                embedding = np.concatenate([embedding, padding])
+        Args:
+            documents: Documents to embed
+            texts: Optional pre-generated text representations (entries may be None)
             
-            # Normalize
-            norm = np.linalg.norm(embedding)
-            if norm > 0:
-                embedding = embedding / norm
+        Returns:
+            Tuple of (float32 matrix with one row per document, text representations)
+        """
+        # Generate any missing text representations
+        texts = [
+            texts[i] if texts and i < len(texts) and texts[i] is not None
+            else self.generate_text_representation(document)
+            for i, document in enumerate(documents)
+        ]
         
-        # Store in cache (manage cache size)
-        if len(self.embedding_cache) >= self.cache_max_size:
-            # Remove a random item when cache is full
-            try:
-                random_key = next(iter(self.embedding_cache))
-                del self.embedding_cache[random_key]
-            except:
-                # If iteration fails, just clear a portion of the cache
-                keys = list(self.embedding_cache.keys())[:100]
-                for key in keys:
-                    del self.embedding_cache[key]
+        if not texts:
+            return np.zeros((0, self.embedding_dimension), dtype=np.float32), texts
+        
+        # Already fitted to Config.EMBEDDING_DIMENSION by the embedder
+        embeddings = self.embedder.embed_batch(texts)
+        if embeddings.shape[1] != self.embedding_dimension:
+            embeddings = np.stack([
+                self.embedder._fit_dimension(vector, self.embedding_dimension)
+                for vector in embeddings
+            ])
         
-        self.embedding_cache[text_hash] = embedding
-        return embedding, text
+        return embeddings, texts
     
     def generate_text_representation(self, document: Dict) -> str:
         """Generate a text representation of a document for embedding."""
@@ -193,12 +214,9 @@ class OptimizedVectorStore:
                 logger.warning("No documents to add")
                 return True
                 
-            # Track new and updated documents
-            new_vectors = []
-            new_documents = []
-            updated_indices = []
-            
-            # Process each document
+            # First pass: work out which documents are new or changed
+            pending = []  # (document, doc_id, doc_hash, text)
+            details = {}  # doc_id -> enrichment fields moved to the detail store
             for i, document in enumerate(documents):
                 # Get document ID
                 doc_id = document.get('id', None)
@@ -207,6 +225,11 @@ class OptimizedVectorStore:
                     doc_id = str(hash(document.get('name', '') + document.get('location', '')))
                     document['id'] = doc_id
                 
+                # Keep only the hot record; enrichment fields are stored apart
+                document, cold = split_package(document)
+                if cold:
+                    details[doc_id] = cold
+                
                 # Get document hash to detect changes
                 doc_hash = self.document_to_hash(document)
                 
@@ -215,39 +238,51 @@ class OptimizedVectorStore:
                 if texts and i < len(texts):
                     text = texts[i]
                 
-                # Check if document exists and has changed
-                if doc_id in self.document_ids:
-                    index_position = self.document_ids[doc_id]
-                    
-                    # Check if document has changed
-                    if self.document_hashes.get(doc_id) != doc_hash:
-                        # Document has changed, update it
-                        embedding, text = self.get_document_embedding(document, text)
-                        
-                        # Track for FAISS index update
-                        updated_indices.append((index_position, embedding))
-                        
-                        # Update documents and vectors
-                        self.documents[index_position] = document
-                        self.vectors[index_position] = embedding
-                        self.document_hashes[doc_id] = doc_hash
-                    # If unchanged, do nothing
-                else:
-                    # New document, add it
-                    embedding, text = self.get_document_embedding(document, text)
-                    
-                    # Track for batch addition
-                    new_vectors.append(embedding)
-                    new_documents.append(document)
-                    
-                    # Add to mappings
-                    new_position = len(self.vectors) + len(new_vectors) - 1
-                    self.document_ids[doc_id] = new_position
-                    self.document_hashes[doc_id] = doc_hash
+                # Only re-embed existing documents that have changed
+                if doc_id not in self.document_ids or self.document_hashes.get(doc_id) != doc_hash:
+                    pending.append((document, doc_id, doc_hash, text))
+            
+            # Enrichment is refreshed even for documents whose embedded fields are unchanged
+            self.detail_store.put_many(details)
+            
+            if not pending:
+                return True
+            
+            # Embed everything that needs it in one batch, normalized once so the
+            # inner product index scores by cosine similarity
+            embeddings, pending_texts = self.get_document_embeddings(
+                [item[0] for item in pending],
+                [item[3] for item in pending]
+            )
+            embeddings = normalize_vectors(embeddings)
             
-            # Apply updates
-            if new_documents or updated_indices:
-                self._apply_updates(new_documents, new_vectors, updated_indices)
+            with self._lock:
+                # Second pass: apply embeddings to new and updated documents. Rows are
+                # looked up again here since a compaction may have moved them.
+                new_documents = []
+                new_vectors = []
+                updated_rows = {}  # row -> new embedding
+                row_texts = {}     # row -> embedded text, indexed for keyword search
+                for (document, doc_id, doc_hash, _), embedding, text in zip(pending, embeddings, pending_texts):
+                    row = self.document_ids.get(doc_id)
+                    if row is None:
+                        # Track for batch addition
+                        row = len(self.documents) + len(new_documents)
+                        self.document_ids[doc_id] = row
+                        new_documents.append(document)
+                        new_vectors.append(embedding)
+                    elif row >= len(self.documents):
+                        # Duplicate id within this batch: keep the last occurrence
+                        new_documents[row - len(self.documents)] = document
+                        new_vectors[row - len(self.documents)] = embedding
+                    else:
+                        # Update documents (vectors are written in _apply_updates)
+                        self.documents[row] = document
+                        updated_rows[row] = embedding
+                    row_texts[row] = text
+                    self.document_hashes[doc_id] = doc_hash
+                
+                self._apply_updates(new_documents, new_vectors, updated_rows, row_texts)
                 
                 # Track update metadata
                 self.last_updated = time.time()
@@ -255,137 +290,663 @@ class OptimizedVectorStore:
                 
                 # Save the updated store
                 self.save()
-                
+            
+            self._schedule_compaction()
             return True
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             return False
     
-    def _apply_updates(self, new_documents, new_vectors, updated_indices):
-        """Apply incremental updates to the vector store."""
-        # 1. Extend documents and vectors with new items
+    def _apply_updates(self, new_documents, new_vectors, updated_rows, row_texts=None):
+        """
+        Apply incremental updates to the vector store.
+        
+        Changed and new vectors get fresh ids; the old ids of changed vectors are
+        removed from the index, so the cost is proportional to what changed.
+        
+        Args:
+            new_documents: Documents to append
+            new_vectors: Normalized embeddings of the new documents
+            updated_rows: Dict of row -> normalized embedding for changed documents
+            row_texts: Optional dict of row -> embedded text for the keyword index
+        """
+        # 1. Write changed vectors, copying first if they are memory-mapped read-only
+        if updated_rows and not self.vectors.flags.writeable:
+            self.vectors = np.array(self.vectors)
+        
+        old_labels = []
+        for row, embedding in updated_rows.items():
+            self.vectors[row] = embedding
+            old_labels.append(int(self.labels[row]))
+            del self.label_rows[old_labels[-1]]
+        
+        # 2. Extend documents, vectors, labels and metadata columns with new items
+        first_new_row = len(self.documents)
+        self.metadata.set_rows(list(updated_rows), [self.documents[row] for row in updated_rows])
+        self.metadata.append(new_documents)
         self.documents.extend(new_documents)
-        self.vectors.extend(new_vectors)
+        if new_vectors:
+            self.vectors = np.vstack([self.vectors, np.asarray(new_vectors, dtype=np.float32)])
+            self.labels = np.concatenate([self.labels, np.zeros(len(new_vectors), dtype=np.int64)])
         
-        # 2. Create or update the FAISS index
-        if self.index is None or self.update_count % 10 == 0 or len(updated_indices) > 10:
-            # Complete rebuild (more efficient with many changes)
+        # 3. Give every changed and new vector a fresh id
+        rows = np.array(list(updated_rows) + list(range(first_new_row, len(self.documents))), dtype=np.int64)
+        new_labels = np.arange(self.next_label, self.next_label + len(rows), dtype=np.int64)
+        self.next_label += len(rows)
+        if not self.labels.flags.writeable:
+            self.labels = np.array(self.labels)
+        self.labels[rows] = new_labels
+        self.label_rows.update(zip(new_labels.tolist(), rows.tolist()))
+        
+        # 4. Re-index the same texts for keyword search under the new ids
+        for label in old_labels:
+            self.sparse_index.remove(label)
+        for row, label in zip(rows.tolist(), new_labels.tolist()):
+            text = (row_texts or {}).get(row)
+            self.sparse_index.add(label, text if text is not None else self.generate_text_representation(self.documents[row]))
+        
+        # 5. Create or update the FAISS index
+        if self.index is None:
             self._rebuild_index()
-            self.last_rebuild = time.time()
         else:
-            # Incremental update
             try:
-                # Add new vectors to the index
-                if new_vectors:
-                    vectors_np = np.array(new_vectors).astype('float32')
-                    self.index.add(vectors_np)
-                
-                # Update changed vectors in the index
-                for idx, embedding in updated_indices:
-                    # FAISS doesn't support direct updates, we need to remove and re-add
-                    # But we can't remove individual vectors, so we just update in our vectors list
-                    # and will periodically rebuild the whole index
-                    self.vectors[idx] = embedding
+                self._remove_labels(old_labels)
+                self.index.add_with_ids(np.ascontiguousarray(self.vectors[rows]), new_labels)
             except Exception as e:
-                logger.error(f"Error in incremental update, falling back to rebuild: {e}")
+                # Memory-mapped IVF indexes keep read-only inverted lists; the rebuilt one is in memory
+                logger.warning(f"Could not update FAISS index in place, rebuilding it: {e}")
                 self._rebuild_index()
-                self.last_rebuild = time.time()
         
         # Log update stats
-        logger.info(f"Updated vector store: {len(new_documents)} new documents, {len(updated_indices)} updated documents")
+        logger.info(f"Updated vector store: {len(new_documents)} new documents, {len(updated_rows)} updated documents")
+    
+    def _remove_labels(self, labels):
+        """Remove ids from the FAISS index, remembering any the index type cannot delete."""
+        if not labels:
+            return
         
+        try:
+            self.index.remove_ids(np.asarray(labels, dtype=np.int64))
+        except RuntimeError:
+            # HNSW cannot delete vectors; the ids no longer map to a row, so searches
+            # skip them until the next compaction rebuilds the index
+            self.stale_labels += len(labels)
+    
     def _rebuild_index(self):
-        """Rebuild the FAISS index from all vectors."""
-        if not self.vectors:
+        """Rebuild the FAISS index from the vectors of all live documents."""
+        live_rows = [row for row, document in enumerate(self.documents) if document is not None]
+        if not live_rows:
             logger.warning("No vectors available for index rebuild")
+            self.index = None
+            self.stale_labels = 0
             return
             
         try:
-            # Convert all vectors to numpy array
-            vectors_np = np.array(self.vectors).astype('float32')
-            
-            # Create a new FAISS index
-            self.index = faiss.IndexFlatL2(self.embedding_dimension)
-            
-            # Add all vectors
-            self.index.add(vectors_np)
+            # Create, train (for IVF types) and fill a new inner product index of the configured type
+            self.index = build_id_index(self.vectors[live_rows], self.labels[live_rows], self.embedding_dimension,
+                                        self.index_config, metric=faiss.METRIC_INNER_PRODUCT)
+            self.stale_labels = 0
+            self.last_rebuild = time.time()
             
-            logger.info(f"Rebuilt FAISS index with {len(self.vectors)} vectors")
+            logger.info(f"Rebuilt {self.index_config.get('type', 'flat')} FAISS index with {len(live_rows)} vectors")
         except Exception as e:
             logger.error(f"Error rebuilding FAISS index: {e}")
             self.index = None
     
-    def similarity_search(self, query: str, k: int = 5, filter_fn=None) -> List[Tuple[Dict, float]]:
+    def _new_sparse_index(self):
+        """Create an empty BM25 index with the configured parameters."""
+        return BM25Index(k1=self.retrieval_config.get("bm25_k1", 1.2), b=self.retrieval_config.get("bm25_b", 0.75))
+    
+    def _rebuild_sparse_index(self):
+        """Rebuild the BM25 index from the text representations of all live documents."""
+        self.sparse_index = self._new_sparse_index()
+        for label, row in self.label_rows.items():
+            self.sparse_index.add(label, self.generate_text_representation(self.documents[row]))
+    
+    def compact(self):
+        """
+        Drop removed documents from storage and purge dead ids from the index.
+        
+        Rows are renumbered but FAISS ids are not, so the index only needs a
+        rebuild when it holds ids it could not delete (HNSW).
+        """
+        with self._lock:
+            live_rows = [row for row, document in enumerate(self.documents) if document is not None]
+            
+            if len(live_rows) < len(self.documents):
+                new_rows = {old_row: new_row for new_row, old_row in enumerate(live_rows)}
+                self.documents = [self.documents[row] for row in live_rows]
+                self.vectors = np.ascontiguousarray(self.vectors[live_rows])
+                self.labels = np.ascontiguousarray(self.labels[live_rows])
+                self.metadata = self.metadata.take(live_rows)
+                self.document_ids = {doc_id: new_rows[row] for doc_id, row in self.document_ids.items()}
+                self.label_rows = {int(label): row for row, label in enumerate(self.labels)}
+            
+            if self.stale_labels:
+                self._rebuild_index()
+            
+            self.last_compaction = time.time()
+            logger.info(f"Compacted vector store to {len(self.documents)} documents")
+    
+    def _needs_compaction(self):
+        """Check whether removed rows and dead ids exceed the configured fraction of the store."""
+        dead = (len(self.documents) - len(self.label_rows)) + self.stale_labels
+        threshold = self.index_config.get("compaction_threshold", 0.2)
+        return dead > 0 and dead > threshold * max(len(self.label_rows), 1)
+    
+    def _schedule_compaction(self):
+        """Compact in a background thread once enough has been removed or replaced."""
+        if not self._needs_compaction():
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+    
+    def similarity_search(self, query: str, k: int = 5, filter_fn=None,
+                          ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                          min_score: Optional[float] = None,
+                          filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
         """
         Search for similar documents with optional filtering.
         
         Args:
             query: The query text
             k: Number of results to return
-            filter_fn: Optional function to filter results
+            filter_fn: Optional function to filter results (applied after the search)
+            ef_search: Optional HNSW efSearch for this query (higher = better recall, slower)
+            nprobe: Optional number of IVF cells to visit for this query
+            min_score: Optional minimum cosine similarity; weaker matches are dropped
+            filters: Optional metadata filter applied inside the search, e.g.
+                {"continent": "Asia", "price_amount": {"lt": 1500}} (see MetadataColumns)
             
         Returns:
-            List of (document, score) tuples
+            List of (document, cosine similarity) tuples, best first
         """
-        if not self.vectors or not self.index:
+        if not self.label_rows or self.index is None:
             logger.warning("Vector store is empty or index not built")
             return []
         
         try:
             # Get query embedding
-            query_embedding = self.embedder.get_embeddings(query)
-            query_np = np.array([query_embedding]).astype('float32')
-            
-            # Search the index
-            distances, indices = self.index.search(query_np, min(len(self.vectors), k*2))  # Get more for filtering
-            
-            # Process results
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.documents):
-                    doc = self.documents[idx]
-                    
-                    # Apply filter if provided
-                    if filter_fn and not filter_fn(doc):
-                        continue
-                    
-                    # Calculate similarity score (1 - normalized distance)
-                    similarity = 1.0 - min(1.0, distances[0][i] / max(distances[0]) if max(distances[0]) > 0 else 0)
-                    results.append((doc, similarity))
-            
-            # Sort by similarity (highest first)
-            results.sort(key=lambda x: x[1], reverse=True)
+            query_embedding = self._embed_query(query)
+            return self._search_by_embedding(query_embedding, k, filter_fn, ef_search, nprobe, min_score, filters)
+        except Exception as e:
+            logger.error(f"Error in similarity search: {e}")
+            return []
+    
+    async def similarity_search_async(self, query: str, k: int = 5, filter_fn=None,
+                                      ef_search: Optional[int] = None,
+                                      nprobe: Optional[int] = None,
+                                      min_score: Optional[float] = None,
+                                      filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+        """
+        Async variant of similarity_search; only the query embedding call is awaited.
+        
+        Args:
+            query: The query text
+            k: Number of results to return
+            filter_fn: Optional function to filter results (applied after the search)
+            ef_search: Optional HNSW efSearch for this query
+            nprobe: Optional number of IVF cells to visit for this query
+            min_score: Optional minimum cosine similarity; weaker matches are dropped
+            filters: Optional metadata filter applied inside the search, e.g.
+                {"continent": "Asia", "price_amount": {"lt": 1500}} (see MetadataColumns)
             
-            # Return only requested number after filtering
-            return results[:k]
+        Returns:
+            List of (document, cosine similarity) tuples, best first
+        """
+        if not self.label_rows or self.index is None:
+            logger.warning("Vector store is empty or index not built")
+            return []
+        
+        if self.async_embedder is None:
+            self.async_embedder = AsyncOllamaWrapper(self.embedder.config)
+        
+        try:
+            # Get query embedding
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is None:
+                query_embedding = (await self.async_embedder.embed_batch([query]))[0]
+                self.query_cache.put(query, query_embedding)
+            return self._search_by_embedding(query_embedding, k, filter_fn, ef_search, nprobe, min_score, filters)
         except Exception as e:
             logger.error(f"Error in similarity search: {e}")
             return []
     
+    def batch_similarity_search(self, queries: List[str], k: int = 5, filter_fn=None,
+                                ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                min_score: Optional[float] = None,
+                                filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """
+        Search for several queries at once.
+        
+        All queries are embedded in one batched call and searched with a single
+        FAISS call over the Q x d query matrix.
+        
+        Args:
+            queries: The query texts
+            k: Number of results to return per query
+            filter_fn: Optional function to filter results (applied after the search)
+            ef_search: Optional HNSW efSearch for these queries
+            nprobe: Optional number of IVF cells to visit for these queries
+            min_score: Optional minimum cosine similarity; weaker matches are dropped
+            filters: Optional metadata filter applied inside the search, e.g.
+                {"continent": "Asia", "price_amount": {"lt": 1500}} (see MetadataColumns)
+            
+        Returns:
+            One list of (document, cosine similarity) tuples per query, in query order
+        """
+        if not queries:
+            return []
+        
+        if not self.label_rows or self.index is None:
+            logger.warning("Vector store is empty or index not built")
+            return [[] for _ in queries]
+        
+        try:
+            query_embeddings = self._embed_queries(list(queries))
+            return self._search_by_embeddings(query_embeddings, k, filter_fn, ef_search, nprobe, min_score, filters)
+        except Exception as e:
+            logger.error(f"Error in batch similarity search: {e}")
+            return [[] for _ in queries]
+    
+    async def batch_similarity_search_async(self, queries: List[str], k: int = 5, filter_fn=None,
+                                            ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                            min_score: Optional[float] = None,
+                                            filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """
+        Async variant of batch_similarity_search; only the batched embedding call is awaited.
+        
+        Args:
+            queries: The query texts
+            k: Number of results to return per query
+            filter_fn: Optional function to filter results (applied after the search)
+            ef_search: Optional HNSW efSearch for these queries
+            nprobe: Optional number of IVF cells to visit for these queries
+            min_score: Optional minimum cosine similarity; weaker matches are dropped
+            filters: Optional metadata filter applied inside the search, e.g.
+                {"continent": "Asia", "price_amount": {"lt": 1500}} (see MetadataColumns)
+            
+        Returns:
+            One list of (document, cosine similarity) tuples per query, in query order
+        """
+        if not queries:
+            return []
+        
+        if not self.label_rows or self.index is None:
+            logger.warning("Vector store is empty or index not built")
+            return [[] for _ in queries]
+        
+        try:
+            query_embeddings = await self._embed_queries_async(list(queries))
+            return self._search_by_embeddings(query_embeddings, k, filter_fn, ef_search, nprobe, min_score, filters)
+        except Exception as e:
+            logger.error(f"Error in batch similarity search: {e}")
+            return [[] for _ in queries]
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, using the query embedding cache when possible."""
+        return self._embed_queries([query])[0]
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries, sending only those missing from the query cache in one batch."""
+        embeddings = np.zeros((len(queries), self.embedding_dimension), dtype=np.float32)
+        
+        missing = []
+        for i, query in enumerate(queries):
+            cached = self.query_cache.get(query)
+            if cached is None:
+                missing.append(i)
+            else:
+                embeddings[i] = cached
+        
+        if missing:
+            new_embeddings = self.embedder.embed_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                self.query_cache.put(queries[i], embedding)
+        
+        return embeddings
+    
+    async def _embed_queries_async(self, queries: List[str]) -> np.ndarray:
+        """Async variant of _embed_queries."""
+        if self.async_embedder is None:
+            self.async_embedder = AsyncOllamaWrapper(self.embedder.config)
+        
+        embeddings = np.zeros((len(queries), self.embedding_dimension), dtype=np.float32)
+        
+        missing = []
+        for i, query in enumerate(queries):
+            cached = self.query_cache.get(query)
+            if cached is None:
+                missing.append(i)
+            else:
+                embeddings[i] = cached
+        
+        if missing:
+            new_embeddings = await self.async_embedder.embed_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                self.query_cache.put(queries[i], embedding)
+        
+        return embeddings
+    
+    def keyword_search(self, query: str, k: int = 5, filter_fn=None,
+                       filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+        """
+        Search documents by keywords with BM25, without embedding the query.
+        
+        Args:
+            query: The query text
+            k: Number of results to return
+            filter_fn: Optional function to filter results
+            filters: Optional metadata filter, e.g. {"continent": "Asia"} (see MetadataColumns)
+            
+        Returns:
+            List of (document, BM25 score) tuples, best first
+        """
+        try:
+            with self._lock:
+                mask = self.metadata.mask(filters) if filters else None
+                # Without filters the top k hits are final; otherwise rank every match
+                hits = self.sparse_index.search(query, k=None if (mask is not None or filter_fn) else k)
+                
+                results = []
+                for label, score in hits:
+                    row = self.label_rows.get(label)
+                    if row is None or (mask is not None and not mask[row]):
+                        continue
+                    doc = self.documents[row]
+                    if filter_fn and not filter_fn(doc):
+                        continue
+                    results.append((doc, score))
+                    if len(results) == k:
+                        break
+                return results
+        except Exception as e:
+            logger.error(f"Error in keyword search: {e}")
+            return []
+    
+    def hybrid_search(self, query: str, k: int = 5, filter_fn=None,
+                      ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                      filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+        """
+        Search with both BM25 and embeddings, fusing the two rankings by reciprocal rank.
+        
+        Short queries whose words all occur in the keyword index (a destination
+        or activity name) are answered by BM25 alone, without an embedding call.
+        
+        Args:
+            query: The query text
+            k: Number of results to return
+            filter_fn: Optional function to filter results
+            ef_search: Optional HNSW efSearch for the dense search
+            nprobe: Optional number of IVF cells to visit for the dense search
+            filters: Optional metadata filter, e.g. {"continent": "Asia"} (see MetadataColumns)
+            
+        Returns:
+            List of (document, fused score) tuples, best first
+        """
+        keyword_results = self.keyword_search(query, k*2, filter_fn, filters)
+        if self._is_keyword_query(query):
+            return self._fuse_results([keyword_results], k)
+        
+        dense_results = self.similarity_search(query, k*2, filter_fn, ef_search, nprobe, filters=filters)
+        return self._fuse_results([dense_results, keyword_results], k)
+    
+    async def hybrid_search_async(self, query: str, k: int = 5, filter_fn=None,
+                                  ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                  filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+        """
+        Async variant of hybrid_search; only the query embedding call is awaited.
+        
+        Args:
+            query: The query text
+            k: Number of results to return
+            filter_fn: Optional function to filter results
+            ef_search: Optional HNSW efSearch for the dense search
+            nprobe: Optional number of IVF cells to visit for the dense search
+            filters: Optional metadata filter, e.g. {"continent": "Asia"} (see MetadataColumns)
+            
+        Returns:
+            List of (document, fused score) tuples, best first
+        """
+        keyword_results = self.keyword_search(query, k*2, filter_fn, filters)
+        if self._is_keyword_query(query):
+            return self._fuse_results([keyword_results], k)
+        
+        dense_results = await self.similarity_search_async(query, k*2, filter_fn, ef_search, nprobe, filters=filters)
+        return self._fuse_results([dense_results, keyword_results], k)
+    
+    def batch_hybrid_search(self, queries: List[str], k: int = 5, filter_fn=None,
+                            ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                            filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """
+        Hybrid search for several queries, embedding all non-keyword queries in one batch.
+        
+        Args:
+            queries: The query texts
+            k: Number of results to return per query
+            filter_fn: Optional function to filter results
+            ef_search: Optional HNSW efSearch for the dense search
+            nprobe: Optional number of IVF cells to visit for the dense search
+            filters: Optional metadata filter, e.g. {"continent": "Asia"} (see MetadataColumns)
+            
+        Returns:
+            One list of (document, fused score) tuples per query, in query order
+        """
+        keyword_results = [self.keyword_search(query, k*2, filter_fn, filters) for query in queries]
+        dense_positions = [i for i, query in enumerate(queries) if not self._is_keyword_query(query)]
+        dense_results = dict(zip(
+            dense_positions,
+            self.batch_similarity_search([queries[i] for i in dense_positions], k*2, filter_fn,
+                                         ef_search, nprobe, filters=filters)
+        ))
+        
+        return [
+            self._fuse_results([dense_results.get(i, []), keyword_results[i]], k)
+            for i in range(len(queries))
+        ]
+    
+    async def batch_hybrid_search_async(self, queries: List[str], k: int = 5, filter_fn=None,
+                                        ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                        filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """
+        Async variant of batch_hybrid_search; only the batched embedding call is awaited.
+        
+        Args:
+            queries: The query texts
+            k: Number of results to return per query
+            filter_fn: Optional function to filter results
+            ef_search: Optional HNSW efSearch for the dense search
+            nprobe: Optional number of IVF cells to visit for the dense search
+            filters: Optional metadata filter, e.g. {"continent": "Asia"} (see MetadataColumns)
+            
+        Returns:
+            One list of (document, fused score) tuples per query, in query order
+        """
+        keyword_results = [self.keyword_search(query, k*2, filter_fn, filters) for query in queries]
+        dense_positions = [i for i, query in enumerate(queries) if not self._is_keyword_query(query)]
+        dense_results = dict(zip(
+            dense_positions,
+            await self.batch_similarity_search_async([queries[i] for i in dense_positions], k*2, filter_fn,
+                                                     ef_search, nprobe, filters=filters)
+        ))
+        
+        return [
+            self._fuse_results([dense_results.get(i, []), keyword_results[i]], k)
+            for i in range(len(queries))
+        ]
+    
+    def _is_keyword_query(self, query: str) -> bool:
+        """Check whether BM25 alone can answer a query."""
+        with self._lock:
+            return self.sparse_index.is_keyword_query(query, self.retrieval_config.get("keyword_query_max_terms", 3))
+    
+    def _fuse_results(self, result_lists, k: int) -> List[Tuple[Dict, float]]:
+        """
+        Combine rankings with reciprocal-rank fusion: score = sum of 1 / (rrf_k + rank).
+        
+        Args:
+            result_lists: Lists of (document, score) tuples, each best first
+            k: Number of results to return
+            
+        Returns:
+            List of (document, fused score) tuples, best first
+        """
+        rrf_k = self.retrieval_config.get("rrf_k", 60)
+        documents = {}
+        fused = {}
+        for results in result_lists:
+            for rank, (doc, _) in enumerate(results, start=1):
+                doc_id = doc.get('id')
+                documents[doc_id] = doc
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+        
+        ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+        return [(documents[doc_id], fused[doc_id]) for doc_id in ranked]
+    
+    def _search_by_embedding(self, query_embedding, k: int, filter_fn=None,
+                             ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                             min_score: Optional[float] = None,
+                             filters: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+        """Search the index with an already computed query embedding."""
+        return self._search_by_embeddings(query_embedding, k, filter_fn, ef_search, nprobe, min_score, filters)[0]
+    
+    def _search_by_embeddings(self, query_embeddings, k: int, filter_fn=None,
+                              ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                              min_score: Optional[float] = None,
+                              filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """Search the index with a matrix of already computed query embeddings, one row per query."""
+        query_np = normalize_vectors(query_embeddings)
+        
+        with self._lock:
+            if filters:
+                return self._filtered_search(query_np, k, filter_fn, ef_search, nprobe, min_score, filters)
+            
+            # Search the index; inner products of unit vectors are cosine similarities, best first.
+            # Get more for filtering, plus enough to step over dead ids.
+            params = search_parameters(self.index, ef_search=ef_search, nprobe=nprobe)
+            scores, labels = self.index.search(query_np, min(self.index.ntotal, k*2 + self.stale_labels), params=params)
+            
+            return [
+                self._collect_results(row_scores, row_labels, k, filter_fn, min_score)
+                for row_scores, row_labels in zip(scores, labels)
+            ]
+    
+    def _filtered_search(self, query_np, k: int, filter_fn=None,
+                         ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                         min_score: Optional[float] = None,
+                         filters: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+        """
+        Search only the rows matching a metadata filter.
+        
+        Small match sets are scored exactly with one matrix product; larger ones
+        are searched through the index with an IDSelector. Either way each query
+        gets k results whenever k documents match.
+        """
+        rows = np.flatnonzero(self.metadata.mask(filters))
+        if len(rows) == 0:
+            return [[] for _ in query_np]
+        
+        num_candidates = min(len(rows), k*2)  # Get more for filter_fn
+        if len(rows) <= self.index_config.get("exact_filter_max_rows", 2048):
+            return self._exact_search(query_np, rows, num_candidates, k, filter_fn, min_score)
+        
+        # Bitmap over FAISS ids, built vectorized (cheaper than a hashed IDSelectorBatch for large matches)
+        bitmap = np.zeros(self.next_label, dtype=bool)
+        bitmap[self.labels[rows]] = True
+        packed = np.packbits(bitmap, bitorder='little')
+        selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(packed))
+        params = search_parameters(self.index, ef_search=ef_search, nprobe=nprobe, sel=selector)
+        scores, labels = self.index.search(query_np, num_candidates, params=params)
+        
+        results = []
+        for i, (row_scores, row_labels) in enumerate(zip(scores, labels)):
+            if (row_labels >= 0).sum() < num_candidates:
+                # HNSW and IVF can miss matches of a selective filter; score them exactly instead
+                results.extend(self._exact_search(query_np[i:i+1], rows, num_candidates, k, filter_fn, min_score))
+            else:
+                results.append(self._collect_results(row_scores, row_labels, k, filter_fn, min_score))
+        return results
+    
+    def _exact_search(self, query_np, rows, num_candidates: int, k: int, filter_fn=None,
+                      min_score: Optional[float] = None) -> List[List[Tuple[Dict, float]]]:
+        """Score the given rows against each query with one matrix product and keep the best."""
+        scores = query_np @ np.asarray(self.vectors[rows]).T
+        
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, num_candidates - 1)[:num_candidates]
+            top = top[np.argsort(-row_scores[top])]
+            results.append(self._collect_results(row_scores[top], self.labels[rows[top]], k, filter_fn, min_score))
+        return results
+    
+    def _collect_results(self, scores, labels, k: int, filter_fn=None,
+                         min_score: Optional[float] = None) -> List[Tuple[Dict, float]]:
+        """Turn one row of FAISS results into (document, score) tuples."""
+        results = []
+        for score, label in zip(scores, labels):
+            # Everything after the first result below the threshold scores lower still
+            if min_score is not None and score < min_score:
+                break
+            
+            # Skip dead ids and the -1 padding approximate indexes add
+            row = self.label_rows.get(int(label))
+            if row is None:
+                continue
+            
+            doc = self.documents[row]
+            
+            # Apply filter if provided
+            if filter_fn and not filter_fn(doc):
+                continue
+            
+            results.append((doc, float(score)))
+            if len(results) == k:
+                break
+        
+        return results
+    
     def save(self):
         """Save the vector store to disk."""
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
             
-            # Prepare data for saving
-            store_data = {
-                'vectors': self.vectors,
-                'documents': self.documents,
-                'document_hashes': self.document_hashes,
-                'document_ids': self.document_ids,
-                'metadata': {
-                    'last_updated': self.last_updated,
-                    'last_rebuild': self.last_rebuild,
-                    'update_count': self.update_count,
-                    'vector_dim': self.embedding_dimension,
-                    'doc_count': len(self.documents)
+            with self._lock:
+                # Vectors and the FAISS index are stored in their own memory-mappable files
+                save_index_files(self.store_path, self.index, self.vectors)
+                
+                # Prepare data for saving
+                store_data = {
+                    'documents': self.documents,
+                    'document_hashes': self.document_hashes,
+                    'document_ids': self.document_ids,
+                    'labels': np.asarray(self.labels),
+                    'next_label': self.next_label,
+                    'metadata_columns': self.metadata.to_dict(),
+                    'sparse_index': self.sparse_index.to_dict(),
+                    'metadata': {
+                        'last_updated': self.last_updated,
+                        'last_rebuild': self.last_rebuild,
+                        'last_compaction': self.last_compaction,
+                        'update_count': self.update_count,
+                        'vector_dim': self.embedding_dimension,
+                        'doc_count': len(self.label_rows),
+                        'index_size': self.index.ntotal if self.index else 0,
+                        'vector_format': 'npy',
+                        'metric': 'cosine'
+                    }
                 }
-            }
-            
-            # Save data
-            with open(self.store_path, 'wb') as f:
-                pickle.dump(store_data, f)
+                
+                # Save data (write then rename so readers never see a partial file)
+                tmp_path = f"{self.store_path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(store_data, f)
+                os.replace(tmp_path, self.store_path)
                 
             logger.info(f"Saved vector store to {self.store_path}")
             return True
@@ -401,21 +962,70 @@ class OptimizedVectorStore:
                     store_data = pickle.load(f)
                 
                 # Load data
-                self.vectors = store_data.get('vectors', [])
                 self.documents = store_data.get('documents', [])
                 self.document_hashes = store_data.get('document_hashes', {})
                 self.document_ids = store_data.get('document_ids', {})
                 
+                # Stores saved before enrichment was kept apart pickled it in every document
+                moved_details = self._move_details_to_store()
+                
                 # Load metadata
                 metadata = store_data.get('metadata', {})
                 self.last_updated = metadata.get('last_updated')
                 self.last_rebuild = metadata.get('last_rebuild')
+                self.last_compaction = metadata.get('last_compaction')
                 self.update_count = metadata.get('update_count', 0)
                 
-                # Rebuild index
-                if self.vectors:
+                index = None
+                if 'vectors' in store_data:
+                    # Older stores pickled the vectors as a list
+                    vectors = store_data.get('vectors') or []
+                    self.vectors = normalize_vectors(vectors).reshape(-1, self.embedding_dimension)
+                else:
+                    # Open the persisted index and vectors memory-mapped, without rebuilding
+                    index, vectors = load_index_files(self.store_path, expected_count=metadata.get('index_size'))
+                    if index is not None:
+                        self.vectors = vectors
+                    elif metadata.get('doc_count'):
+                        logger.warning(f"FAISS index files for {self.store_path} are missing or inconsistent")
+                
+                if 'labels' in store_data and len(store_data['labels']) == len(self.vectors):
+                    self.labels = np.asarray(store_data['labels'], dtype=np.int64)
+                    self.next_label = store_data.get('next_label', len(self.labels))
+                else:
+                    # Stores saved before stable ids labelled vectors by row
+                    self.labels = np.arange(len(self.vectors), dtype=np.int64)
+                    self.next_label = len(self.labels)
+                    index = None
+                
+                self.label_rows = {
+                    int(label): row for row, label in enumerate(self.labels)
+                    if row < len(self.documents) and self.documents[row] is not None
+                }
+                
+                if 'metadata_columns' in store_data and len(store_data['metadata_columns']['present']) == len(self.documents):
+                    self.metadata = MetadataColumns.from_dict(store_data['metadata_columns'])
+                else:
+                    self.metadata = MetadataColumns.from_documents(self.documents)
+                
+                if 'sparse_index' in store_data:
+                    self.sparse_index = BM25Index.from_dict(store_data['sparse_index'])
+                if self.sparse_index.slots.keys() != self.label_rows.keys():
+                    # Stores saved before keyword search, or whose vectors were relabelled above
+                    self._rebuild_sparse_index()
+                
+                if uses_inner_product(index):
+                    self.index = index
+                    self.stale_labels = index.ntotal - len(self.label_rows)
+                elif len(self.vectors):
+                    # Older stores used an L2 index over raw vectors, or positional ids
+                    logger.info("Rebuilding vector store index with normalized vectors and stable ids")
+                    self.vectors = normalize_vectors(self.vectors)
                     self._rebuild_index()
                 
+                if moved_details:
+                    self.save()
+                
                 logger.info(f"Loaded vector store from {self.store_path} with {len(self.documents)} documents")
                 return True
             else:
@@ -424,32 +1034,60 @@ class OptimizedVectorStore:
         except Exception as e:
             logger.error(f"Error loading vector store: {e}")
             return False
+    
+    def _move_details_to_store(self) -> bool:
+        """Move enrichment fields still inside loaded documents to the detail store."""
+        details = {}
+        for row, document in enumerate(self.documents):
+            if document is None:
+                continue
+            hot, cold = split_package(document)
+            if cold:
+                self.documents[row] = hot
+                details[hot.get('id')] = cold
+        
+        if details:
+            self.detail_store.put_many(details)
+            logger.info(f"Moved enrichment fields of {len(details)} documents to {self.detail_store.db_path}")
+        return bool(details)
             
     def get_statistics(self):
-        """Get statistics about the vector store."""
-        return {
-            'document_count': len(self.documents),
+        """Get statistics about the vector store and the embedding cache."""
+        stats = {
+            'document_count': len(self.label_rows),
             'vector_count': len(self.vectors),
             'index_size': self.index.ntotal if self.index else 0,
+            'removed_rows': len(self.documents) - len(self.label_rows),
+            'stale_ids': self.stale_labels,
+            'keyword_index_terms': len(self.sparse_index.postings),
             'last_updated': self.last_updated,
             'last_rebuilt': self.last_rebuild,
+            'last_compaction': self.last_compaction,
             'update_count': self.update_count,
-            'cache_size': len(self.embedding_cache),
-            'cache_hits': self.cache_hits,
-            'cache_misses': self.cache_misses,
-            'cache_hit_ratio': self.cache_hits / (self.cache_hits + self.cache_misses) if (self.cache_hits + self.cache_misses) > 0 else 0
+            'query_cache': self.query_cache.get_statistics(),
+            **self.detail_store.get_statistics(),
+            'cache_size': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_hit_ratio': 0
         }
+        
+        embedding_cache = getattr(self.embedder, 'embedding_cache', None)
+        if embedding_cache is not None:
+            stats.update(embedding_cache.get_statistics())
+        return stats
     
     def clear_cache(self):
-        """Clear the embedding cache."""
-        self.embedding_cache = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
+        """Clear the query and document embedding caches."""
+        self.query_cache.clear()
+        embedding_cache = getattr(self.embedder, 'embedding_cache', None)
+        if embedding_cache is not None:
+            embedding_cache.clear()
         logger.info("Cleared embedding cache")
     
     def get_documents(self):
         """Get all documents in the vector store."""
-        return self.documents
+        return [document for document in self.documents if document is not None]
     
     def get_document_by_id(self, doc_id):
         """Get a document by its ID."""
@@ -458,25 +1096,46 @@ class OptimizedVectorStore:
             return self.documents[index]
         return None
     
+    def get_document_details(self, doc_id, fields=None):
+        """
+        Get the enrichment fields of a document, loaded from the detail store.
+        
+        Args:
+            doc_id: Document ID
+            fields: Field names to load (all if None)
+            
+        Returns:
+            dict of field -> value
+        """
+        return self.detail_store.get(doc_id, fields)
+    
     def remove_document(self, doc_id):
         """
         Remove a document from the vector store.
-        Note: This marks the document for removal but requires a rebuild for FAISS.
+        
+        Its id is deleted from the FAISS index right away (or skipped by searches
+        for index types that cannot delete); its storage row is reclaimed by the
+        next background compaction.
         """
-        if doc_id in self.document_ids:
-            index = self.document_ids[doc_id]
+        with self._lock:
+            if doc_id not in self.document_ids:
+                return False
             
-            # Mark for removal (but don't actually remove until rebuild)
-            # This is a workaround since FAISS doesn't support removing vectors
-            self.documents[index] = None
+            row = self.document_ids.pop(doc_id)
+            self.document_hashes.pop(doc_id, None)
             
-            # Clean up mappings
-            del self.document_ids[doc_id]
-            if doc_id in self.document_hashes:
-                del self.document_hashes[doc_id]
-                
-            # Schedule rebuild on next save
+            label = int(self.labels[row])
+            del self.label_rows[label]
+            self.sparse_index.remove(label)
+            if self.index is not None:
+                self._remove_labels([label])
+            self.documents[row] = None
+            self.metadata.clear_rows([row])
+            self.detail_store.remove([doc_id])
+            
+            self.last_updated = time.time()
             self.update_count += 1
-            logger.info(f"Marked document {doc_id} for removal")
-            return True
-        return False
\ No newline at end of file
+            logger.info(f"Removed document {doc_id}")
+        
+        self._schedule_compaction()
+        return True
\ No newline at end of file
@@ -3,11 +3,14 @@ import json
 import time
 import datetime
 import logging
+import threading
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple, Callable
 import re
 from pathlib import Path
 
+from src.utils.data_io import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 class RAGEvaluator:
@@ -18,8 +21,10 @@ class RAGEvaluator:
         self.metrics_dir = Path(metrics_dir)
         self.metrics_dir.mkdir(parents=True, exist_ok=True)
         
-        # Track current session
-        self.session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Track current session (the process id keeps the session files of
+        # workers started in the same second apart)
+        self.session_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self._lock = threading.Lock()
         self.session_metrics = {
             "extraction": [],
             "retrieval": [],
@@ -48,12 +53,21 @@ class RAGEvaluator:
             "end_to_end": {}
         }
     
+    def _record(self, component, metrics):
+        """Add a metrics record to the current session."""
+        with self._lock:
+            self.session_metrics[component].append(metrics)
+
+    def _session_snapshot(self):
+        """Copy the session metrics so they can be read while requests add records."""
+        with self._lock:
+            return {component: list(records) for component, records in self.session_metrics.items()}
+
     def save_session_metrics(self):
         """Save the current session metrics."""
         session_path = self.metrics_dir / f"session_{self.session_id}.json"
         try:
-            with open(session_path, 'w') as f:
-                json.dump(self.session_metrics, f, indent=2)
+            write_json_atomic(session_path, self._session_snapshot(), indent=2)
             logger.info(f"Saved session metrics to {session_path}")
             return True
         except Exception as e:
@@ -63,19 +77,19 @@ class RAGEvaluator:
     def set_as_baseline(self):
         """Set the current session as the baseline for future comparisons."""
         # Calculate averages from session metrics
+        session_metrics = self._session_snapshot()
         baseline = {
-            "extraction": self._calculate_avg_metrics(self.session_metrics["extraction"]),
-            "retrieval": self._calculate_avg_metrics(self.session_metrics["retrieval"]),
-            "generation": self._calculate_avg_metrics(self.session_metrics["generation"]),
-            "end_to_end": self._calculate_avg_metrics(self.session_metrics["end_to_end"]),
+            "extraction": self._calculate_avg_metrics(session_metrics["extraction"]),
+            "retrieval": self._calculate_avg_metrics(session_metrics["retrieval"]),
+            "generation": self._calculate_avg_metrics(session_metrics["generation"]),
+            "end_to_end": self._calculate_avg_metrics(session_metrics["end_to_end"]),
             "timestamp": datetime.datetime.now().isoformat(),
             "session_id": self.session_id
         }
         
         baseline_path = self.metrics_dir / "baseline_metrics.json"
         try:
-            with open(baseline_path, 'w') as f:
-                json.dump(baseline, f, indent=2)
+            write_json_atomic(baseline_path, baseline, indent=2)
             logger.info(f"Set current session as baseline")
             
             # Update in-memory baseline
@@ -157,7 +171,7 @@ class RAGEvaluator:
             metrics["accuracy"] = correct_fields / max(1, total_fields)
         
         # Save to session
-        self.session_metrics["extraction"].append(metrics)
+        self._record("extraction", metrics)
         
         # Compare with baseline
         comparison = {}
@@ -278,7 +292,7 @@ class RAGEvaluator:
         metrics["process_time_ms"] = (time.time() - start_time) * 1000
         
         # Save to session
-        self.session_metrics["retrieval"].append(metrics)
+        self._record("retrieval", metrics)
         
         # Compare with baseline
         comparison = {}
@@ -387,7 +401,7 @@ class RAGEvaluator:
         metrics["process_time_ms"] = (time.time() - start_time) * 1000
         
         # Save to session
-        self.session_metrics["generation"].append(metrics)
+        self._record("generation", metrics)
         
         # Compare with baseline
         comparison = {}
@@ -453,7 +467,7 @@ class RAGEvaluator:
         metrics["process_time_ms"] = (time.time() - start_time) * 1000
         
         # Save to session
-        self.session_metrics["end_to_end"].append(metrics)
+        self._record("end_to_end", metrics)
         
         # Compare with baseline
         comparison = {}
@@ -481,18 +495,19 @@ class RAGEvaluator:
     
     def get_summary_report(self):
         """Generate a summary report of all metrics in the current session."""
+        session_metrics = self._session_snapshot()
         summary = {
             "session_id": self.session_id,
             "timestamp": datetime.datetime.now().isoformat(),
-            "extraction": self._calculate_avg_metrics(self.session_metrics["extraction"]),
-            "retrieval": self._calculate_avg_metrics(self.session_metrics["retrieval"]),
-            "generation": self._calculate_avg_metrics(self.session_metrics["generation"]),
-            "end_to_end": self._calculate_avg_metrics(self.session_metrics["end_to_end"]),
+            "extraction": self._calculate_avg_metrics(session_metrics["extraction"]),
+            "retrieval": self._calculate_avg_metrics(session_metrics["retrieval"]),
+            "generation": self._calculate_avg_metrics(session_metrics["generation"]),
+            "end_to_end": self._calculate_avg_metrics(session_metrics["end_to_end"]),
             "sample_count": {
-                "extraction": len(self.session_metrics["extraction"]),
-                "retrieval": len(self.session_metrics["retrieval"]),
-                "generation": len(self.session_metrics["generation"]),
-                "end_to_end": len(self.session_metrics["end_to_end"])
+                "extraction": len(session_metrics["extraction"]),
+                "retrieval": len(session_metrics["retrieval"]),
+                "generation": len(session_metrics["generation"]),
+                "end_to_end": len(session_metrics["end_to_end"])
             }
         }
         
@@ -97,20 +97,19 @@ def rebuild_vector_store():
     
     # Generate embeddings
     print("Generating embeddings...")
-    embeddings = ollama.get_embeddings(texts)
+    from src.knowledge_base.index_factory import build_index, normalize_vectors
+    vectors_np = normalize_vectors(ollama.embed_batch(texts))
     
-    # Create FAISS index
-    vector_dim = len(embeddings[0])
-    index = faiss.IndexFlatL2(vector_dim)
-    
-    # Add vectors to the index
-    vectors_np = np.array(embeddings).astype('float32')
-    index.add(vectors_np)
+    # Create an inner product (cosine) FAISS index of the configured type and add the vectors
+    index = build_index(vectors_np, metric=faiss.METRIC_INNER_PRODUCT)
     
     # Save the index and packages
-    vector_store_data = (embeddings, packages)
+    from src.knowledge_base.index_io import save_index_files
     
     vector_store_path.parent.mkdir(parents=True, exist_ok=True)
+    save_index_files(vector_store_path, index, vectors_np)
+    vector_store_data = (None, packages)
+    
     with open(vector_store_path, 'wb') as f:
         import pickle
         pickle.dump(vector_store_data, f)
@@ -1,12 +1,23 @@
 import os
+import re
+import asyncio
 import json
 import hashlib
 import time
+import sqlite3
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 
+from src.config import Config
+from src.utils.data_io import write_json_atomic
+from src.knowledge_base.metadata_filter import parse_price_amount, parse_duration_days
+from src.knowledge_base.package_details import split_package
+from src.email_processing.rule_extractor import CURRENCY_SYMBOLS
+
 logger = logging.getLogger(__name__)
 
 class CacheEntry:
@@ -59,31 +70,428 @@ class CacheEntry:
         return entry
 
 
+class JsonFileBackend:
+    """
+    Cache storage with one JSON file per entry.
+
+    This is the original on-disk layout. Every file is scanned for expiry,
+    counting and semantic lookups, so prefer SQLiteBackend for large caches.
+    Files are replaced atomically, so processes sharing the directory never
+    read a partial entry, but each process's semantic index only learns of
+    other processes' entries when it is rebuilt; use SQLiteBackend when
+    several workers share a cache.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the backend.
+
+        Args:
+            cache_dir: Directory holding the entry files
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._semantic_index = None  # semantic key -> entry key, built on first semantic lookup
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        """Load one entry, or None if it is not stored."""
+        cache_file = self._path(key)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    return CacheEntry.from_dict(json.load(f))
+            except FileNotFoundError:
+                # Deleted by another process since the existence check
+                pass
+            except Exception as e:
+                logger.error(f"Error loading cache entry {key}: {e}")
+        return None
+
+    def save(self, entry: CacheEntry, semantic_key: Optional[str] = None) -> bool:
+        """Store an entry, replacing any entry with the same key."""
+        try:
+            record = entry.to_dict()
+            record["semantic_key"] = semantic_key
+            write_json_atomic(self._path(entry.key), record)
+            with self._lock:
+                if self._semantic_index is not None and semantic_key:
+                    self._semantic_index[semantic_key] = entry.key
+            return True
+        except Exception as e:
+            logger.error(f"Error saving cache entry {entry.key}: {e}")
+            return False
+
+    def touch(self, entry: CacheEntry):
+        """Record an access to an entry (access counts are only kept in memory here)."""
+
+    def delete(self, key: str) -> bool:
+        """Delete one entry. Returns True if it was stored."""
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def find_semantic(self, semantic_key: str) -> Optional[CacheEntry]:
+        """Load the entry stored under a semantic key, or None."""
+        with self._lock:
+            if self._semantic_index is None:
+                self._semantic_index = {}
+                for record in self._records():
+                    if record.get("semantic_key"):
+                        self._semantic_index[record["semantic_key"]] = record["key"]
+            key = self._semantic_index.get(semantic_key)
+
+        entry = self.load(key) if key else None
+        if key and entry is None:
+            with self._lock:
+                self._semantic_index.pop(semantic_key, None)
+        return entry
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry. Returns the number deleted."""
+        count = 0
+        for record in self._records():
+            if datetime.fromisoformat(record["expires_at"]) < datetime.now():
+                self.delete(record["key"])
+                count += 1
+        return count
+
+    def clear(self) -> int:
+        """Delete every entry. Returns the number deleted."""
+        count = 0
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                os.remove(cache_file)
+                count += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._semantic_index = None
+        return count
+
+    def keys(self) -> List[str]:
+        """Get the keys of all unexpired entries."""
+        now = datetime.now()
+        return [record["key"] for record in self._records()
+                if datetime.fromisoformat(record["expires_at"]) >= now]
+
+    def count(self) -> int:
+        """Get the number of stored entries."""
+        return sum(1 for _ in self.cache_dir.glob("*.json"))
+
+    def get_statistics(self) -> Dict:
+        """Get expiry, TTL and access statistics over all stored entries."""
+        entries = [CacheEntry.from_dict(record) for record in self._records()]
+
+        access_counts = {}
+        for entry in entries:
+            count_range = f"{(entry.access_count // 10) * 10}-{(entry.access_count // 10 + 1) * 10 - 1}"
+            access_counts[count_range] = access_counts.get(count_range, 0) + 1
+
+        return {
+            "total_entries": len(entries),
+            "expired_entries": sum(1 for entry in entries if entry.is_expired()),
+            "average_ttl_seconds": sum((entry.expires_at - entry.created_at).total_seconds()
+                                       for entry in entries) / max(1, len(entries)),
+            "access_counts": access_counts,
+        }
+
+    def _records(self):
+        """Yield the raw dictionaries of all entry files."""
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                with open(cache_file, 'r') as f:
+                    record = json.load(f)
+            except FileNotFoundError:
+                # Deleted by another process while listing
+                continue
+            except Exception as e:
+                logger.error(f"Error loading cache file {cache_file}: {e}")
+                continue
+            yield record
+
+
+class SQLiteBackend:
+    """
+    Cache storage in a single SQLite database in WAL mode.
+
+    Entries are read one at a time by key, so nothing is loaded up front, and
+    expiry and semantic lookups use indexes instead of scanning every entry.
+    Several processes (e.g. uvicorn workers) can share the database: WAL lets
+    readers run alongside a writer, and writers wait for each other.
+    """
+
+    def __init__(self, cache_dir: Path, filename: str = "cache.db"):
+        """
+        Open or create the database.
+
+        Args:
+            cache_dir: Directory holding the database file
+            filename: Name of the database file
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / filename
+
+        # Wait for other processes' write transactions instead of failing with "database is locked"
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            semantic_key TEXT,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            access_count INTEGER NOT NULL DEFAULT 0,
+            last_accessed REAL NOT NULL
+        )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_semantic_key ON entries (semantic_key)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        # Accesses recorded by this process, key -> count; reads never write to the database
+        self._access_counts = {}
+
+        # Entries written by JsonFileBackend are only imported on request, see import_json_files
+        if any(self.cache_dir.glob("*.json")):
+            logger.info(f"{self.cache_dir} holds JSON cache files; run scripts/migrate_cache.py to import them")
+
+    def _row_to_entry(self, row) -> CacheEntry:
+        key, data, created_at, expires_at, access_count, last_accessed = row
+        entry = CacheEntry(key, json.loads(data))
+        entry.created_at = datetime.fromtimestamp(created_at)
+        entry.expires_at = datetime.fromtimestamp(expires_at)
+        entry.access_count = access_count
+        entry.last_accessed = datetime.fromtimestamp(last_accessed)
+        return entry
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        """Load one entry, or None if it is not stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, data, created_at, expires_at, access_count, last_accessed FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def save(self, entry: CacheEntry, semantic_key: Optional[str] = None) -> bool:
+        """Store an entry, replacing any entry with the same key."""
+        try:
+            data = json.dumps(entry.data)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, data, semantic_key, created_at, expires_at, access_count, last_accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (entry.key, data, semantic_key, entry.created_at.timestamp(), entry.expires_at.timestamp(),
+                     entry.access_count, entry.last_accessed.timestamp())
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving cache entry {entry.key}: {e}")
+            return False
+
+    def touch(self, entry: CacheEntry):
+        """
+        Record an access to an entry.
+
+        Counts are kept in memory only: writing them on every hit would make
+        reads write transactions contending for the database lock shared by
+        all workers.
+        """
+        with self._lock:
+            self._access_counts[entry.key] = self._access_counts.get(entry.key, 0) + 1
+
+    def delete(self, key: str) -> bool:
+        """Delete one entry. Returns True if it was stored."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+            self._access_counts.pop(key, None)
+        return deleted > 0
+
+    def find_semantic(self, semantic_key: str) -> Optional[CacheEntry]:
+        """Load the newest unexpired entry stored under a semantic key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, data, created_at, expires_at, access_count, last_accessed FROM entries "
+                "WHERE semantic_key = ? AND expires_at > ? ORDER BY created_at DESC LIMIT 1",
+                (semantic_key, time.time())
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry. Returns the number deleted."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def clear(self) -> int:
+        """Delete every entry. Returns the number deleted."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM entries").rowcount
+            self._conn.commit()
+            self._access_counts = {}
+        return deleted
+
+    def keys(self) -> List[str]:
+        """Get the keys of all unexpired entries."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM entries WHERE expires_at >= ?", (time.time(),)).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        """Get the number of stored entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_statistics(self) -> Dict:
+        """Get expiry, TTL and access statistics over all stored entries (accesses by this process)."""
+        with self._lock:
+            total, expired, average_ttl = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(expires_at < ?), 0), COALESCE(AVG(expires_at - created_at), 0) "
+                "FROM entries",
+                (time.time(),)
+            ).fetchone()
+            stored_counts = self._conn.execute("SELECT key, access_count FROM entries").fetchall()
+            access_counts = dict(self._access_counts)
+
+        buckets = {}
+        for key, stored_count in stored_counts:
+            bucket = (stored_count + access_counts.get(key, 0)) // 10
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+
+        return {
+            "total_entries": total,
+            "expired_entries": expired,
+            "average_ttl_seconds": average_ttl,
+            "access_counts": {f"{bucket * 10}-{bucket * 10 + 9}": count for bucket, count in sorted(buckets.items())},
+        }
+
+    def import_json_files(self) -> Dict[str, int]:
+        """
+        Import the entry files left by JsonFileBackend in the cache directory.
+
+        A file is deleted only once its entry is stored in the database; files
+        that fail to import and expired entries are left in place.
+
+        Returns:
+            Dict with the number of imported, expired and failed files
+        """
+        legacy = JsonFileBackend(self.cache_dir)
+        counts = {"imported": 0, "expired": 0, "failed": 0}
+        # Files _records cannot read count as failed
+        unread = len(list(self.cache_dir.glob("*.json")))
+        for record in legacy._records():
+            unread -= 1
+            try:
+                entry = CacheEntry.from_dict(record)
+                if entry.is_expired():
+                    counts["expired"] += 1
+                elif self.save(entry, record.get("semantic_key")):
+                    legacy.delete(entry.key)
+                    counts["imported"] += 1
+                else:
+                    counts["failed"] += 1
+            except Exception as e:
+                logger.error(f"Error importing cache file for {record.get('key')}: {e}")
+                counts["failed"] += 1
+        counts["failed"] += max(unread, 0)
+        if counts["imported"]:
+            logger.info(f"Imported {counts['imported']} cache entries from JSON files into {self.db_path}")
+        return counts
+
+
+CACHE_BACKENDS = {
+    "json": JsonFileBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_cache_backend(backend: Optional[str], cache_dir: Path):
+    """
+    Create a cache storage backend.
+
+    Args:
+        backend: "sqlite" or "json" (defaults to Config.CACHE_BACKEND)
+        cache_dir: Directory the backend stores its files in
+
+    Returns:
+        A JsonFileBackend or SQLiteBackend
+    """
+    backend = backend or Config.CACHE_BACKEND
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend '{backend}', expected one of {sorted(CACHE_BACKENDS)}")
+    return CACHE_BACKENDS[backend](cache_dir)
+
+
 class ResponseCache:
     """Caching system for travel proposal responses."""
-    
-    def __init__(self, cache_dir: str = "cache", max_size: int = 1000, 
-                ttl_seconds: int = 86400 * 7):  # Default 7 days TTL
+
+    def __init__(self, cache_dir: str = "cache", max_size: int = 1000,
+                ttl_seconds: int = 86400 * 7, backend: Optional[str] = None,
+                max_bytes: Optional[int] = None):  # Default 7 days TTL
         """
         Initialize the response cache.
-        
+
         Args:
             cache_dir: Directory to store cache files
-            max_size: Maximum number of items in the cache
+            max_size: Maximum number of entries kept in memory; stored entries
+                stay on disk until they expire
             ttl_seconds: Default time-to-live for cache entries
+            backend: Storage backend, "sqlite" or "json" (defaults to Config.CACHE_BACKEND)
+            max_bytes: Budget for the serialized size of the entries kept in memory
+                (defaults to Config.RESPONSE_CACHE["max_memory_mb"])
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
+
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        
-        # Memory cache for fast access
-        self.cache = {}
-        
-        # Load cache from disk
+        if max_bytes is None:
+            max_bytes = int(Config.RESPONSE_CACHE.get("max_memory_mb", 64) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+        # Semantic tier: near-identical requests share a key built from their extracted fields
+        self.semantic_fields = Config.SEMANTIC_CACHE.get("fields", [])
+        self.budget_bands = Config.SEMANTIC_CACHE.get("budget_bands", [])
+        self.semantic_enabled = Config.SEMANTIC_CACHE.get("enabled", True)
+
+        # Hit counters, exact and semantic lookups counted separately
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+
+        # Persistent storage, read lazily by key
+        self.backend = create_cache_backend(backend, self.cache_dir)
+
+        # Guards the memory cache and counters; re-entrant since methods call each other
+        self._lock = threading.RLock()
+
+        # Memory cache of recently used entries, least recently used first
+        self.cache = OrderedDict()
+        self.entry_sizes = {}  # key -> serialized size of the entry in bytes
+        self.memory_bytes = 0
+
+        # Drop expired entries from storage
         self.load_cache()
-    
+
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        return self.backend.count()
+
     def generate_key(self, email_text: str, parameters: Optional[Dict] = None) -> str:
         """
         Generate a unique cache key for the query.
@@ -108,368 +516,464 @@ class ResponseCache:
         key_str = f"{normalized_text}|{params_str}"
         return hashlib.md5(key_str.encode('utf-8')).hexdigest()
     
-    def get(self, email_text: str, parameters: Optional[Dict] = None) -> Optional[Dict]:
+    def generate_semantic_key(self, extracted_info: Optional[Dict]) -> Optional[str]:
         """
-        Get a cached response if available.
+        Generate a cache key from the fields extracted from an email.
+        
+        Values are normalized (case, punctuation, duration in days, budget
+        currency and band, number of travelers) so differently worded emails
+        asking for the same trip share a key. Dates, allergies and preferences
+        are part of the key, so requests that differ in them never share one.
         
         Args:
-            email_text: The email text to get the response for
-            parameters: Additional parameters that affect the response
+            extracted_info: Dictionary with extracted information
             
         Returns:
-            Optional[Dict]: The cached response or None if not found
+            Optional[str]: A cache key, or None if the destination is unknown
         """
-        key = self.generate_key(email_text, parameters)
-        
-        # Check memory cache first
-        entry = self.cache.get(key)
-        
-        if entry is None:
-            # Try to load from disk
-            entry = self._load_entry_from_disk(key)
-            if entry:
-                # Add to memory cache
-                self.cache[key] = entry
+        if not self.semantic_enabled or not extracted_info or not extracted_info.get('destination'):
+            return None
         
-        if entry and not entry.is_expired():
-            # Record access
-            entry.access()
-            return entry.data
+        signature = {field: self._normalize_field(field, extracted_info.get(field))
+                     for field in self.semantic_fields}
+        key_str = json.dumps(signature, sort_keys=True)
+        return hashlib.md5(key_str.encode('utf-8')).hexdigest()
+    
+    def _normalize_field(self, field: str, value: Any) -> Any:
+        """Normalize one extracted field for the semantic key."""
+        if value is None or str(value).strip().lower() in ('', 'none'):
+            return None
         
-        # Remove expired entry if found
-        if entry and entry.is_expired():
-            self.remove(key)
+        if field == 'budget':
+            amount = parse_price_amount(str(value))
+            if amount == amount:  # Not NaN
+                # Currency and index of the band the amount falls in
+                currency = re.search(r'[$€£]|\b(' + '|'.join(CURRENCY_SYMBOLS) + r')\b', str(value).lower())
+                symbol = CURRENCY_SYMBOLS.get(currency.group(), currency.group()) if currency else '$'
+                return [symbol, sum(1 for bound in self.budget_bands if amount >= bound)]
+        elif field == 'duration':
+            days = parse_duration_days(str(value))
+            if days == days:
+                return days
+        elif field == 'travelers':
+            match = re.search(r'\d+', str(value))
+            if match:
+                return int(match.group())
         
-        return None
+        return ' '.join(re.sub(r'[^\w\s]', ' ', str(value).lower()).split())
     
-    def put(self, email_text: str, response_data: Dict, 
+    def get(self, email_text: str, parameters: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Get a cached response if available.
+
+        Args:
+            email_text: The email text to get the response for
+            parameters: Additional parameters that affect the response
+
+        Returns:
+            Optional[Dict]: The cached response or None if not found
+        """
+        key = self.generate_key(email_text, parameters)
+
+        with self._lock:
+            # Check memory cache first
+            entry = self.cache.get(key)
+
+            if entry is None:
+                # Try to load from storage
+                entry = self.backend.load(key)
+
+            if entry and not entry.is_expired():
+                # Keep it in memory as the most recently used and record access
+                self._remember(entry)
+                entry.access()
+                self.backend.touch(entry)
+                self.exact_hits += 1
+                return entry.data
+
+            # Remove expired entry if found
+            if entry and entry.is_expired():
+                self.remove(key)
+
+            self.exact_misses += 1
+            return None
+
+    def get_semantic(self, extracted_info: Optional[Dict]) -> Optional[Dict]:
+        """
+        Get a cached response for a near-identical request.
+
+        Args:
+            extracted_info: Dictionary with information extracted from the email
+
+        Returns:
+            Optional[Dict]: The cached response of a request with the same
+                normalized fields, or None if there is none
+        """
+        semantic_key = self.generate_semantic_key(extracted_info)
+
+        with self._lock:
+            entry = self.backend.find_semantic(semantic_key) if semantic_key else None
+
+            if entry and not entry.is_expired():
+                # Prefer the copy in memory, which has the latest access count
+                entry = self.cache.get(entry.key, entry)
+                self._remember(entry)
+                entry.access()
+                self.backend.touch(entry)
+                self.semantic_hits += 1
+                return entry.data
+
+            self.semantic_misses += 1
+            return None
+
+    def put(self, email_text: str, response_data: Dict,
            parameters: Optional[Dict] = None, ttl_seconds: Optional[int] = None) -> str:
         """
         Cache a response.
-        
+
         Args:
             email_text: The email text to cache the response for
             response_data: The response data to cache
             parameters: Additional parameters that affect the response
             ttl_seconds: Optional custom TTL in seconds
-            
+
         Returns:
             str: The cache key used
         """
         key = self.generate_key(email_text, parameters)
         ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
-        
+
         # Create cache entry
         entry = CacheEntry(key, response_data, ttl)
-        
-        # Add to memory cache
-        self.cache[key] = entry
-        
-        # Save to disk
-        self._save_entry_to_disk(entry)
-        
-        # Check cache size
-        if len(self.cache) > self.max_size:
-            self._evict_entries()
-        
-        return key
-    
+
+        # Findable by the semantic key of its extracted fields
+        semantic_key = None
+        if isinstance(response_data, dict):
+            semantic_key = self.generate_semantic_key(response_data.get('extracted_info'))
+
+        with self._lock:
+            # Save to storage
+            self.backend.save(entry, semantic_key)
+
+            # Add to memory cache
+            self._remember(entry)
+
+            return key
+
+    def _remember(self, entry: CacheEntry):
+        """Keep an entry in memory as the most recently used, evicting the least recently used ones when full."""
+        if self.cache.get(entry.key) is entry:
+            self.cache.move_to_end(entry.key)
+            return
+
+        self._forget(entry.key)
+        size = self._entry_size(entry)
+        if size > self.max_bytes:
+            # Too large to keep in memory, it is served from storage
+            return
+
+        self.cache[entry.key] = entry
+        self.entry_sizes[entry.key] = size
+        self.memory_bytes += size
+        self._evict_entries()
+
+    def _forget(self, key: str) -> bool:
+        """Drop an entry from memory. Returns True if it was there."""
+        if self.cache.pop(key, None) is None:
+            return False
+        self.memory_bytes -= self.entry_sizes.pop(key)
+        return True
+
+    @staticmethod
+    def _entry_size(entry: CacheEntry) -> int:
+        """Size of an entry's data serialized as JSON, in bytes."""
+        try:
+            return len(json.dumps(entry.data).encode('utf-8'))
+        except (TypeError, ValueError):
+            return len(str(entry.data).encode('utf-8'))
+
     def remove(self, key: str) -> bool:
         """
         Remove a cache entry.
-        
+
         Args:
             key: The cache key to remove
-            
+
         Returns:
             bool: True if removed, False if not found
         """
-        # Remove from memory cache
-        if key in self.cache:
-            del self.cache[key]
-            
-            # Remove from disk
-            cache_file = self.cache_dir / f"{key}.json"
-            if cache_file.exists():
-                os.remove(cache_file)
-            
-            return True
-        
-        return False
-    
+        with self._lock:
+            in_memory = self._forget(key)
+            stored = self.backend.delete(key)
+            return in_memory or stored
+
     def clear(self) -> int:
         """
         Clear all cache entries.
-        
+
         Returns:
             int: Number of entries cleared
         """
-        count = len(self.cache)
-        
-        # Clear memory cache
-        self.cache = {}
-        
-        # Clear disk cache
-        for cache_file in self.cache_dir.glob("*.json"):
-            os.remove(cache_file)
-        
-        return count
-    
-    def _load_entry_from_disk(self, key: str) -> Optional[CacheEntry]:
-        """Load a cache entry from disk."""
-        cache_file = self.cache_dir / f"{key}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                return CacheEntry.from_dict(data)
-            except Exception as e:
-                logger.error(f"Error loading cache entry {key}: {e}")
-        
-        return None
-    
+        with self._lock:
+            # Clear memory cache
+            self._reset_memory()
 
-    def _save_entry_to_disk(self, entry: CacheEntry) -> bool:
-        """Save a cache entry to disk."""
-        cache_file = self.cache_dir / f"{entry.key}.json"
-        
-        try:
-            # Create a custom JSON encoder to handle datetime objects
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime.datetime):
-                        return obj.isoformat()
-                    return super().default(obj)
-            
-            with open(cache_file, 'w') as f:
-                json.dump(entry.to_dict(), f, cls=DateTimeEncoder)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving cache entry {entry.key}: {e}")
-            return False
+            # Clear storage
+            return self.backend.clear()
+
+    def _reset_memory(self):
+        """Empty the memory cache."""
+        self.cache = OrderedDict()
+        self.entry_sizes = {}
+        self.memory_bytes = 0
 
-    def _evict_entries(self, count: int = 10) -> int:
+    def _evict_entries(self) -> int:
         """
-        Evict the least recently used entries.
-        
-        Args:
-            count: Number of entries to evict
-            
+        Evict least recently used entries from memory (they stay in storage)
+        until the memory cache is within max_size and max_bytes.
+
         Returns:
             int: Number of entries evicted
         """
-        if not self.cache:
-            return 0
-        
-        # Sort by last access time (oldest first)
-        entries_to_evict = sorted(
-            self.cache.items(),
-            key=lambda x: x[1].last_accessed
-        )[:count]
-        
-        # Remove entries
-        for key, _ in entries_to_evict:
-            self.remove(key)
-        
-        return len(entries_to_evict)
-    
+        evicted = 0
+        while self.cache and (len(self.cache) > self.max_size or self.memory_bytes > self.max_bytes):
+            key, _ = self.cache.popitem(last=False)
+            self.memory_bytes -= self.entry_sizes.pop(key)
+            evicted += 1
+
+        return evicted
+
     def load_cache(self) -> int:
         """
-        Load the cache from disk.
-        
+        Prepare the cache, deleting expired entries from storage.
+
+        Entries themselves are loaded lazily on first access.
+
         Returns:
-            int: Number of entries loaded
+            int: Number of stored entries
         """
-        # Clear memory cache first
-        self.cache = {}
-        
-        # Load all cache files
-        count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                
-                entry = CacheEntry.from_dict(data)
-                
-                # Skip expired entries
-                if not entry.is_expired():
-                    self.cache[entry.key] = entry
-                    count += 1
-                else:
-                    # Remove expired cache file
-                    os.remove(cache_file)
-            except Exception as e:
-                logger.error(f"Error loading cache file {cache_file}: {e}")
-        
-        logger.info(f"Loaded {count} cache entries from disk")
-        return count
-    
+        with self._lock:
+            # Clear memory cache first
+            self._reset_memory()
+
+            expired = self.backend.purge_expired()
+            count = self.backend.count()
+
+            logger.info(f"Response cache has {count} entries ({expired} expired entries removed)")
+            return count
+
     def get_statistics(self) -> Dict:
         """Get cache statistics."""
-        # Count expired entries
-        expired_count = sum(1 for entry in self.cache.values() if entry.is_expired())
-        
-        # Count entries by access count
-        access_counts = {}
-        for entry in self.cache.values():
-            count_range = f"{(entry.access_count // 10) * 10}-{(entry.access_count // 10 + 1) * 10 - 1}"
-            access_counts[count_range] = access_counts.get(count_range, 0) + 1
-        
-        # Calculate average TTL
-        avg_ttl = sum((entry.expires_at - entry.created_at).total_seconds() 
-                     for entry in self.cache.values()) / max(1, len(self.cache))
-        
-        return {
-            "total_entries": len(self.cache),
-            "expired_entries": expired_count,
-            "average_ttl_seconds": avg_ttl,
-            "access_counts": access_counts,
-        }
+        with self._lock:
+            return {
+                **self.backend.get_statistics(),
+                "memory_entries": len(self.cache),
+                "memory_bytes": self.memory_bytes,
+                "memory_max_bytes": self.max_bytes,
+                **self.get_hit_statistics()
+            }
+
+    def get_hit_statistics(self) -> Dict:
+        """Get hit counts and ratios for exact and semantic lookups."""
+        with self._lock:
+            exact_lookups = self.exact_hits + self.exact_misses
+            semantic_lookups = self.semantic_hits + self.semantic_misses
+            return {
+                "exact_hits": self.exact_hits,
+                "exact_misses": self.exact_misses,
+                "exact_hit_ratio": self.exact_hits / exact_lookups if exact_lookups > 0 else 0,
+                "semantic_hits": self.semantic_hits,
+                "semantic_misses": self.semantic_misses,
+                "semantic_hit_ratio": self.semantic_hits / semantic_lookups if semantic_lookups > 0 else 0,
+            }
 
 
 class DestinationCache:
     """Special cache for destination-specific data."""
-    
-    def __init__(self, cache_dir: str = "destination_cache", ttl_days: int = 30):
+
+    def __init__(self, cache_dir: str = "destination_cache", ttl_days: int = 30, backend: Optional[str] = None):
         """
         Initialize the destination cache.
-        
+
         Args:
             cache_dir: Directory to store destination cache
             ttl_days: Time-to-live in days for destination data
+            backend: Storage backend, "sqlite" or "json" (defaults to Config.CACHE_BACKEND)
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
+
         self.ttl_seconds = ttl_days * 86400
-        
-        # Memory cache of destination data
+
+        # Persistent storage, read lazily by destination
+        self.backend = create_cache_backend(backend, self.cache_dir)
+
+        # Guards the memory cache
+        self._lock = threading.RLock()
+
+        # Memory cache of destination data used so far
         self.destinations = {}
-        
-        # Load destination data
+
+        # Drop expired destinations from storage
         self.load_destinations()
-    
+
+    def __len__(self) -> int:
+        """Number of stored destinations."""
+        return self.backend.count()
+
     def normalize_destination(self, destination: str) -> str:
         """Normalize a destination name for caching."""
         return destination.lower().strip().replace(" ", "_")
-    
+
     def get_destination_data(self, destination: str) -> Optional[Dict]:
         """
         Get cached data for a destination.
-        
+
         Args:
             destination: The destination name
-            
+
         Returns:
             Optional[Dict]: The cached destination data or None
         """
-        normalized = self.normalize_destination(destination)
-        
-        # Check memory cache
-        entry = self.destinations.get(normalized)
-        
-        if entry is None:
-            # Try to load from disk
-            entry = self._load_destination_from_disk(normalized)
-            if entry:
-                # Add to memory cache
-                self.destinations[normalized] = entry
-        
-        if entry and not entry.is_expired():
-            # Record access
-            entry.access()
-            return entry.data
-        
-        return None
-    
+        with self._lock:
+            normalized = self.normalize_destination(destination)
+
+            # Check memory cache
+            entry = self.destinations.get(normalized)
+
+            if entry is None:
+                # Try to load from storage
+                entry = self.backend.load(normalized)
+                if entry:
+                    # Entries stored before enrichment was kept apart carry it in every package
+                    entry.data = self._compact(entry.data)
+                    # Add to memory cache
+                    self.destinations[normalized] = entry
+
+            if entry and not entry.is_expired():
+                # Record access
+                entry.access()
+                return entry.data
+
+            return None
+
     def cache_destination_data(self, destination: str, data: Dict) -> bool:
         """
         Cache data for a destination.
-        
+
         Args:
             destination: The destination name
             data: The destination data to cache
-            
+
         Returns:
             bool: True if cached successfully
         """
-        normalized = self.normalize_destination(destination)
-        
-        # Create cache entry
-        entry = CacheEntry(normalized, data, self.ttl_seconds)
-        
-        # Add to memory cache
-        self.destinations[normalized] = entry
-        
-        # Save to disk
-        return self._save_destination_to_disk(entry)
-    
-    def _load_destination_from_disk(self, normalized_destination: str) -> Optional[CacheEntry]:
-        """Load destination data from disk."""
-        cache_file = self.cache_dir / f"{normalized_destination}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                return CacheEntry.from_dict(data)
-            except Exception as e:
-                logger.error(f"Error loading destination {normalized_destination}: {e}")
-        
-        return None
-    
-    def _save_destination_to_disk(self, entry: CacheEntry) -> bool:
-        """Save destination data to disk."""
-        cache_file = self.cache_dir / f"{entry.key}.json"
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(entry.to_dict(), f)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving destination {entry.key}: {e}")
-            return False
-    
+        with self._lock:
+            normalized = self.normalize_destination(destination)
+
+            # Create cache entry
+            entry = CacheEntry(normalized, self._compact(data), self.ttl_seconds)
+
+            # Add to memory cache
+            self.destinations[normalized] = entry
+
+            # Save to storage
+            return self.backend.save(entry)
+
+    @staticmethod
+    def _compact(data: Dict) -> Dict:
+        """Drop bulky enrichment fields from the packages of destination data."""
+        if not isinstance(data, dict) or not isinstance(data.get('packages'), list):
+            return data
+        packages = [split_package(package)[0] if isinstance(package, dict) else package
+                    for package in data['packages']]
+        return dict(data, packages=packages)
+
     def load_destinations(self) -> int:
         """
-        Load all destinations from disk.
-        
+        Prepare the cache, deleting expired destinations from storage.
+
+        Destination data is loaded lazily on first access.
+
         Returns:
-            int: Number of destinations loaded
+            int: Number of stored destinations
         """
-        # Clear memory cache
-        self.destinations = {}
-        
-        # Load all destination files
-        count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                
-                entry = CacheEntry.from_dict(data)
-                
-                # Skip expired entries
-                if not entry.is_expired():
-                    self.destinations[entry.key] = entry
-                    count += 1
-                else:
-                    # Remove expired cache file
-                    os.remove(cache_file)
-            except Exception as e:
-                logger.error(f"Error loading destination file {cache_file}: {e}")
-        
-        logger.info(f"Loaded {count} destinations from disk")
-        return count
-    
+        with self._lock:
+            # Clear memory cache
+            self.destinations = {}
+
+            expired = self.backend.purge_expired()
+            count = self.backend.count()
+
+            logger.info(f"Destination cache has {count} destinations ({expired} expired destinations removed)")
+            return count
+
     def get_all_destinations(self) -> List[str]:
         """Get a list of all cached destinations."""
-        return [dest.replace("_", " ").title() for dest in self.destinations.keys()]
+        return [dest.replace("_", " ").title() for dest in self.backend.keys()]
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests into one computation.
+
+    The first caller for a key starts the computation; callers arriving with
+    the same key while it runs await that computation and receive its result
+    (or its exception) instead of starting their own. The computation runs
+    as its own task, so a caller that disconnects does not cancel it for the
+    others. Must be used from a single event loop; each worker process
+    coalesces its own requests.
+    """
+
+    def __init__(self):
+        """Initialize with no computations in flight."""
+        self._in_flight = {}  # key -> asyncio.Task of the running computation
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get the result of a computation, sharing it with concurrent callers.
+
+        Args:
+            key: Identifies identical requests, e.g. ResponseCache.generate_key
+            compute: Coroutine function producing the result, called only if
+                no computation for the key is in flight
+
+        Returns:
+            The computation's result
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        # Shield so a cancelled caller leaves the computation running
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Forget a finished computation."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller went away
+            task.exception()
+
+    def get_statistics(self) -> Dict:
+        """Get coalescing statistics."""
+        requests = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self.executions,
+            "coalesced_requests": self.coalesced,
+            "coalesced_ratio": self.coalesced / requests if requests > 0 else 0
+        }
 
 
-# Helper function to integrate caching with the RAG pipeline
 def process_with_cache(response_cache: ResponseCache, 
                       destination_cache: DestinationCache,
                       email_text: str,
@@ -151,10 +151,15 @@ def batch_process_all_data(sources_dir: str, output_dir: str, vector_db_path: st
             
             texts.append(text)
         
-        # Add packages to vector store
-        vector_store.add_packages(enriched_packages, texts)
+        # Add packages to vector store in one transaction
+        report = vector_store.bulk_add_packages(enriched_packages, texts)
+        if report is None:
+            logger.error("Could not add packages to vector store")
+            return 0
         
-        logger.info(f"Successfully processed and added {len(enriched_packages)} packages to vector store")
+        logger.info(f"Successfully processed and added {len(enriched_packages)} packages to vector store "
+                    f"({report['embedded']} embedded in {report['embed_seconds']:.1f}s, "
+                    f"{report['rows_per_sec']:.0f} rows/sec written)")
         return len(enriched_packages)
     else:
         logger.warning("No files were successfully processed")
@@ -199,8 +204,13 @@ def process_and_add_new_sources(args):
         # Import to vector store directly
         packages = load_json_packages(args.input)
         vector_store = EnhancedVectorStore(db_path=args.vector_db)
-        vector_store.add_packages(packages)
-        logger.info(f"Imported {len(packages)} packages to vector store")
+        report = vector_store.bulk_add_packages(packages)
+        if report is None:
+            logger.error(f"Could not import packages from {args.input}")
+        else:
+            logger.info(f"Imported {len(packages)} packages to vector store "
+                        f"({report['embedded']} embedded in {report['embed_seconds']:.1f}s, "
+                        f"{report['rows']} rows written at {report['rows_per_sec']:.0f} rows/sec)")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process travel data sources')
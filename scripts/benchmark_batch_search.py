@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from optimized_vector_store import OptimizedVectorStore
+from scripts.benchmark_embeddings import start_stub_server
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def make_packages(count):
+    """Create synthetic travel packages."""
+    kinds = ["beach", "mountain", "city"]
+    return [
+        {
+            "id": f"pkg-{i}",
+            "name": f"{kinds[i % 3].title()} Escape {i}",
+            "destination": f"Destination {i}",
+            "duration": f"{3 + i % 10} days",
+            "price": 500 + 25 * i,
+            "description": f"A {kinds[i % 3]} holiday, package number {i}"
+        }
+        for i in range(count)
+    ]
+
+
+def make_queries(count):
+    """Create synthetic retrieval queries like Retriever.build_query produces."""
+    kinds = ["beach vacation seaside ocean tropical", "mountain vacation hiking nature outdoor",
+             "city vacation urban sightseeing cultural"]
+    return [
+        f"destination: Destination {i * 7} type: {kinds[i % 3]} budget: ${1000 + 50 * i} travelers: {1 + i % 4}"
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare single-query and batched similarity search throughput')
+    parser.add_argument('--packages', type=int, default=2000, help='Number of indexed packages')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--k', type=int, default=6, help='Results per query')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(support_batch=True)
+    config = dict(Config.OLLAMA, base_url=base_url, embedding_cache_path=None)  # Measure real embedding calls
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = OptimizedVectorStore(
+                store_path=str(Path(tmp_dir) / "vector_store.pkl"),
+                ollama_client=OllamaWrapper(config)
+            )
+            store.add_documents(make_packages(args.packages))
+            queries = make_queries(args.queries)
+
+            start_time = time.perf_counter()
+            single_results = [store.similarity_search(query, k=args.k) for query in queries]
+            single_elapsed = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            batch_results = store.batch_similarity_search(queries, k=args.k)
+            batch_elapsed = time.perf_counter() - start_time
+
+            same = all(
+                [doc['id'] for doc, _ in single] == [doc['id'] for doc, _ in batch]
+                for single, batch in zip(single_results, batch_results)
+            )
+
+            print(f"{args.packages} packages, {args.queries} queries, k={args.k}")
+            print(f"single-query loop : {args.queries / single_elapsed:8.1f} queries/sec ({single_elapsed:.2f}s)")
+            print(f"batched search    : {args.queries / batch_elapsed:8.1f} queries/sec ({batch_elapsed:.2f}s)")
+            print(f"speedup           : {single_elapsed / batch_elapsed:8.1f}x")
+            print(f"identical results : {same}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.knowledge_base.enhanced_vector_store import EnhancedVectorStore
+from scripts.benchmark_batch_search import make_packages
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+class RandomEmbedder:
+    """Stands in for Ollama so only the database work is measured."""
+
+    def __init__(self):
+        self.config = Config.OLLAMA
+
+    def embed_batch(self, texts):
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), Config.EMBEDDING_DIMENSION), dtype=np.float32)
+
+
+def make_catalog(count):
+    """Synthetic packages with three activities each, like the enriched catalog."""
+    packages = make_packages(count)
+    for package in packages:
+        package['activities'] = [
+            {'id': f"{package['id']}-act-{n}", 'name': f"Activity {n}", 'description': "Guided tour", 'duration': "2 hours"}
+            for n in range(3)
+        ]
+    return packages
+
+
+def per_row_ingest(db_path, packages, texts, vectors):
+    """Write packages the way add_packages used to: several execute calls per package."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    rows = 0
+    for package, text, vector in zip(packages, texts, vectors):
+        timestamp = datetime.now().isoformat()
+        package_id = package['id']
+        cursor.execute('''
+        INSERT OR REPLACE INTO packages
+        (id, name, location, description, duration, price, package_json, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (package_id, package['name'], package['destination'], package['description'],
+              package['duration'], package['price'], json.dumps(package), timestamp, timestamp))
+        for activity in package['activities']:
+            cursor.execute('''
+            INSERT OR REPLACE INTO activities (id, package_id, name, description, duration)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (activity['id'], package_id, activity['name'], activity['description'], activity['duration']))
+        cursor.execute('''
+        INSERT OR REPLACE INTO embeddings (package_id, created_at, vector) VALUES (?, ?, ?)
+        ''', (package_id, timestamp, np.asarray(vector, dtype=np.float32).tobytes()))
+        cursor.execute('UPDATE packages SET embedding_id = ? WHERE id = ?', (cursor.lastrowid, package_id))
+        rows += 2 + len(package['activities'])
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure bulk package ingestion into EnhancedVectorStore')
+    parser.add_argument('--packages', type=int, default=100000, help='Number of packages to ingest')
+    args = parser.parse_args()
+
+    packages = make_catalog(args.packages)
+    embedder = RandomEmbedder()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Row-by-row writes into an empty database with the same schema
+        old_db = str(Path(tmp_dir) / "per_row.db")
+        EnhancedVectorStore(db_path=old_db, index_path=str(Path(tmp_dir) / "per_row.pkl"), ollama_client=embedder)
+        store = EnhancedVectorStore(db_path=str(Path(tmp_dir) / "bulk.db"),
+                                    index_path=str(Path(tmp_dir) / "bulk.pkl"), ollama_client=embedder)
+        texts = [store._generate_text_from_package(package) for package in packages]
+        vectors = embedder.embed_batch(texts)
+
+        start_time = time.perf_counter()
+        rows = per_row_ingest(old_db, packages, texts, vectors)
+        per_row_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        report = store.bulk_add_packages(packages, texts)
+        total_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        unchanged = store.bulk_add_packages(packages, texts)
+        unchanged_elapsed = time.perf_counter() - start_time
+
+        print(f"{args.packages} packages, {rows} rows")
+        print(f"per-row execute     : {per_row_elapsed:6.2f}s ({rows / per_row_elapsed:9.0f} rows/sec)")
+        print(f"bulk executemany    : {report['write_seconds']:6.2f}s ({report['rows_per_sec']:9.0f} rows/sec), "
+              f"{report['rows']} rows including filter attributes, tags and full text")
+        print(f"bulk, end to end    : {total_elapsed:6.2f}s including texts, hashing, "
+              f"embedding ({report['embed_seconds']:.2f}s) and FAISS ({store.index.ntotal} vectors)")
+        print(f"re-import unchanged : {unchanged_elapsed:6.2f}s, {unchanged['embedded']} packages re-embedded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from src.knowledge_base.embedding_cache import EmbeddingCache
+from optimized_vector_store import OptimizedVectorStore
+from scripts.benchmark_embeddings import start_stub_server
+from scripts.benchmark_batch_search import make_packages
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def build_store(tmp_dir, name, config, cache_path, packages):
+    """Build a new store from scratch with a freshly opened cache, as after a restart."""
+    embedder = OllamaWrapper(config, embedding_cache=EmbeddingCache(cache_path))
+    store = OptimizedVectorStore(store_path=str(Path(tmp_dir) / name / "vector_store.pkl"), ollama_client=embedder)
+
+    start_time = time.perf_counter()
+    store.add_documents(packages)
+    return time.perf_counter() - start_time, embedder.embedding_cache.get_statistics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a cold catalog rebuild with one served by the embedding cache')
+    parser.add_argument('--packages', type=int, default=2000, help='Number of packages to embed')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(support_batch=True)
+    config = dict(Config.OLLAMA, base_url=base_url)
+    packages = make_packages(args.packages)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = str(Path(tmp_dir) / "embedding_cache.db")
+            cold_elapsed, _ = build_store(tmp_dir, "cold", config, cache_path, packages)
+            warm_elapsed, stats = build_store(tmp_dir, "warm", config, cache_path, packages)
+
+            print(f"{args.packages} packages")
+            print(f"cold rebuild : {cold_elapsed:.2f}s")
+            print(f"warm rebuild : {warm_elapsed:.2f}s ({stats['cache_hits']} cache hits, {stats['cache_misses']} misses)")
+            print(f"speedup      : {cold_elapsed / warm_elapsed:.1f}x")
+            print(f"cache size   : {stats['cache_bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
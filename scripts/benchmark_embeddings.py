@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Ollama embedding endpoints."""
+
+    # Simulated server-side cost per request and per embedded text (seconds)
+    request_latency = 0.002
+    text_latency = 0.0005
+    support_batch = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        if self.path == '/api/embed' and self.support_batch:
+            inputs = payload.get('input', [])
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            time.sleep(self.request_latency + self.text_latency * len(inputs))
+            body = {"embeddings": [self._vector(text) for text in inputs]}
+        elif self.path == '/api/embeddings':
+            time.sleep(self.request_latency + self.text_latency)
+            body = {"embedding": self._vector(payload.get('prompt', ''))}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            self.wfile.write(b'404 page not found')
+            return
+
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _vector(self, text):
+        rng = np.random.RandomState(sum(ord(c) for c in text))
+        vector = rng.randn(Config.EMBEDDING_DIMENSION)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(support_batch=True):
+    """Start the stub server on a free local port and return (server, base_url)."""
+    handler = type('Handler', (StubOllamaHandler,), {'support_batch': support_batch})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_case(name, base_url, texts, batch_size, concurrency):
+    """Embed texts with one wrapper configuration and report embeddings/sec."""
+    config = dict(Config.OLLAMA)
+    config.update({
+        "base_url": base_url,
+        "embedding_batch_size": batch_size,
+        "embedding_concurrency": concurrency,
+        "embedding_cache_path": None  # Measure real embedding calls
+    })
+    ollama = OllamaWrapper(config=config)
+
+    start_time = time.perf_counter()
+    matrix = ollama.embed_batch(texts)
+    elapsed = time.perf_counter() - start_time
+
+    assert matrix.shape == (len(texts), Config.EMBEDDING_DIMENSION)
+    assert matrix.dtype == np.float32
+
+    rate = len(texts) / elapsed if elapsed > 0 else float('inf')
+    print(f"{name:<40} {elapsed:8.3f}s  {rate:10.1f} embeddings/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OllamaWrapper embedding throughput against a local stub server')
+    parser.add_argument('--texts', type=int, default=500, help='Number of texts to embed')
+    parser.add_argument('--batch-size', type=int, default=Config.OLLAMA.get('embedding_batch_size', 64),
+                        help='Texts per /api/embed request')
+    parser.add_argument('--concurrency', type=int, default=Config.OLLAMA.get('embedding_concurrency', 4),
+                        help='Parallel requests when /api/embed is unavailable')
+    args = parser.parse_args()
+
+    texts = [f"Package Name: Benchmark package {i}\nDestination: City {i % 50}\n" for i in range(args.texts)]
+
+    legacy_server, legacy_url = start_stub_server(support_batch=False)
+    batch_server, batch_url = start_stub_server(support_batch=True)
+
+    try:
+        print(f"Embedding {len(texts)} texts (dimension {Config.EMBEDDING_DIMENSION})\n")
+        baseline = run_case("sequential /api/embeddings", legacy_url, texts, args.batch_size, 1)
+        concurrent = run_case(f"concurrent /api/embeddings (x{args.concurrency})", legacy_url, texts,
+                              args.batch_size, args.concurrency)
+        batched = run_case(f"batched /api/embed (batch {args.batch_size})", batch_url, texts,
+                           args.batch_size, args.concurrency)
+
+        print(f"\nSpeedup vs sequential: concurrent {concurrent / baseline:.1f}x, batched {batched / baseline:.1f}x")
+    finally:
+        legacy_server.shutdown()
+        batch_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from src.email_processing.extractor import EmailExtractor
+from src.email_processing.rule_extractor import build_gazetteer
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+OPENINGS = ["Hi,", "Hello there!", "Dear Travel Agency,", "Good morning,", ""]
+DESTINATION_PHRASES = ["we would love to visit {d}", "I'm planning a trip to {d}", "looking for packages to {d}",
+                       "we are thinking about {d}"]
+DURATION_PHRASES = [("for {n} days", 1), ("for {n} nights", 1), ("for {n} weeks", 7), ("a {n}-day trip", 1)]
+BUDGET_PHRASES = ["Our budget is ${b}.", "We can spend up to {b} dollars.", "Budget around ${b}.",
+                  "Total budget: ${b}."]
+TRAVELER_PHRASES = [("There will be {n} of us.", None), ("We are {n} adults.", None),
+                    ("It's for a family of {n}.", None), ("My wife and I are going.", 2)]
+EXTRAS = ["We love beaches and snorkeling.", "Museums and local food are a must.",
+          "Please include a hotel with a pool.", "I'm allergic to peanuts.", ""]
+OTHER_DESTINATIONS = ["Bali", "Lisbon", "Tokyo", "Cape Town", "Reykjavik"]
+
+
+def make_emails(count, catalog_destinations, seed=0):
+    """
+    Generate labeled customer emails.
+
+    Most mention a catalog destination and all four key fields; the rest leave
+    fields out or name places outside the catalog, so they need the LLM.
+    """
+    rng = random.Random(seed)
+    emails = []
+    for i in range(count):
+        labels = {}
+        parts = [rng.choice(OPENINGS)]
+
+        if rng.random() < 0.85:
+            destination = rng.choice(catalog_destinations)
+        else:
+            destination = rng.choice(OTHER_DESTINATIONS)
+        labels['destination'] = destination
+        parts.append(rng.choice(DESTINATION_PHRASES).format(d=destination))
+
+        if rng.random() < 0.9:
+            phrase, multiplier = rng.choice(DURATION_PHRASES)
+            n = rng.randint(1, 3) if multiplier == 7 else rng.randint(3, 14)
+            labels['duration'] = f"{n * multiplier} days"
+            parts[-1] += " " + phrase.format(n=n) + "."
+        else:
+            parts[-1] += "."
+
+        if rng.random() < 0.9:
+            budget = rng.randrange(1000, 12000, 250)
+            labels['budget'] = f"${budget}"
+            parts.append(rng.choice(BUDGET_PHRASES).format(b=f"{budget:,}" if rng.random() < 0.5 else budget))
+
+        if rng.random() < 0.9:
+            phrase, fixed = rng.choice(TRAVELER_PHRASES)
+            n = fixed or rng.randint(2, 6)
+            labels['num_travelers'] = str(n)
+            parts.append(phrase.format(n=n))
+
+        parts.append(rng.choice(EXTRAS))
+        emails.append((" ".join(part for part in parts if part), labels))
+    return emails
+
+
+class SimulatedLLM:
+    """Stands in for Ollama: answers extraction prompts from the labels after a fixed delay."""
+
+    def __init__(self, labels_by_email, latency):
+        self.labels_by_email = labels_by_email
+        self.latency = latency
+        self.config = Config.OLLAMA
+        self.calls = 0
+
+    def generate(self, prompt, system_prompt=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        email_text = prompt.rsplit("Email:", 1)[1].strip()
+        labels = self.labels_by_email.get(email_text, {})
+        return "\n".join(f"{field}: {labels.get(field, 'NONE')}"
+                         for field in ('destination', 'duration', 'budget', 'num_travelers'))
+
+
+def run(extractor, emails):
+    """Extract every email, returning (elapsed seconds, results)."""
+    start_time = time.perf_counter()
+    results = [extractor.extract_from_email(email_text) for email_text, _ in emails]
+    return time.perf_counter() - start_time, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how many emails the rule-based fast path resolves without the LLM')
+    parser.add_argument('--emails', type=int, default=200, help='Number of generated emails')
+    parser.add_argument('--llm-latency-ms', type=float, default=50,
+                        help='Simulated latency of one LLM extraction call')
+    parser.add_argument('--ollama', action='store_true', help='Call the configured Ollama server instead of simulating it')
+    args = parser.parse_args()
+
+    with open(project_root / "data" / "synthetic" / "enriched_travel_packages.json") as f:
+        packages = json.load(f)['packages']
+    gazetteer = build_gazetteer(packages)
+    catalog_destinations = sorted({package.get('destination') or package.get('location') for package in packages})
+
+    emails = make_emails(args.emails, catalog_destinations)
+    if args.ollama:
+        llm = OllamaWrapper()
+    else:
+        llm = SimulatedLLM({email_text: labels for email_text, labels in emails}, args.llm_latency_ms / 1000)
+
+    llm_only = EmailExtractor(ollama_client=llm, config=dict(Config.EXTRACTION, fast_path=False))
+    llm_elapsed, _ = run(llm_only, emails)
+
+    fast_path = EmailExtractor(ollama_client=llm, known_destinations=gazetteer)
+    fast_elapsed, results = run(fast_path, emails)
+    stats = fast_path.get_statistics()
+
+    # Time of the rules alone
+    rules_start = time.perf_counter()
+    for email_text, _ in emails:
+        fast_path.rules.extract(email_text)
+    rules_elapsed = time.perf_counter() - rules_start
+
+    # Accuracy of the fields the rules resolved on their own
+    checked = correct = 0
+    for (email_text, labels), result in zip(emails, results):
+        rule_fields = fast_path.rules.extract(email_text)
+        for field in fast_path.required_fields:
+            if field in rule_fields and rule_fields[field][1] >= fast_path.min_confidence:
+                checked += 1
+                key = 'travelers' if field == 'num_travelers' else field
+                correct += str(result.get(key)) == labels.get(field)
+
+    print(f"{args.emails} emails, {'Ollama' if args.ollama else f'simulated LLM at {args.llm_latency_ms:.0f} ms/call'}")
+    print(f"resolved without LLM : {stats['resolved_without_llm']} ({stats['fast_path_ratio']:.0%})")
+    print(f"LLM only             : {llm_elapsed:.2f}s ({llm_elapsed / len(emails) * 1000:.1f} ms/email)")
+    print(f"fast path + LLM      : {fast_elapsed:.2f}s ({fast_elapsed / len(emails) * 1000:.1f} ms/email)")
+    print(f"latency saved        : {(llm_elapsed - fast_elapsed) / len(emails) * 1000:.1f} ms/email "
+          f"({1 - fast_elapsed / llm_elapsed:.0%})")
+    print(f"rules alone          : {rules_elapsed / len(emails) * 1e6:.0f} us/email")
+    print(f"confident rule fields: {correct}/{checked} match the labels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from optimized_vector_store import OptimizedVectorStore
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+CONTINENTS = ["Asia", "Europe", "Africa", "North America", "South America", "Oceania"]
+ACTIVITIES = ["Snorkeling", "Hiking", "Museum tour", "Wine tasting", "Safari", "Cooking class", "Surfing"]
+
+
+class SeededEmbedder:
+    """Local embedder returning text-seeded random unit vectors, so only search cost is measured."""
+
+    config = Config.OLLAMA
+
+    def embed_batch(self, texts):
+        vectors = np.stack([
+            np.random.RandomState(abs(hash(text)) % (2 ** 32)).randn(Config.EMBEDDING_DIMENSION)
+            for text in texts
+        ]).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def get_embeddings(self, texts):
+        if isinstance(texts, str):
+            return self.embed_batch([texts])[0].tolist()
+        return self.embed_batch(texts).tolist()
+
+
+def make_packages(count, seed=7):
+    """Create synthetic packages with varied continents, prices, durations and activities."""
+    rng = np.random.RandomState(seed)
+    return [
+        {
+            "id": f"pkg-{i}",
+            "name": f"Package {i}",
+            "destination": f"Destination {i}",
+            "country": f"Country {i % 40}",
+            "continent": CONTINENTS[i % len(CONTINENTS)],
+            "price": {"amount": float(rng.randint(300, 6000)), "currency": "USD"},
+            "duration": f"{rng.randint(3, 22)} days",
+            "activities": [{"name": name} for name in rng.choice(ACTIVITIES, 2, replace=False)],
+            "description": f"Holiday package number {i}"
+        }
+        for i in range(count)
+    ]
+
+
+def run_case(store, queries, k, **search_kwargs):
+    """Return (mean latency in ms, mean number of results) for one search configuration."""
+    latencies = []
+    counts = []
+    for query in queries:
+        start_time = time.perf_counter()
+        results = store.similarity_search(query, k=k, **search_kwargs)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        counts.append(len(results))
+    return float(np.mean(latencies)), float(np.mean(counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare post-filtering with in-index metadata filters')
+    parser.add_argument('--packages', type=int, default=20000, help='Number of indexed packages')
+    parser.add_argument('--queries', type=int, default=100, help='Number of queries')
+    parser.add_argument('--k', type=int, default=5, help='Results per query')
+    args = parser.parse_args()
+
+    packages = make_packages(args.packages)
+    queries = [f"relaxing holiday idea {i}" for i in range(args.queries)]
+
+    selective = {"continent": "Asia", "price_amount": {"lt": 1500}}
+    broad = {"price_amount": {"lt": 5000}}
+
+    def selective_fn(doc):
+        return doc.get('continent') == "Asia" and doc['price']['amount'] < 1500
+
+    def broad_fn(doc):
+        return doc['price']['amount'] < 5000
+
+    print(f"{args.packages} packages, {args.queries} queries, k={args.k}\n")
+    print(f"{'index':<6} {'case':<28} {'mean ms':>9} {'results':>8}")
+
+    for index_type in ("flat", "hnsw"):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = OptimizedVectorStore(
+                store_path=str(Path(tmp_dir) / "vector_store.pkl"),
+                ollama_client=SeededEmbedder(),
+                index_config=dict(Config.VECTOR_INDEX, type=index_type)
+            )
+            store.add_documents(packages)
+
+            cases = [
+                ("unfiltered", {}),
+                ("selective, filter_fn", {"filter_fn": selective_fn}),
+                ("selective, filters", {"filters": selective}),
+                ("broad, filter_fn", {"filter_fn": broad_fn}),
+                ("broad, filters", {"filters": broad}),
+            ]
+            for name, search_kwargs in cases:
+                mean_ms, mean_results = run_case(store, queries, args.k, **search_kwargs)
+                print(f"{index_type:<6} {name:<28} {mean_ms:9.3f} {mean_results:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from optimized_vector_store import OptimizedVectorStore
+from scripts.benchmark_embeddings import start_stub_server
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+CITIES = ["Lima", "Cusco", "Kyoto", "Lisbon", "Nairobi", "Hanoi", "Reykjavik", "Cartagena", "Tbilisi", "Hobart"]
+ACTIVITIES = ["Snorkeling", "Hiking", "Museum tour", "Wine tasting", "Safari", "Cooking class", "Surfing"]
+
+
+def make_packages(count):
+    """Create synthetic packages with named destinations and activities."""
+    return [
+        {
+            "id": f"pkg-{i}",
+            "name": f"{CITIES[i % len(CITIES)]} Getaway {i}",
+            "destination": f"{CITIES[i % len(CITIES)]} {i}",
+            "duration": f"{3 + i % 10} days",
+            "price": 500 + 25 * i,
+            "activities": [ACTIVITIES[i % len(ACTIVITIES)], ACTIVITIES[(i * 3) % len(ACTIVITIES)]],
+            "description": f"Holiday package number {i}"
+        }
+        for i in range(count)
+    ]
+
+
+def time_queries(search, queries, k):
+    """Return (mean latency in ms, results) for running search over every query."""
+    results = []
+    start_time = time.perf_counter()
+    for query in queries:
+        results.append(search(query, k=k))
+    return (time.perf_counter() - start_time) * 1000 / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare dense, BM25 and hybrid search latency and keyword hit rate')
+    parser.add_argument('--packages', type=int, default=5000, help='Number of indexed packages')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--k', type=int, default=5, help='Results per query')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(support_batch=True)
+    config = dict(Config.OLLAMA, base_url=base_url, embedding_cache_path=None)  # Measure real embedding calls
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = OptimizedVectorStore(
+                store_path=str(Path(tmp_dir) / "vector_store.pkl"),
+                ollama_client=OllamaWrapper(config)
+            )
+            store.add_documents(make_packages(args.packages))
+
+            # Keyword queries name one destination; a hit is a result at that destination
+            targets = [CITIES[i % len(CITIES)] for i in range(args.queries)]
+            keyword_queries = [f"{city} {ACTIVITIES[i % len(ACTIVITIES)].lower()}" for i, city in enumerate(targets)]
+            long_queries = [f"destination: {city} type: beach vacation seaside budget: $2000" for city in targets]
+
+            print(f"{args.packages} packages, {args.queries} queries, k={args.k}\n")
+            print(f"{'query':<8} {'search':<8} {'mean ms':>9} {'top-1 hits':>11}")
+            for name, queries in (("keyword", keyword_queries), ("long", long_queries)):
+                for search_name, search in (("dense", store.similarity_search),
+                                            ("bm25", store.keyword_search),
+                                            ("hybrid", store.hybrid_search)):
+                    mean_ms, results = time_queries(search, queries, args.k)
+                    hits = np.mean([
+                        bool(result) and result[0][0]['destination'].startswith(city)
+                        for result, city in zip(results, targets)
+                    ])
+                    print(f"{name:<8} {search_name:<8} {mean_ms:9.3f} {hits:11.2%}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
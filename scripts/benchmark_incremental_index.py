@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from src.knowledge_base.enhanced_vector_store import EnhancedVectorStore
+from scripts.benchmark_embeddings import start_stub_server
+from scripts.benchmark_batch_search import make_packages
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def time_adds(store, packages):
+    """Add packages one at a time, returning the median latency in ms and the texts embedded."""
+    embedded_before = store.embedded_texts
+    latencies = []
+    for package in packages:
+        start_time = time.perf_counter()
+        assert store.add_package(package)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(latencies), store.embedded_texts - embedded_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure EnhancedVectorStore add-one latency as the catalog grows')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 8000], help='Catalog sizes')
+    parser.add_argument('--adds', type=int, default=5, help='Packages added (and updated) one at a time per size')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(support_batch=True)
+    config = dict(Config.OLLAMA, base_url=base_url, embedding_cache_path=None)  # Measure real embedding calls
+
+    print(f"{'catalog':>8} {'add one':>10} {'update one':>11} {'unchanged':>10} {'embedded':>9} {'full re-embed':>14}")
+    try:
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = EnhancedVectorStore(
+                    db_path=str(Path(tmp_dir) / "travel_data.db"),
+                    index_path=str(Path(tmp_dir) / "faiss_index.pkl"),
+                    ollama_client=OllamaWrapper(config)
+                )
+                catalog = make_packages(size + args.adds)
+                store.add_packages(catalog[:size])
+
+                add_ms, added = time_adds(store, catalog[size:])
+                updated = [dict(package, description=package['description'] + " Now with breakfast.")
+                           for package in catalog[:args.adds]]
+                update_ms, updated_count = time_adds(store, updated)
+                unchanged_ms, unchanged_count = time_adds(store, catalog[args.adds:2 * args.adds])
+                assert store.index.ntotal - store.stale_ids == size + args.adds
+
+                # What every add cost before: embedding the whole catalog again
+                texts = [store._generate_text_from_package(package) for package in catalog]
+                start_time = time.perf_counter()
+                store.embedder.embed_batch(texts)
+                reembed_ms = (time.perf_counter() - start_time) * 1000
+
+                print(f"{size:>8} {add_ms:>8.1f}ms {update_ms:>9.1f}ms {unchanged_ms:>8.1f}ms "
+                      f"{added + updated_count + unchanged_count:>9} {reembed_ms:>12.1f}ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.knowledge_base.index_factory import build_index, search_parameters
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def make_dataset(num_vectors, num_queries, dimension, num_clusters=200, seed=42):
+    """Create clustered unit vectors, roughly like embeddings of a package catalog."""
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(num_clusters, dimension).astype(np.float32)
+
+    def sample(n):
+        points = centers[rng.randint(num_clusters, size=n)] + 0.5 * rng.randn(n, dimension).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(num_vectors), sample(num_queries)
+
+
+def measure(index, queries, k, ground_truth=None, **overrides):
+    """Search one query at a time; return (recall@k, mean latency in ms, p99 latency in ms)."""
+    params = search_parameters(index, **overrides)
+    latencies = []
+    found = []
+
+    for query in queries:
+        start_time = time.perf_counter()
+        _, indices = index.search(query.reshape(1, -1), k, params=params)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        found.append(indices[0])
+
+    found = np.array(found)
+    if ground_truth is None:
+        recall = 1.0
+    else:
+        hits = sum(len(set(row) & set(truth)) for row, truth in zip(found, ground_truth))
+        recall = hits / ground_truth.size
+
+    return recall, float(np.mean(latencies)), float(np.percentile(latencies, 99)), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare recall and latency of the configurable FAISS index types')
+    parser.add_argument('--vectors', type=int, default=50000, help='Number of indexed vectors')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--dimension', type=int, default=Config.EMBEDDING_DIMENSION, help='Vector dimension')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+    args = parser.parse_args()
+
+    vectors, queries = make_dataset(args.vectors, args.queries, args.dimension)
+    print(f"{args.vectors} vectors, {args.queries} queries, dimension {args.dimension}, k={args.k}\n")
+    print(f"{'index':<10} {'setting':<14} {'build s':>8} {'recall':>8} {'mean ms':>9} {'p99 ms':>9}")
+
+    sweeps = {
+        "flat": [{}],
+        "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128, 256)],
+        "ivf_flat": [{"nprobe": n} for n in (1, 4, 8, 16, 32)],
+        "ivf_pq": [{"nprobe": n} for n in (1, 4, 8, 16, 32)],
+    }
+
+    ground_truth = None
+    for index_type, settings in sweeps.items():
+        index_config = dict(Config.VECTOR_INDEX, type=index_type)
+
+        start_time = time.perf_counter()
+        index = build_index(vectors, args.dimension, index_config)
+        build_time = time.perf_counter() - start_time
+
+        for overrides in settings:
+            recall, mean_ms, p99_ms, found = measure(index, queries, args.k, ground_truth, **overrides)
+            if index_type == "flat":
+                ground_truth = found
+            setting = ", ".join(f"{key}={value}" for key, value in overrides.items()) or "exact"
+            print(f"{index_type:<10} {setting:<14} {build_time:8.2f} {recall:8.3f} {mean_ms:9.3f} {p99_ms:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
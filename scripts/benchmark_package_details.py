@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from optimized_vector_store import OptimizedVectorStore
+from enhanced_proposal_generator import ProposalGenerator
+from response_caching_system import DestinationCache
+from src.knowledge_base.package_details import details_path
+from scripts.benchmark_filtered_search import SeededEmbedder
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def make_catalog(count):
+    """Independent copies of the enriched catalog's packages under distinct IDs."""
+    with open(project_root / "data" / "processed" / "all_packages.json", 'r') as f:
+        source = json.load(f)['packages']
+    return [dict(json.loads(json.dumps(source[i % len(source)])), id=f"{source[i % len(source)]['id']}-{i}")
+            for i in range(count)]
+
+
+def prompt_additions(generator, packages):
+    """Build the enrichment part of a proposal prompt, returning (text, ms)."""
+    start_time = time.perf_counter()
+    enriched_data = generator._extract_enriched_data(packages)
+    text = generator._format_enriched_data_for_prompt("Lima", enriched_data)
+    return text, (time.perf_counter() - start_time) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure hot package documents against fully enriched ones')
+    parser.add_argument('--packages', type=int, default=1000, help='Number of stored packages')
+    parser.add_argument('--proposals', type=int, default=200, help='Proposal prompts to build')
+    args = parser.parse_args()
+
+    packages = make_catalog(args.packages)
+    embedder = SeededEmbedder()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_path = str(Path(tmp_dir) / "vector_store.pkl")
+        store = OptimizedVectorStore(store_path=store_path, ollama_client=embedder)
+        store.add_documents([dict(package) for package in packages])
+
+        full_bytes = len(pickle.dumps(packages))
+        hot_bytes = len(pickle.dumps(store.documents))
+        print(f"{args.packages} packages")
+        print(f"pickled documents     : {full_bytes / 1024:10.0f} KB -> {hot_bytes / 1024:8.0f} KB "
+              f"({full_bytes / hot_bytes:.0f}x smaller)")
+        print(f"store file            : {os.path.getsize(store_path) / 1024:10.0f} KB, "
+              f"details in {os.path.getsize(details_path(store_path)) / 1024:.0f} KB loaded on demand")
+
+        # Destination cache entries hold the retrieved packages
+        cache = DestinationCache(cache_dir=str(Path(tmp_dir) / "destinations"))
+        top = store.documents[:3]
+        full_entry = len(json.dumps({'name': "Lima", 'packages': packages[:3]}))
+        cache.cache_destination_data("Lima", {'name': "Lima", 'packages': top})
+        hot_entry = len(json.dumps(cache.get_destination_data("Lima")))
+        print(f"destination entry     : {full_entry / 1024:10.1f} KB -> {hot_entry / 1024:8.1f} KB")
+
+        # Proposal prompts from inline enrichment and from detail store slices
+        inline = ProposalGenerator(ollama_client=embedder)
+        lazy = ProposalGenerator(ollama_client=embedder, detail_store=store.detail_store)
+        inline_ms = []
+        lazy_ms = []
+        for i in range(args.proposals):
+            rows = [(3 * i + n) % args.packages for n in range(3)]
+            inline_text, elapsed = prompt_additions(inline, [packages[row] for row in rows])
+            inline_ms.append(elapsed)
+            lazy_text, elapsed = prompt_additions(lazy, [store.documents[row] for row in rows])
+            lazy_ms.append(elapsed)
+            assert inline_text == lazy_text
+        print(f"prompt enrichment     : {np.mean(inline_ms):10.3f} ms inline, {np.mean(lazy_ms):.3f} ms from "
+              f"detail store slices (identical prompts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper
+from src.knowledge_base.enhanced_vector_store import EnhancedVectorStore
+from scripts.benchmark_embeddings import start_stub_server
+from scripts.benchmark_batch_search import make_packages, make_queries
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+class PerRowStore(EnhancedVectorStore):
+    """Hydrates search results the way search used to: one connection and query per hit."""
+
+    def _get_packages(self, package_ids):
+        packages = {}
+        for package_id in package_ids:
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.cursor()
+            cursor.execute('SELECT package_json FROM packages WHERE id = ?', (package_id,))
+            result = cursor.fetchone()
+            conn.close()
+            if result:
+                packages[package_id] = json.loads(result[0])
+        return packages
+
+
+def measure(store, queries, k, clear_cache=False):
+    """Run every query once, returning (p50, p99) search latency in ms."""
+    latencies = []
+    for query in queries:
+        if clear_cache:
+            store.package_cache.clear()
+        start_time = time.perf_counter()
+        results = store.search(query, k=k)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        assert len(results) == k
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure EnhancedVectorStore search latency against k')
+    parser.add_argument('--packages', type=int, default=2000, help='Number of stored packages')
+    parser.add_argument('--queries', type=int, default=200, help='Searches per measurement')
+    parser.add_argument('--payload-kb', type=int, default=20,
+                        help='Size of an extra field per package, like the enrichment data of real packages')
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 5, 20, 50], help='Results per search')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(support_batch=True)
+    config = dict(Config.OLLAMA, base_url=base_url, embedding_cache_path=None)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            packages = [dict(package, destination_guide="x" * (args.payload_kb * 1024))
+                        for package in make_packages(args.packages)]
+            paths = dict(db_path=str(Path(tmp_dir) / "travel_data.db"),
+                         index_path=str(Path(tmp_dir) / "faiss_index.pkl"))
+            store = EnhancedVectorStore(ollama_client=OllamaWrapper(config), **paths)
+            store.add_packages(packages)
+            per_row = PerRowStore(ollama_client=store.embedder, **paths)
+
+            # Embed the queries once so only the search and hydration are timed
+            queries = make_queries(args.queries)
+            for query in queries:
+                store.search(query, k=1)
+                per_row.query_cache.put(query, store.query_cache.get(query))
+
+            print(f"{args.packages} packages with {args.payload_kb} KB payloads, {args.queries} searches, p50 / p99 ms")
+            print(f"{'k':>4} {'per-row connect':>18} {'one IN query':>18} {'IN query + LRU':>18}")
+            for k in args.k:
+                old = measure(per_row, queries, k)
+                cold = measure(store, queries, k, clear_cache=True)
+                measure(store, queries, k)  # Fill the package cache
+                warm = measure(store, queries, k)
+                print(f"{k:>4} " + " ".join(f"{p50:>8.2f} / {p99:>7.2f}" for p50, p99 in (old, cold, warm)))
+            store.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.config import Config
+from src.knowledge_base.enhanced_vector_store import EnhancedVectorStore
+from src.knowledge_base.index_factory import normalize_vectors
+from scripts.benchmark_filtered_search import SeededEmbedder, make_packages
+
+# Set up logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def run_case(store, queries, k, truth, search):
+    """Return (mean latency in ms, mean results, recall@k against exact filtered search)."""
+    latencies = []
+    counts = []
+    recalls = []
+    for query in queries:
+        start_time = time.perf_counter()
+        results = search(query)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        counts.append(len(results))
+        expected = truth[query]
+        if expected:
+            recalls.append(len({package['id'] for package in results} & expected) / len(expected))
+    return float(np.mean(latencies)), float(np.mean(counts)), float(np.mean(recalls)) if recalls else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare search-then-filter with SQLite pre-filtering')
+    parser.add_argument('--packages', type=int, default=20000, help='Number of stored packages')
+    parser.add_argument('--queries', type=int, default=100, help='Number of queries')
+    parser.add_argument('--k', type=int, default=5, help='Results per query')
+    parser.add_argument('--overfetch', type=int, default=10,
+                        help='Candidates per result fetched by search-then-filter')
+    args = parser.parse_args()
+
+    packages = make_packages(args.packages)
+    queries = [f"relaxing holiday idea {i}" for i in range(args.queries)]
+    embedder = SeededEmbedder()
+
+    cases = [
+        ("selective", {"continent": "Asia", "price_amount": {"lt": 1500}},
+         lambda p: p['continent'] == "Asia" and p['price']['amount'] < 1500),
+        ("broad", {"price_amount": {"lt": 5000}},
+         lambda p: p['price']['amount'] < 5000),
+        ("tags + duration", {"tags": {"all": ["snorkeling", "surfing"]}, "duration_days": {"lte": 7}},
+         lambda p: {"Snorkeling", "Surfing"} <= {a['name'] for a in p['activities']}
+         and int(p['duration'].split()[0]) <= 7),
+    ]
+
+    print(f"{args.packages} packages, {args.queries} queries, k={args.k}\n")
+    print(f"{'index':<6} {'case':<46} {'mean ms':>9} {'results':>8} {'recall':>7}")
+
+    for index_type in ("flat", "hnsw"):
+        Config.VECTOR_INDEX["type"] = index_type
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = EnhancedVectorStore(db_path=str(Path(tmp_dir) / "travel_data.db"),
+                                        index_path=str(Path(tmp_dir) / "faiss_index.pkl"),
+                                        ollama_client=embedder)
+            report = store.bulk_add_packages(packages)
+            if index_type == "flat":
+                print(f"ingest: {report['rows']} rows in {report['write_seconds']:.2f}s with tags and full text\n")
+
+            # Ground truth: exact top k over the matching packages
+            vectors = normalize_vectors(embedder.embed_batch(
+                [store._generate_text_from_package(package) for package in packages]))
+            query_vectors = normalize_vectors(embedder.embed_batch(queries))
+            for query, query_vector in zip(queries, query_vectors):
+                store.query_cache.put(query, query_vector)
+
+            for name, filters, predicate in cases:
+                rows = np.array([i for i, package in enumerate(packages) if predicate(package)])
+                truth = {}
+                for query, query_vector in zip(queries, query_vectors):
+                    scores = vectors[rows] @ query_vector
+                    truth[query] = {packages[i]['id'] for i in rows[np.argsort(-scores)[:args.k]]}
+
+                def post_filter(query):
+                    candidates = store.search(query, k=args.k * args.overfetch)
+                    return [package for package in candidates if predicate(package)][:args.k]
+
+                def pre_filter(query):
+                    return store.search(query, k=args.k, filters=filters)
+
+                label = f"{name} ({len(rows)} match)"
+                for method, search in (("search-then-filter", post_filter), ("SQL pre-filter", pre_filter)):
+                    mean_ms, mean_results, recall = run_case(store, queries, args.k, truth, search)
+                    print(f"{index_type:<6} {label + ', ' + method:<46} {mean_ms:9.3f} {mean_results:8.2f} {recall:7.2f}")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
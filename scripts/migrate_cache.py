@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from response_caching_system import SQLiteBackend
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import JSON cache files into the SQLite cache backend')
+    parser.add_argument('cache_dirs', nargs='*', metavar='CACHE_DIR',
+                        default=[str(project_root / "cache" / "responses"), str(project_root / "cache" / "destinations")],
+                        help='Cache directories to migrate (defaults to cache/responses and cache/destinations)')
+    args = parser.parse_args()
+
+    failed = 0
+    for cache_dir in args.cache_dirs:
+        if not Path(cache_dir).is_dir():
+            logger.warning(f"Skipping {cache_dir}: not a directory")
+            continue
+        backend = SQLiteBackend(Path(cache_dir))
+        counts = backend.import_json_files()
+        print(f"{cache_dir}: {counts['imported']} imported, {counts['expired']} expired and "
+              f"{counts['failed']} failed files left in place")
+        failed += counts['failed']
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,13 @@
 import os
 import sys
 import json
+import asyncio
 import logging
+from typing import Optional
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 # Define project_root
 project_root = Path(__file__).resolve().parent.parent.parent  # Go up three levels from app.py
@@ -21,14 +24,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import components
-from src.generation.llm_wrapper import OllamaWrapper
+from src.config import Config
+from src.generation.llm_wrapper import AsyncOllamaWrapper
 from src.email_processing.extractor import EmailExtractor
+from src.email_processing.rule_extractor import build_gazetteer
 from src.retrieval.retriever import Retriever
 
 # Enhanced components
 from enhanced_proposal_generator import ProposalGenerator
 from optimized_vector_store import OptimizedVectorStore 
-from response_caching_system import ResponseCache, DestinationCache
+from response_caching_system import ResponseCache, DestinationCache, SingleFlight
 from rag_evaluation_metrics import RAGEvaluator
 import time
 
@@ -36,12 +41,19 @@ import time
 _vector_store = None
 _retriever = None
 _proposal_generator = None
+_extractor = None
+
+# Shared async Ollama client so all requests reuse one connection pool
+async_ollama = AsyncOllamaWrapper()
 
 # Initialize caching and evaluation
 response_cache = ResponseCache(cache_dir=str(project_root / "cache" / "responses"))
 destination_cache = DestinationCache(cache_dir=str(project_root / "cache" / "destinations"))
 evaluator = RAGEvaluator(metrics_dir=str(project_root / "metrics"))
 
+# Identical emails arriving while one is being processed share its result
+email_single_flight = SingleFlight()
+
 # Create FastAPI app
 app = FastAPI(title="Travel RAG API")
 
@@ -58,12 +70,11 @@ app.add_middleware(
 # Replace the startup_event function with this enhanced version
 @app.on_event("startup")
 async def startup_event():
-    global _vector_store, _retriever, _proposal_generator
+    global _vector_store, _retriever, _proposal_generator, _extractor
     
     try:
         # Check if Ollama is running
-        ollama = OllamaWrapper()
-        ollama.generate("Test", "Test connection")
+        await async_ollama.generate("Test", "Test connection")
         logger.info("Successfully connected to Ollama")
         
         # Load travel packages
@@ -76,7 +87,8 @@ async def startup_event():
         
         # Initialize enhanced vector store
         vector_store = OptimizedVectorStore(
-            store_path=str(project_root / "data" / "embeddings" / "optimized_vector_store.pkl")
+            store_path=str(project_root / "data" / "embeddings" / "optimized_vector_store.pkl"),
+            async_ollama_client=async_ollama
         )
         
         # Check if vector store has documents
@@ -88,12 +100,14 @@ async def startup_event():
         else:
             logger.info("Loaded existing vector store")
         
-        # Create retriever and proposal generator
+        # Create extractor, retriever and proposal generator
+        extractor = EmailExtractor(async_ollama_client=async_ollama, known_destinations=build_gazetteer(packages))
         retriever = Retriever(vector_store)
-        proposal_generator = ProposalGenerator()
+        proposal_generator = ProposalGenerator(async_ollama_client=async_ollama, detail_store=vector_store.detail_store)
         
         # Store components in app state
         app.state.vector_store = vector_store
+        app.state.extractor = extractor
         app.state.retriever = retriever
         app.state.proposal_generator = proposal_generator
         app.state.response_cache = response_cache
@@ -102,6 +116,7 @@ async def startup_event():
         
         # Also store in global variables as fallback
         _vector_store = vector_store
+        _extractor = extractor
         _retriever = retriever
         _proposal_generator = proposal_generator
         
@@ -110,11 +125,86 @@ async def startup_event():
         logger.error(f"Error initializing Travel RAG API: {e}")
         logger.error("Will attempt to initialize components on-demand when endpoints are called")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Release pooled connections to Ollama
+    await async_ollama.aclose()
+
 # Add a simple home route
 @app.get("/")
 async def root():
     return {"message": "Welcome to Travel RAG API", "status": "online"}
 
+def _get_extractor():
+    """Get the shared email extractor - app state first, then globals, then a new one."""
+    if hasattr(app.state, 'extractor') and app.state.extractor is not None:
+        return app.state.extractor
+    if _extractor is not None:
+        return _extractor
+    return EmailExtractor(async_ollama_client=async_ollama)
+
+def _get_retriever():
+    """Get the shared retriever - app state first, then globals, then a new one."""
+    if hasattr(app.state, 'retriever') and app.state.retriever is not None:
+        logger.info("Using retriever from app state")
+        return app.state.retriever
+    if _retriever is not None:
+        logger.info("Using retriever from global variable")
+        return _retriever
+    
+    # Create a new retriever as a last resort
+    logger.info("Creating new retriever instance")
+    vector_store = OptimizedVectorStore(async_ollama_client=async_ollama)
+    if not vector_store.get_documents():
+        # Load packages
+        packages_path = project_root / "data" / "synthetic" / "travel_packages.json"
+        with open(packages_path, 'r') as f:
+            data = json.load(f)
+            packages = data.get('packages', [])
+        
+        # Add packages to vector store
+        vector_store.add_documents(packages)
+    
+    return Retriever(vector_store)
+
+def _get_proposal_generator():
+    """Get the shared proposal generator - app state first, then globals, then a new one."""
+    if hasattr(app.state, 'proposal_generator') and app.state.proposal_generator is not None:
+        return app.state.proposal_generator
+    if _proposal_generator is not None:
+        return _proposal_generator
+    vector_store = _vector_store or getattr(app.state, 'vector_store', None)
+    return ProposalGenerator(async_ollama_client=async_ollama,
+                             detail_store=vector_store.detail_store if vector_store else None)
+
+def _format_packages(packages):
+    """Format package info for API responses."""
+    formatted_packages = []
+    for package in packages:
+        formatted_packages.append({
+            "name": package.get("name", ""),
+            "location": package.get("location", ""),
+            "duration": package.get("duration", ""),
+            "price": package.get("price", 0),
+            "activities": package.get("activities", []),
+            "description": package.get("description", "")
+        })
+    return formatted_packages
+
+def _cache_result(email_text, extracted_info, query, packages, result):
+    """Store a finished result in the response cache and its destination in the destination cache."""
+    # Cache the result
+    response_cache.put(email_text, result)
+    
+    # Cache destination data
+    if extracted_info.get('destination'):
+        destination = extracted_info.get('destination')
+        destination_cache.cache_destination_data(destination, {
+            'name': destination,
+            'packages': packages,
+            'query': query
+        })
+
 # Replace the process_email endpoint with this enhanced version
 @app.post("/api/process-email")
 async def process_email(request: Request):
@@ -126,85 +216,342 @@ async def process_email(request: Request):
         if not email_text:
             raise HTTPException(status_code=400, detail="Email text is required")
             
-        # Try cache first
-        cached_result = response_cache.get(email_text)
+        # Try cache first; SQLite and file I/O run in worker threads so the event loop never blocks
+        cached_result = await asyncio.to_thread(response_cache.get, email_text)
         if cached_result:
             logger.info("Using cached response")
             return cached_result
         
-        start_time = time.time()
+        # Concurrent identical emails wait for the one already being processed
+        return await email_single_flight.run(
+            response_cache.generate_key(email_text),
+            lambda: _process_uncached_email(email_text)
+        )
+    except Exception as e:
+        logger.error(f"Error processing email: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _process_uncached_email(email_text):
+    """Run extraction, retrieval and generation for an email missing from the exact cache."""
+    start_time = time.time()
+    
+    # Process the email
+    extracted_info = await _get_extractor().extract_from_email_async(email_text)
+    
+    # A near-identical request (same normalized fields) reuses its proposal
+    semantic_result = await asyncio.to_thread(response_cache.get_semantic, extracted_info)
+    if semantic_result:
+        logger.info("Using semantically cached response")
+        await asyncio.to_thread(response_cache.put, email_text, semantic_result)
+        return semantic_result
+    
+    # Evaluate extraction
+    extraction_eval = await asyncio.to_thread(evaluator.evaluate_extraction, email_text, extracted_info)
+    
+    # Retrieve relevant packages - try app state first, then globals
+    try:
+        retriever = _get_retriever()
+            
+        # Build query and retrieve packages
+        query = retriever.build_query(extracted_info)
+        packages = await retriever.retrieve_relevant_packages_async(query, top_k=3)
         
-        # Process the email
-        extractor = EmailExtractor()
-        extracted_info = extractor.extract_from_email(email_text)
+        # Evaluate retrieval
+        retrieval_eval = await asyncio.to_thread(evaluator.evaluate_retrieval, query, packages)
         
-        # Evaluate extraction
-        extraction_eval = evaluator.evaluate_extraction(email_text, extracted_info)
+        # Generate proposal
+        generation_start = time.time()
+        proposal = await _get_proposal_generator().generate_proposal_async(extracted_info, packages)
+        generation_time = time.time() - generation_start
         
-        # Retrieve relevant packages - try app state first, then globals
-        try:
-            if hasattr(app.state, 'retriever') and app.state.retriever is not None:
-                retriever = app.state.retriever
-                logger.info("Using retriever from app state")
-            elif _retriever is not None:
-                retriever = _retriever
-                logger.info("Using retriever from global variable")
-            else:
-                # Create a new retriever as a last resort
-                logger.info("Creating new retriever instance")
-                vector_store = OptimizedVectorStore()
-                if not vector_store.get_documents():
-                    # Load packages
-                    packages_path = project_root / "data" / "synthetic" / "travel_packages.json"
-                    with open(packages_path, 'r') as f:
-                        data = json.load(f)
-                        packages = data.get('packages', [])
-                    
-                    # Add packages to vector store
-                    vector_store.add_documents(packages)
+        # Evaluate generation
+        generation_eval = await asyncio.to_thread(evaluator.evaluate_generation, extracted_info, packages, proposal)
+        
+        # Evaluate end-to-end
+        total_time = time.time() - start_time
+        end_to_end_eval = await asyncio.to_thread(evaluator.evaluate_end_to_end, email_text, proposal, total_time)
+        
+        # Prepare result
+        result = {
+            "extracted_info": extracted_info,
+            "query": query,
+            "packages": _format_packages(packages),
+            "proposal": proposal,
+            "timings": {
+                "extraction_ms": (generation_start - start_time) * 1000,
+                "generation_ms": generation_time * 1000,
+                "total_ms": total_time * 1000
+            },
+            "metrics": {
+                "extraction_score": extraction_eval["metrics"].get("extraction_completeness", 0),
+                "generation_score": generation_eval["metrics"].get("quality_score", 0)
+            }
+        }
+        
+        await asyncio.to_thread(_cache_result, email_text, extracted_info, query, packages, result)
+        
+        return result
+    except Exception as e:
+        logger.error(f"Error in retrieval or proposal generation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch variant of process_email
+@app.post("/api/process-emails")
+async def process_emails(request: Request):
+    """
+    Process a list of emails in one request.
+    
+    The body is {"emails": [...]}, each item an email string or {"id": ..., "email": ...}.
+    Emails found in the response cache, or repeated within the batch, are not
+    processed again. The rest are extracted concurrently, their queries embedded
+    in one batch and searched together, and their proposals generated with at
+    most Config.BATCH["generate_workers"] running at once.
+    
+    Returns:
+        dict: "results" with one entry per email in request order (id, status
+            "cached", "processed" or "error", result or error, per-item timings),
+            "timings" of each stage for the whole batch and a "summary" of counts
+    """
+    data = await request.json()
+    emails = data.get("emails")
+    
+    if not isinstance(emails, list) or not emails:
+        raise HTTPException(status_code=400, detail="A non-empty list of emails is required")
+    max_emails = Config.BATCH.get("api_max_emails", 100)
+    if len(emails) > max_emails:
+        raise HTTPException(status_code=400, detail=f"At most {max_emails} emails can be processed per request")
+    
+    batch_start = time.time()
+    batch_timings = {}
+    
+    # One job per distinct email; items repeating an email share its job
+    items = []
+    jobs = {}
+    for position, email in enumerate(emails):
+        if isinstance(email, dict):
+            item_id, email_text = email.get("id", position), email.get("email") or email.get("body")
+        else:
+            item_id, email_text = position, email
+        item = {"id": item_id}
+        if not isinstance(email_text, str) or not email_text.strip():
+            item.update(status="error", error="Email text is required")
+        else:
+            key = response_cache.generate_key(email_text)
+            item["job"] = jobs.setdefault(key, {"email": email_text, "status": None, "timings": {}})
+        items.append(item)
+    
+    # Cache lookups
+    stage_start = time.time()
+    pending = []
+    for job in jobs.values():
+        cached_result = await asyncio.to_thread(response_cache.get, job["email"])
+        if cached_result:
+            job.update(status="cached", result=cached_result)
+        else:
+            pending.append(job)
+    batch_timings["cache_ms"] = (time.time() - stage_start) * 1000
+    
+    # Concurrent extraction
+    stage_start = time.time()
+    extractor = _get_extractor()
+    extract_limit = asyncio.Semaphore(Config.BATCH.get("extract_workers", 4))
+    
+    async def extract(job):
+        async with extract_limit:
+            job_start = time.time()
+            try:
+                job["extracted_info"] = await extractor.extract_from_email_async(job["email"])
+            except Exception as e:
+                logger.error(f"Error extracting batch email: {e}")
+                job.update(status="error", error=str(e))
+            job["timings"]["extraction_ms"] = (time.time() - job_start) * 1000
+    
+    await asyncio.gather(*(extract(job) for job in pending))
+    
+    # Near-identical requests (same normalized fields) reuse their proposal
+    to_retrieve = []
+    for job in pending:
+        if job["status"] == "error":
+            continue
+        semantic_result = await asyncio.to_thread(response_cache.get_semantic, job["extracted_info"])
+        if semantic_result:
+            await asyncio.to_thread(response_cache.put, job["email"], semantic_result)
+            job.update(status="cached", result=semantic_result)
+        else:
+            job["extraction_eval"] = await asyncio.to_thread(
+                evaluator.evaluate_extraction, job["email"], job["extracted_info"])
+            to_retrieve.append(job)
+    batch_timings["extraction_ms"] = (time.time() - stage_start) * 1000
+    
+    # One batched query embedding and one multi-query search for every remaining email
+    stage_start = time.time()
+    retriever = _get_retriever()
+    try:
+        package_lists = await retriever.retrieve_many_async([job["extracted_info"] for job in to_retrieve], top_k=3)
+    except Exception as e:
+        logger.error(f"Error retrieving packages for batch: {e}")
+        package_lists = None
+        for job in to_retrieve:
+            job.update(status="error", error=str(e))
+    retrieval_ms = (time.time() - stage_start) * 1000
+    batch_timings["retrieval_ms"] = retrieval_ms
+    
+    to_generate = []
+    if package_lists is not None:
+        for job, packages in zip(to_retrieve, package_lists):
+            job["query"] = retriever.build_query(job["extracted_info"])
+            job["packages"] = packages
+            job["timings"]["retrieval_ms"] = retrieval_ms
+            await asyncio.to_thread(evaluator.evaluate_retrieval, job["query"], packages)
+            to_generate.append(job)
+    
+    # Generation, bounded so a large batch cannot monopolize the LLM
+    stage_start = time.time()
+    proposal_generator = _get_proposal_generator()
+    generate_limit = asyncio.Semaphore(Config.BATCH.get("generate_workers", 4))
+    
+    async def generate(job):
+        async with generate_limit:
+            generation_start = time.time()
+            try:
+                extracted_info, packages = job["extracted_info"], job["packages"]
+                proposal = await proposal_generator.generate_proposal_async(extracted_info, packages)
+                generation_time = time.time() - generation_start
                 
-                retriever = Retriever(vector_store)
+                generation_eval = await asyncio.to_thread(
+                    evaluator.evaluate_generation, extracted_info, packages, proposal)
+                timings = job["timings"]
+                timings["generation_ms"] = generation_time * 1000
+                timings["total_ms"] = timings["extraction_ms"] + timings["retrieval_ms"] + timings["generation_ms"]
+                await asyncio.to_thread(
+                    evaluator.evaluate_end_to_end, job["email"], proposal, timings["total_ms"] / 1000)
                 
-            # Build query and retrieve packages
-            query = retriever.build_query(extracted_info)
-            packages = retriever.retrieve_relevant_packages(query, top_k=3)
+                result = {
+                    "extracted_info": extracted_info,
+                    "query": job["query"],
+                    "packages": _format_packages(packages),
+                    "proposal": proposal,
+                    "timings": dict(timings),
+                    "metrics": {
+                        "extraction_score": job["extraction_eval"]["metrics"].get("extraction_completeness", 0),
+                        "generation_score": generation_eval["metrics"].get("quality_score", 0)
+                    }
+                }
+                await asyncio.to_thread(_cache_result, job["email"], extracted_info, job["query"], packages, result)
+                job.update(status="processed", result=result)
+            except Exception as e:
+                logger.error(f"Error generating proposal for batch email: {e}")
+                job.update(status="error", error=str(e))
+    
+    await asyncio.gather(*(generate(job) for job in to_generate))
+    batch_timings["generation_ms"] = (time.time() - stage_start) * 1000
+    batch_timings["total_ms"] = (time.time() - batch_start) * 1000
+    
+    # Results in request order
+    results = []
+    for item in items:
+        job = item.pop("job", None)
+        if job is not None:
+            item["status"] = job["status"]
+            if job["status"] == "error":
+                item["error"] = job.get("error", "")
+            else:
+                item["result"] = job["result"]
+            item["timings"] = job["timings"]
+        results.append(item)
+    
+    statuses = [job["status"] for job in jobs.values()]
+    summary = {
+        "emails": len(items),
+        "unique_emails": len(jobs),
+        "cached": statuses.count("cached"),
+        "processed": statuses.count("processed"),
+        "failed": sum(1 for item in results if item["status"] == "error")
+    }
+    logger.info(f"Processed batch of {summary['emails']} emails ({summary['unique_emails']} unique, "
+                f"{summary['cached']} cached, {summary['failed']} failed) in {batch_timings['total_ms']:.0f} ms")
+    
+    return {"results": results, "timings": batch_timings, "summary": summary}
+
+def _sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Streaming variant of process_email using Server-Sent Events
+@app.post("/api/process-email/stream")
+async def process_email_stream(request: Request):
+    """
+    Process an email and stream the result as Server-Sent Events.
+    
+    Events are sent in order: extracted_info, packages, any number of token
+    events carrying proposal text, then done (timings and metrics) or error.
+    Only results that end with done are cached; after an error, the tokens
+    already sent are an incomplete proposal.
+    """
+    data = await request.json()
+    email_text = data.get("email", "")
+    
+    if not email_text:
+        raise HTTPException(status_code=400, detail="Email text is required")
+    
+    async def event_stream():
+        # Replay cached results through the same event sequence
+        cached_result = await asyncio.to_thread(response_cache.get, email_text)
+        if cached_result:
+            logger.info("Using cached response")
+            yield _sse_event("extracted_info", cached_result.get("extracted_info", {}))
+            yield _sse_event("packages", {"query": cached_result.get("query", ""),
+                                          "packages": cached_result.get("packages", [])})
+            yield _sse_event("token", {"text": cached_result.get("proposal", "")})
+            yield _sse_event("done", {"cached": True,
+                                      "timings": cached_result.get("timings", {}),
+                                      "metrics": cached_result.get("metrics", {})})
+            return
+        
+        try:
+            start_time = time.time()
             
-            # Evaluate retrieval
-            retrieval_eval = evaluator.evaluate_retrieval(query, packages)
+            # Process the email
+            extracted_info = await _get_extractor().extract_from_email_async(email_text)
+            yield _sse_event("extracted_info", extracted_info)
             
-            # Get or create proposal generator
-            if hasattr(app.state, 'proposal_generator') and app.state.proposal_generator is not None:
-                proposal_generator = app.state.proposal_generator
-            elif _proposal_generator is not None:
-                proposal_generator = _proposal_generator
-            else:
-                proposal_generator = ProposalGenerator()
+            # A near-identical request (same normalized fields) reuses its proposal
+            semantic_result = await asyncio.to_thread(response_cache.get_semantic, extracted_info)
+            if semantic_result:
+                logger.info("Using semantically cached response")
+                await asyncio.to_thread(response_cache.put, email_text, semantic_result)
+                yield _sse_event("packages", {"query": semantic_result.get("query", ""),
+                                              "packages": semantic_result.get("packages", [])})
+                yield _sse_event("token", {"text": semantic_result.get("proposal", "")})
+                yield _sse_event("done", {"cached": True,
+                                          "timings": semantic_result.get("timings", {}),
+                                          "metrics": semantic_result.get("metrics", {})})
+                return
             
-            # Generate proposal
+            extraction_eval = await asyncio.to_thread(evaluator.evaluate_extraction, email_text, extracted_info)
+            
+            # Build query and retrieve packages
+            retriever = _get_retriever()
+            query = retriever.build_query(extracted_info)
+            packages = await retriever.retrieve_relevant_packages_async(query, top_k=3)
+            retrieval_eval = await asyncio.to_thread(evaluator.evaluate_retrieval, query, packages)
+            formatted_packages = _format_packages(packages)
+            yield _sse_event("packages", {"query": query, "packages": formatted_packages})
+            
+            # Stream the proposal as it is generated
             generation_start = time.time()
-            proposal = proposal_generator.generate_proposal(extracted_info, packages)
+            chunks = []
+            async for chunk in _get_proposal_generator().generate_proposal_stream_async(extracted_info, packages):
+                chunks.append(chunk)
+                yield _sse_event("token", {"text": chunk})
+            proposal = "".join(chunks)
             generation_time = time.time() - generation_start
             
-            # Evaluate generation
-            generation_eval = evaluator.evaluate_generation(extracted_info, packages, proposal)
-            
-            # Evaluate end-to-end
+            # Evaluate generation and end-to-end
+            generation_eval = await asyncio.to_thread(evaluator.evaluate_generation, extracted_info, packages, proposal)
             total_time = time.time() - start_time
-            end_to_end_eval = evaluator.evaluate_end_to_end(email_text, proposal, total_time)
-            
-            # Format package info for response
-            formatted_packages = []
-            for package in packages:
-                formatted_packages.append({
-                    "name": package.get("name", ""),
-                    "location": package.get("location", ""),
-                    "duration": package.get("duration", ""),
-                    "price": package.get("price", 0),
-                    "activities": package.get("activities", []),
-                    "description": package.get("description", "")
-                })
+            end_to_end_eval = await asyncio.to_thread(evaluator.evaluate_end_to_end, email_text, proposal, total_time)
             
-            # Prepare result
             result = {
                 "extracted_info": extracted_info,
                 "query": query,
@@ -221,47 +568,47 @@ async def process_email(request: Request):
                 }
             }
             
-            # Cache the result
-            response_cache.put(email_text, result)
-            
-            # Cache destination data
-            if extracted_info.get('destination'):
-                destination = extracted_info.get('destination')
-                destination_cache.cache_destination_data(destination, {
-                    'name': destination,
-                    'packages': packages,
-                    'query': query
-                })
+            await asyncio.to_thread(_cache_result, email_text, extracted_info, query, packages, result)
             
-            return result
+            yield _sse_event("done", {"cached": False,
+                                      "timings": result["timings"],
+                                      "metrics": result["metrics"]})
         except Exception as e:
-            logger.error(f"Error in retrieval or proposal generation: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error processing email: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+            logger.error(f"Error streaming email processing: {e}")
+            yield _sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Add this new endpoint for stats
 @app.get("/api/stats")
 async def get_stats():
     try:
-        # Get statistics about the system
-        stats = {
+        # Get statistics about the system; cache counts read SQLite, so off the event loop
+        stats = await asyncio.to_thread(lambda: {
             "cache": {
                 "response_cache": {
-                    "total_entries": len(response_cache.cache),
-                    "memory_usage_kb": sys.getsizeof(response_cache.cache) / 1024
+                    "total_entries": len(response_cache),
+                    "memory_entries": len(response_cache.cache),
+                    "memory_usage_kb": response_cache.memory_bytes / 1024,
+                    **response_cache.get_hit_statistics()
                 },
                 "destination_cache": {
-                    "total_entries": len(destination_cache.destinations),
+                    "total_entries": len(destination_cache),
                     "destinations": destination_cache.get_all_destinations()
                 }
             },
+            "request_coalescing": email_single_flight.get_statistics(),
+            "extraction": _extractor.get_statistics() if _extractor else {},
             "vector_store": {
-                "documents": len(_vector_store.get_documents()) if _vector_store else 0
+                "documents": len(_vector_store.get_documents()) if _vector_store else 0,
+                "query_embedding_cache": _vector_store.query_cache.get_statistics() if _vector_store else {}
             },
             "performance": evaluator.get_summary_report() if hasattr(evaluator, "get_summary_report") else {}
-        }
+        })
         
         return stats
     except Exception as e:
@@ -275,11 +622,11 @@ async def get_destinations():
         destinations = []
         
         # If we have cached destinations, use those
-        if destination_cache and destination_cache.destinations:
-            destinations = destination_cache.get_all_destinations()
+        if destination_cache is not None:
+            destinations = await asyncio.to_thread(destination_cache.get_all_destinations)
         
         # If we don't have cached destinations but have the vector store
-        elif _vector_store:
+        if not destinations and _vector_store:
             # Extract unique destinations from packages
             packages = _vector_store.get_documents()
             unique_destinations = set()
@@ -304,7 +651,7 @@ async def get_destination(destination_id: str):
         destination_data = None
         
         if destination_cache:
-            destination_data = destination_cache.get_destination_data(destination_id)
+            destination_data = await asyncio.to_thread(destination_cache.get_destination_data, destination_id)
         
         if destination_data:
             return {"destination": destination_data}
@@ -332,4 +679,24 @@ async def get_destination(destination_id: str):
         logger.error(f"Error getting destination {destination_id}: {e}")
         if isinstance(e, HTTPException):
             raise e
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Add an endpoint to get the enrichment data kept out of package documents
+@app.get("/api/packages/{package_id}/details")
+async def get_package_details(package_id: str, fields: Optional[str] = None):
+    """
+    Get the destination guide, weather and local info of a package.
+    
+    Args:
+        package_id: Package ID
+        fields: Optional comma-separated field names (all if omitted)
+    """
+    if not _vector_store:
+        raise HTTPException(status_code=503, detail="Vector store not initialized")
+    
+    field_names = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    details = await asyncio.to_thread(_vector_store.get_document_details, package_id, field_names)
+    if not details and _vector_store.get_document_by_id(package_id) is None:
+        raise HTTPException(status_code=404, detail="Package not found")
+    
+    return {"package_id": package_id, "details": details}
@@ -23,9 +23,97 @@ class Config:
         "embedding_model": "nomic-embed-text",
         "generation_model": "llama3.2",
         "temperature": 0.7,
-        "max_tokens": 1024
+        "max_tokens": 1024,
+        "embedding_batch_size": 64,   # Texts per /api/embed request
+        "embedding_concurrency": 4,   # Parallel requests when /api/embed is unavailable
+        "async_max_connections": 20,  # Connection pool size for AsyncOllamaWrapper
+        "embedding_cache_path": "data/embeddings/embedding_cache.db",  # Persistent embedding cache (None disables it)
+        "embedding_cache_max_mb": 512  # Least recently used embeddings are evicted beyond this size
     }
     
+    # FAISS index used by the vector stores. "flat" is exact search; "hnsw",
+    # "ivf_flat" and "ivf_pq" trade some recall for speed on large catalogs.
+    VECTOR_INDEX = {
+        "type": "flat",
+        "hnsw_m": 32,             # HNSW graph neighbours per node
+        "ef_construction": 200,   # HNSW build-time search depth
+        "ef_search": 64,          # HNSW query-time search depth (overridable per query)
+        "nlist": 100,             # IVF cells (capped by training set size)
+        "nprobe": 8,              # IVF cells visited per query (overridable per query)
+        "pq_m": 16,               # IVF-PQ sub-quantizers, must divide EMBEDDING_DIMENSION
+        "pq_bits": 8,             # IVF-PQ bits per sub-quantizer code
+        "compaction_threshold": 0.2,  # Compact once removed/replaced vectors exceed this fraction of live ones
+        "exact_filter_max_rows": 2048  # Filtered searches matching at most this many rows are scored exactly
+    }
+
+    # How the retriever searches packages: "dense" (embeddings only), "keyword"
+    # (BM25 only, no embedding call) or "hybrid" (both, fused by reciprocal rank)
+    RETRIEVAL = {
+        "mode": "hybrid",
+        "rrf_k": 60,                  # Reciprocal-rank fusion constant
+        "bm25_k1": 1.2,               # BM25 term frequency saturation
+        "bm25_b": 0.75,               # BM25 document length normalization
+        "keyword_query_max_terms": 3  # Hybrid queries this short whose words are all indexed skip the embedding
+    }
+
+    # In-memory cache of query embeddings used by the vector stores' searches
+    QUERY_EMBEDDING_CACHE = {
+        "max_size": 1024,     # Cached queries before the least recently used is evicted
+        "ttl_seconds": 3600   # Seconds before a cached query embedding is fetched again
+    }
+
+    # In-memory LRU of decoded packages in front of EnhancedVectorStore's SQLite lookups
+    PACKAGE_CACHE = {
+        "max_size": 2048  # Packages kept before the least recently used is evicted
+    }
+
+    # Bulky enrichment fields kept out of the package documents that are searched,
+    # pickled and cached; they live in a SQLite file next to the vector store
+    # and proposals load only the slices they use
+    PACKAGE_DETAILS = {
+        "fields": ["destination_guide", "weather_data", "local_info"],
+        "guide_excerpt_chars": 500  # Destination guide characters included in proposal prompts
+    }
+
+    # Semantic tier of the response cache: requests whose extracted fields match
+    # after normalization reuse the cached proposal. Every field a proposal
+    # depends on belongs here, or customers get each other's dates or lose
+    # their allergy handling
+    SEMANTIC_CACHE = {
+        "enabled": True,
+        "fields": ["destination", "duration", "budget", "travelers", "travel_type",
+                   "dates", "allergy", "hotel_pref", "flight_pref", "optional_details"],
+        "budget_bands": [500, 1000, 2000, 3500, 5000, 7500, 10000, 15000]  # Budgets in the same band match
+    }
+
+    # Email extraction: a rule-based fast path (regexes plus a gazetteer of catalog
+    # destinations) runs first and the LLM is only asked for what it could not resolve
+    EXTRACTION = {
+        "fast_path": True,
+        "min_confidence": 0.8,  # Rule matches below this are re-extracted by the LLM
+        "required_fields": ["destination", "duration", "budget", "num_travelers"]  # Skip the LLM once all are confident
+    }
+
+    # Batch processing: src/main.py --batch (workers per pipeline stage) and
+    # /api/process-emails (extract_workers and generate_workers bound its concurrency)
+    BATCH = {
+        "extract_workers": 4,
+        "retrieve_workers": 8,
+        "generate_workers": 4,
+        "queue_size": 32,        # Jobs waiting between two stages
+        "checkpoint_every": 10,  # Results written between fsyncs of the output file
+        "api_max_emails": 100    # Largest batch accepted by /api/process-emails
+    }
+
+    # Storage of the response and destination caches: "sqlite" (one WAL database
+    # per cache directory, entries read lazily by key) or "json" (one file per entry)
+    CACHE_BACKEND = "sqlite"
+
+    # Entries the response cache keeps in memory in front of its storage
+    RESPONSE_CACHE = {
+        "max_memory_mb": 64  # Budget for the serialized size of in-memory entries
+    }
+
     # ADD THESE NEW CONFIGURATIONS:
     
     # Database path for enhanced vector store
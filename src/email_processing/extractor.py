@@ -1,16 +1,63 @@
 import re
 import json
 import logging
-from src.generation.llm_wrapper import OllamaWrapper
+from src.config import Config
+from src.generation.llm_wrapper import OllamaWrapper, AsyncOllamaWrapper
+from src.email_processing.rule_extractor import RuleBasedExtractor
 
 logger = logging.getLogger(__name__)
 
+# Fields the LLM is asked for, with their line in the extraction prompt
+PROMPT_FIELDS = [
+    ('travel_date', "[extract dates or NONE if not mentioned]"),
+    ('destination', "[extract destination or NONE if not mentioned]"),
+    ('travel_type', "[extract type of travel (vacation, business, honeymoon, etc.) or NONE if not mentioned]"),
+    ('duration', "[extract duration in days or NONE if not mentioned]"),
+    ('budget', "$[extract budget amount or NONE if not mentioned]"),
+    ('num_travelers', "[extract number of travelers or NONE if not mentioned]"),
+    ('optional_details', "[extract any other relevant details like preferences, requirements, etc.]"),
+    ('hotel_pref', "[extract hotel preferences or NONE if not mentioned]"),
+    ('flight_pref', "[extract flight preferences or NONE if not mentioned]"),
+    ('allergy', "[extract any allergies or NONE if not mentioned]"),
+]
+
+# Keys of the extracted information set from each prompt field
+RESULT_KEYS = {
+    'travel_date': ['dates', 'travel_date'],
+    'num_travelers': ['travelers', 'num_travelers'],
+    'optional_details': ['optional_details', 'interests'],
+}
+
 class EmailExtractor:
     """Extract structured information from customer emails."""
     
-    def __init__(self, ollama_client=None):
-        """Initialize the email extractor."""
+    def __init__(self, ollama_client=None, async_ollama_client=None, known_destinations=None, config=None):
+        """
+        Initialize the email extractor.
+        
+        Args:
+            ollama_client: Synchronous Ollama client
+            async_ollama_client: Async Ollama client
+            known_destinations: Place names the rule-based fast path recognizes as
+                destinations, usually build_gazetteer(packages)
+            config: Extraction settings (defaults to Config.EXTRACTION)
+        """
         self.ollama = ollama_client or OllamaWrapper()
+        self.async_ollama = async_ollama_client
+        
+        # Rule-based fast path; the LLM is only asked for what it cannot resolve
+        self.config = config or Config.EXTRACTION
+        self.min_confidence = self.config.get("min_confidence", 0.8)
+        self.required_fields = self.config.get("required_fields", [])
+        self.rules = RuleBasedExtractor(known_destinations) if self.config.get("fast_path", True) else None
+        
+        self.emails_processed = 0
+        self.resolved_without_llm = 0
+    
+    def set_known_destinations(self, known_destinations):
+        """Replace the destinations recognized by the rule-based fast path."""
+        if self.rules is not None:
+            self.rules.set_destinations(known_destinations)
     
     def extract_from_email(self, email_text):
         """
@@ -22,52 +69,154 @@ class EmailExtractor:
         Returns:
             dict: Extracted information (destination, dates, travelers, budget, interests)
         """
+        rule_fields = self._extract_with_rules(email_text)
+        llm_fields = self._fields_for_llm(email_text, rule_fields)
+        if not llm_fields:
+            return self._combine(rule_fields, "")
+        
+        try:
+            # LLM extraction of the fields the rules did not resolve
+            response = self.ollama.generate(self._build_extraction_prompt(email_text, llm_fields))
+            return self._combine(rule_fields, response)
+        except Exception as e:
+            logger.error(f"Error extracting information from email: {e}")
+            return self._combine(rule_fields, None)
+    
+    async def extract_from_email_async(self, email_text):
+        """
+        Async variant of extract_from_email that does not block the event loop.
+        
+        Args:
+            email_text: The raw email text
+            
+        Returns:
+            dict: Extracted information (destination, dates, travelers, budget, interests)
+        """
+        rule_fields = self._extract_with_rules(email_text)
+        llm_fields = self._fields_for_llm(email_text, rule_fields)
+        if not llm_fields:
+            return self._combine(rule_fields, "")
+        
+        if self.async_ollama is None:
+            self.async_ollama = AsyncOllamaWrapper(self.ollama.config)
+        
+        try:
+            # LLM extraction of the fields the rules did not resolve
+            response = await self.async_ollama.generate(self._build_extraction_prompt(email_text, llm_fields))
+            return self._combine(rule_fields, response)
+        except Exception as e:
+            logger.error(f"Error extracting information from email: {e}")
+            return self._combine(rule_fields, None)
+    
+    def _extract_with_rules(self, email_text):
+        """Run the rule-based fast path. Returns prompt field -> (value, confidence)."""
+        self.emails_processed += 1
+        if self.rules is None:
+            return {}
+        return self.rules.extract(email_text)
+    
+    def _fields_for_llm(self, email_text, rule_fields):
+        """
+        Decide which fields to ask the LLM for.
+        
+        The LLM is skipped only when every required field was resolved confidently
+        and the email mentions none of the fields the rules cannot extract
+        themselves (hotel, flight and allergy details, special requirements, dates
+        in formats the rules do not know).
+        
+        Args:
+            email_text: The raw email text
+            rule_fields: Result of the rule-based fast path
+            
+        Returns:
+            list: Prompt fields the rules did not resolve confidently, or an empty
+                list if the LLM can be skipped
+        """
+        confident = {field for field, (_, confidence) in rule_fields.items()
+                     if confidence >= self.min_confidence}
+        if self.rules is not None and all(field in confident for field in self.required_fields):
+            if not self.rules.mentioned_fields(email_text) - confident:
+                self.resolved_without_llm += 1
+                return []
+        return [field for field, _ in PROMPT_FIELDS if field not in confident]
+    
+    def _combine(self, rule_fields, response):
+        """
+        Merge the rule-based fields into the parsed LLM response.
+        
+        Confident rule values win; weaker ones only fill fields the LLM left empty.
+        
+        Args:
+            rule_fields: Result of the rule-based fast path
+            response: Raw LLM response, "" if the LLM was skipped or None if it failed
+            
+        Returns:
+            dict: Extracted information
+        """
+        extracted = self._empty_extraction() if response is None else self._process_llm_response(response)
+        
+        for field, (value, confidence) in rule_fields.items():
+            keys = RESULT_KEYS.get(field, [field])
+            if confidence >= self.min_confidence or extracted.get(keys[0]) is None:
+                for key in keys:
+                    extracted[key] = value
+        
+        return extracted
+    
+    def get_statistics(self):
+        """Get statistics about how often the LLM was skipped."""
+        return {
+            'emails_processed': self.emails_processed,
+            'resolved_without_llm': self.resolved_without_llm,
+            'llm_calls': self.emails_processed - self.resolved_without_llm,
+            'fast_path_ratio': self.resolved_without_llm / self.emails_processed if self.emails_processed > 0 else 0
+        }
+    
+    def _build_extraction_prompt(self, email_text, fields=None):
+        """
+        Build the LLM prompt used to extract structured information.
+        
+        Args:
+            email_text: The raw email text
+            fields: Prompt fields to ask for (defaults to all of them)
+        """
         # Using LLM to extract structured information in a consistent format
-        prompt = f"""
+        format_lines = "\n        ".join(f"{field}: {description}" for field, description in PROMPT_FIELDS
+                                         if fields is None or field in fields)
+        return f"""
         Extract the following information from this customer email for a travel agency.
         
         Format the output in this exact format:
-        travel_date: [extract dates or NONE if not mentioned]
-        destination: [extract destination or NONE if not mentioned]
-        travel_type: [extract type of travel (vacation, business, honeymoon, etc.) or NONE if not mentioned]
-        duration: [extract duration in days or NONE if not mentioned]
-        budget: $[extract budget amount or NONE if not mentioned]
-        num_travelers: [extract number of travelers or NONE if not mentioned]
-        optional_details: [extract any other relevant details like preferences, requirements, etc.]
-        hotel_pref: [extract hotel preferences or NONE if not mentioned]
-        flight_pref: [extract flight preferences or NONE if not mentioned]
-        allergy: [extract any allergies or NONE if not mentioned]
+        {format_lines}
 
         Email:
         {email_text}
         """
-        
-        try:
-            # LLM extraction
-            response = self.ollama.generate(prompt)
+    
+    def _process_llm_response(self, response):
+        """Turn the raw LLM response into the extracted information dict."""
+        # Parse the structured output
+        extracted_data = self._parse_structured_output(response)
             
-            # Parse the structured output
-            extracted_data = self._parse_structured_output(response)
-                
-            # Add 'interests' key for compatibility with existing code
-            if 'optional_details' in extracted_data and extracted_data['optional_details'] != 'NONE':
-                extracted_data['interests'] = extracted_data['optional_details']
-            else:
-                extracted_data['interests'] = None
-                
-            return extracted_data
+        # Add 'interests' key for compatibility with existing code
+        if 'optional_details' in extracted_data and extracted_data['optional_details'] != 'NONE':
+            extracted_data['interests'] = extracted_data['optional_details']
+        else:
+            extracted_data['interests'] = None
             
-        except Exception as e:
-            logger.error(f"Error extracting information from email: {e}")
-            return {
-                'destination': None,
-                'travel_date': None,
-                'travelers': None,
-                'budget': None,
-                'interests': None,
-                'duration': None,
-                'travel_type': None
-            }
+        return extracted_data
+    
+    def _empty_extraction(self):
+        """Result returned when extraction fails."""
+        return {
+            'destination': None,
+            'travel_date': None,
+            'travelers': None,
+            'budget': None,
+            'interests': None,
+            'duration': None,
+            'travel_type': None
+        }
     
     def _parse_structured_output(self, response):
         """
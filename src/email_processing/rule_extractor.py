@@ -0,0 +1,296 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'fourteen': 14, 'fifteen': 15, 'twenty': 20, 'thirty': 30
+}
+_NUMBER = r'(\d+|' + '|'.join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r')'
+
+_DURATION = re.compile(r'\b' + _NUMBER + r'[\s-]*(day|night|week|fortnight)s?\b', re.IGNORECASE)
+_WEEKEND = re.compile(r'\b(long\s+)?weekend\b', re.IGNORECASE)
+
+_BUDGET_AMOUNT = re.compile(
+    r'(?:([$€£])\s?(\d[\d,]*(?:\.\d+)?)\s*(k\b)?'
+    r'|\b(\d[\d,]*(?:\.\d+)?)\s*(k\b)?\s*(dollars|usd|euros?|eur|pounds|gbp)\b)',
+    re.IGNORECASE
+)
+# Currency word -> the symbol budgets are reported with
+CURRENCY_SYMBOLS = {'dollars': '$', 'usd': '$', 'euro': '€', 'euros': '€', 'eur': '€', 'pounds': '£', 'gbp': '£'}
+_BUDGET_CONTEXT = re.compile(r'\b(budget|spend|up to|under|around|about|max(imum)?|no more than|afford|total)\b',
+                             re.IGNORECASE)
+_PER_PERSON = re.compile(r'\s*(per|a|each)\s+(person|head|traveler|traveller|night|day)\b', re.IGNORECASE)
+
+_TRAVELERS = re.compile(
+    r'\b' + _NUMBER + r'\s+(?:of\s+us|people|persons|travell?ers|adults|guests|friends|pax)\b'
+    r'|\b(?:family|group|party)\s+of\s+' + _NUMBER + r'\b',
+    re.IGNORECASE
+)
+_COUPLE = re.compile(r'\b(my|our)\s+(wife|husband|partner|fianc[eé]e?|girlfriend|boyfriend|spouse)\s+and\s+(i|me)\b'
+                     r'|\b(couple|honeymoon|the two of us|both of us)\b', re.IGNORECASE)
+_SOLO = re.compile(r'\b(solo|by myself|on my own|just me|alone)\b', re.IGNORECASE)
+
+_MONTHS = ('january|february|march|april|may|june|july|august|september|october|november|december|'
+           'jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec')
+_DATE = re.compile(
+    r'\b(?:(?:early|mid|late)[\s-]+)?(?:' + _MONTHS + r')\b\.?(?:\s+\d{1,2}(?:st|nd|rd|th)?\b)?(?:,?\s+\d{4})?'
+    r'(?:\s*(?:-|to|until|through)\s*(?:(?:' + _MONTHS + r')\b\.?\s+)?\d{1,2}(?:st|nd|rd|th)?\b(?:,?\s+\d{4})?)?'
+    r'|\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b'
+    r'|\b(?:next|this)\s+(?:spring|summer|fall|autumn|winter|month|year)\b',
+    re.IGNORECASE
+)
+
+# Keyword -> travel type, checked in order
+TRAVEL_TYPES = [
+    ('honeymoon', 'honeymoon'),
+    ('business', 'business'),
+    ('family', 'family vacation'),
+    ('anniversary', 'romantic getaway'),
+    ('romantic', 'romantic getaway'),
+    ('safari', 'adventure'),
+    ('adventure', 'adventure'),
+    ('skiing', 'ski trip'),
+    ('ski', 'ski trip'),
+    ('beach', 'beach vacation'),
+    ('cruise', 'cruise'),
+    ('vacation', 'vacation'),
+    ('holiday', 'vacation'),
+]
+_TRAVEL_TYPE = re.compile(r'\b(' + '|'.join(keyword for keyword, _ in TRAVEL_TYPES) + r')s?\b', re.IGNORECASE)
+
+INTEREST_KEYWORDS = [
+    'beach', 'mountain', 'hiking', 'city', 'museum', 'culture', 'history', 'food', 'wine',
+    'safari', 'wildlife', 'diving', 'snorkeling', 'skiing', 'nightlife', 'shopping', 'spa',
+    'relaxation', 'adventure', 'nature', 'architecture', 'art', 'kids'
+]
+_INTEREST = re.compile(r'\b(' + '|'.join(INTEREST_KEYWORDS) + r')(?:s|es)?\b', re.IGNORECASE)
+
+# Words suggesting an email mentions a field the rules cannot extract in full:
+# hotel, flight and allergy details are never extracted, special requirements
+# only as interest keywords and dates only in the formats _DATE knows
+DETAIL_CUES = {
+    'hotel_pref': re.compile(
+        r'\b(hotels?|resorts?|accommodations?|lodging|rooms?|suites?|villas?|hostels?|apartments?|airbnb|'
+        r'b&b|bed and breakfast|all[\s-]inclusive|\d[\s-]star|(?:sea|ocean|city) view|pool)\b', re.IGNORECASE),
+    'flight_pref': re.compile(
+        r'\b(flights?|fly|flying|airlines?|airports?|economy|business class|first class|direct|non[\s-]?stop|'
+        r'layovers?|stopovers?|(?:window|aisle) seats?|red[\s-]eye)\b', re.IGNORECASE),
+    'allergy': re.compile(
+        r'\b(allerg\w*|intoleran\w*|gluten|celiac|coeliac|lactose|dairy|nuts?|peanuts?|shellfish|'
+        r'vegan|vegetarian|halal|kosher|dietary|diabetic|epipen)\b', re.IGNORECASE),
+    'optional_details': re.compile(
+        r'\b(wheelchair|accessib\w*|mobility|disab\w*|special (?:requests?|needs?|occasion)|require\w*|'
+        r'prefer\w*|birthday|anniversary|pets?|dogs?|infants?|bab(?:y|ies)|toddlers?|strollers?|cribs?|'
+        r'elderly|pregnan\w*)\b', re.IGNORECASE),
+    'travel_date': re.compile(
+        r'\b(' + _MONTHS.replace('may|', '') + r'|christmas|easter|new year\'?s?|thanksgiving|'
+        r'dates?|depart\w*|arriv\w*|\d{1,2}(?:st|nd|rd|th))\b', re.IGNORECASE),
+}
+
+
+def _to_number(token):
+    """Convert a digit string or number word to an int."""
+    token = token.lower()
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def build_gazetteer(packages):
+    """
+    Collect destination and country names from a package catalog.
+
+    Args:
+        packages: Package dictionaries
+
+    Returns:
+        set: Place names, e.g. "Rome, Italy" contributes "Rome, Italy", "Rome" and "Italy",
+            and "New York City" also "New York"
+    """
+    names = set()
+    for package in packages or []:
+        for field in ('destination', 'location', 'country'):
+            value = package.get(field)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            for part in [value] + value.split(','):
+                part = part.strip()
+                if part:
+                    names.add(part)
+                    if part.endswith(' City'):
+                        names.add(part[:-len(' City')])
+    return names
+
+
+class RuleBasedExtractor:
+    """
+    Deterministic extraction of travel fields with compiled regular expressions.
+
+    Destinations are matched against a gazetteer of known place names; duration,
+    budget, traveler count, dates, travel type and interests against fixed
+    patterns. Every field comes with a confidence score in [0, 1]: a single
+    unambiguous match scores high, conflicting or weakly supported matches score
+    low so the caller can ask the LLM instead.
+    """
+
+    def __init__(self, known_destinations=None):
+        """
+        Initialize the extractor.
+
+        Args:
+            known_destinations: Place names to recognize as destinations (see build_gazetteer)
+        """
+        self.set_destinations(known_destinations or [])
+
+    def set_destinations(self, known_destinations):
+        """Replace the gazetteer of known destinations and recompile its pattern."""
+        # Lowercase name -> catalog spelling
+        self.destinations = {name.lower(): name for name in known_destinations if name}
+        if self.destinations:
+            # Longest names first so "New York City" wins over "New York"
+            alternatives = sorted(self.destinations, key=len, reverse=True)
+            self._destination_pattern = re.compile(
+                r'\b(' + '|'.join(re.escape(name) for name in alternatives) + r')\b', re.IGNORECASE
+            )
+        else:
+            self._destination_pattern = None
+
+    def extract(self, email_text):
+        """
+        Extract travel fields from an email.
+
+        Args:
+            email_text: The raw email text
+
+        Returns:
+            dict: Field name in the LLM extraction format (destination, duration,
+                budget, num_travelers, travel_date, travel_type, optional_details)
+                -> (value, confidence), for the fields that were found
+        """
+        fields = {}
+        for field, extract in (
+            ('destination', self._extract_destination),
+            ('duration', self._extract_duration),
+            ('budget', self._extract_budget),
+            ('num_travelers', self._extract_travelers),
+            ('travel_date', self._extract_date),
+            ('travel_type', self._extract_travel_type),
+            ('optional_details', self._extract_interests),
+        ):
+            try:
+                match = extract(email_text)
+            except Exception as e:
+                logger.error(f"Error extracting {field} with rules: {e}")
+                match = None
+            if match is not None:
+                fields[field] = match
+        return fields
+
+    def mentioned_fields(self, email_text):
+        """
+        Find the fields an email seems to mention that the rules cannot fully extract.
+
+        Args:
+            email_text: The raw email text
+
+        Returns:
+            set: Field names in the LLM extraction format (hotel_pref, flight_pref,
+                allergy, optional_details, travel_date) whose cue words appear
+        """
+        return {field for field, pattern in DETAIL_CUES.items() if pattern.search(email_text)}
+
+    def _extract_destination(self, text):
+        if self._destination_pattern is None:
+            return None
+        matches = {self.destinations[m.group(1).lower()] for m in self._destination_pattern.finditer(text)}
+        if not matches:
+            return None
+
+        # A country next to one of its cities ("Rome, Italy") is the same destination
+        names = sorted(matches, key=len, reverse=True)
+        distinct = [name for name in names
+                    if not any(name != other and name.lower() in other.lower() for other in names)]
+        if len(distinct) == 1:
+            return distinct[0], 0.95
+        return names[0], 0.4
+
+    def _extract_duration(self, text):
+        days = set()
+        for number, unit in _DURATION.findall(text):
+            count = _to_number(number)
+            unit = unit.lower()
+            if unit == 'week':
+                count *= 7
+            elif unit == 'fortnight':
+                count *= 14
+            days.add(count)
+        if not days:
+            weekend = _WEEKEND.search(text)
+            if weekend:
+                return ("4 days" if weekend.group(1) else "2 days"), 0.7
+            return None
+        if len(days) == 1:
+            count = days.pop()
+            return f"{count} day{'s' if count != 1 else ''}", 0.9
+        return f"{max(days)} days", 0.5
+
+    def _extract_budget(self, text):
+        amounts = []
+        for m in _BUDGET_AMOUNT.finditer(text):
+            number = (m.group(2) or m.group(4)).replace(',', '')
+            amount = float(number) * (1000 if (m.group(3) or m.group(5)) else 1)
+            symbol = m.group(1) or CURRENCY_SYMBOLS[m.group(6).lower()]
+            # Per-person or per-night prices are not the trip budget
+            per_unit = _PER_PERSON.match(text, m.end()) is not None
+            context = _BUDGET_CONTEXT.search(text, max(0, m.start() - 40), m.start()) is not None
+            amounts.append((symbol, amount, per_unit, context))
+        if not amounts:
+            return None
+
+        distinct = {(symbol, amount) for symbol, amount, _, _ in amounts}
+        symbol, amount, per_unit, context = amounts[0]
+        # Keep the currency the customer used, "4000 euros" is not $4000
+        value = f"{symbol}{amount:.0f}"
+        if len(distinct) > 1 or per_unit:
+            return value, 0.4
+        return value, 0.9 if context else 0.8
+
+    def _extract_travelers(self, text):
+        counts = set()
+        for m in _TRAVELERS.finditer(text):
+            counts.add(_to_number(m.group(1) or m.group(2)))
+        if len(counts) == 1:
+            return str(counts.pop()), 0.9
+        if counts:
+            return str(max(counts)), 0.4
+        if _COUPLE.search(text):
+            return "2", 0.85
+        if _SOLO.search(text):
+            return "1", 0.8
+        return None
+
+    def _extract_date(self, text):
+        matches = [m.group(0).strip() for m in _DATE.finditer(text)]
+        # "May" is also a verb; only trust it with a day or year attached
+        matches = [m for m in matches if m.lower() != 'may']
+        if not matches:
+            return None
+        return matches[0], 0.85 if len(set(matches)) == 1 else 0.5
+
+    def _extract_travel_type(self, text):
+        found = {keyword.lower() for keyword in _TRAVEL_TYPE.findall(text)}
+        for keyword, travel_type in TRAVEL_TYPES:
+            if keyword in found:
+                return travel_type, 0.8
+        return None
+
+    def _extract_interests(self, text):
+        found = []
+        for keyword in _INTEREST.findall(text):
+            if keyword.lower() not in found:
+                found.append(keyword.lower())
+        if not found:
+            return None
+        # Keywords only, so the LLM's free-text summary is preferred when it runs
+        return ', '.join(found), 0.5
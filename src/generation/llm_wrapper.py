@@ -1,11 +1,19 @@
 import requests
+import httpx
+import asyncio
 import json
 import numpy as np
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from src.config import Config
+from src.knowledge_base.embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
+class OllamaStreamError(RuntimeError):
+    """Raised when a streamed generation fails or ends before Ollama reports it done."""
+
 class LLMWrapper:
     def __init__(self):
         self.model = None
@@ -23,32 +31,52 @@ class LLMWrapper:
 class OllamaWrapper:
     """Wrapper for the Ollama API to handle generation and embeddings."""
     
-    def __init__(self, config=None):
-        """Initialize the Ollama wrapper with configuration."""
+    def __init__(self, config=None, embedding_cache=None):
+        """
+        Initialize the Ollama wrapper with configuration.
+        
+        Args:
+            config: Ollama settings (defaults to Config.OLLAMA)
+            embedding_cache: Optional EmbeddingCache; by default the process-wide cache
+                at config["embedding_cache_path"] is used, if one is configured
+        """
         self.config = config or Config.OLLAMA
         self.base_url = self.config["base_url"]
         self.gen_model = self.config["generation_model"]
         self.embed_model = self.config["embedding_model"]
         self.temperature = self.config["temperature"]
         self.max_tokens = self.config["max_tokens"]
+        self.embed_batch_size = self.config.get("embedding_batch_size", 64)
+        self.embed_concurrency = self.config.get("embedding_concurrency", 4)
+        
+        # Pooled session so repeated calls reuse TCP connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.embed_concurrency, 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # None until the first batch call tells us whether /api/embed exists
+        self._batch_endpoint_available = None
+        
+        # Persistent embeddings shared by every store and query embedding through the same file
+        self.embedding_cache = embedding_cache
+        if self.embedding_cache is None and self.config.get("embedding_cache_path"):
+            try:
+                self.embedding_cache = EmbeddingCache.shared(
+                    self.config["embedding_cache_path"],
+                    max_bytes=self.config.get("embedding_cache_max_mb", 512) * 1024 * 1024
+                )
+            except Exception as e:
+                logger.error(f"Error opening embedding cache, embedding without it: {e}")
     
     def generate(self, prompt, system_prompt=None):
         """Generate text using Ollama API."""
         try:
             url = f"{self.base_url}/api/generate"
-            payload = {
-                "model": self.gen_model,
-                "prompt": prompt,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-                "stream": False  # Explicitly disable streaming to get a complete response
-            }
-            
-            if system_prompt:
-                payload["system"] = system_prompt
+            payload = self._build_generate_payload(prompt, system_prompt)
             
             logger.debug(f"Sending request to Ollama generate API: {url}")
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             
             if response.status_code != 200:
                 logger.error(f"Ollama API returned status code {response.status_code}: {response.text}")
@@ -56,7 +84,7 @@ class OllamaWrapper:
                 if response.status_code == 404:
                     logger.warning(f"Model {self.gen_model} not found, trying llama2 as fallback...")
                     payload["model"] = "llama2"
-                    response = requests.post(url, json=payload)
+                    response = self.session.post(url, json=payload)
                     if response.status_code == 200:
                         logger.info("Successfully used llama2 as fallback")
                     else:
@@ -65,97 +93,293 @@ class OllamaWrapper:
                 else:
                     return f"Error: Ollama API returned status code {response.status_code}"
             
-            try:
-                # Handle Ollama's response format
-                content = response.content.decode('utf-8')
-                
-                # Some versions of Ollama might return multiple JSON objects
-                # Split by newlines and parse the first complete JSON object
-                if '\n' in content:
-                    first_json = content.split('\n')[0].strip()
-                    data = json.loads(first_json)
-                else:
-                    data = json.loads(content)
-                
-                return data.get("response", "")
-            except json.JSONDecodeError as json_err:
-                logger.error(f"JSON parsing error: {json_err} - Content: {response.content[:100]}")
-                # Try to extract just the response text without parsing JSON
-                if '"response":"' in content:
-                    # Simple string extraction as fallback
-                    start = content.find('"response":"') + 12
-                    end = content.find('","', start)
-                    if end > start:
-                        return content[start:end]
-                return "Error: Could not parse Ollama response"
+            return self._parse_generate_response(response.content)
                 
         except Exception as e:
             logger.error(f"Error generating text with Ollama: {e}")
             return f"Error generating text: {str(e)}"
     
+    def generate_stream(self, prompt, system_prompt=None):
+        """
+        Generate text using Ollama API, yielding tokens as they arrive.
+        
+        Args:
+            prompt: The prompt to generate from
+            system_prompt: Optional system prompt
+            
+        Yields:
+            str: Generated text fragments in order
+            
+        Raises:
+            OllamaStreamError: If the request fails or the stream ends before completion,
+                so a truncated text is never mistaken for a finished one
+        """
+        url = f"{self.base_url}/api/generate"
+        payload = self._build_generate_payload(prompt, system_prompt)
+        payload["stream"] = True
+        
+        try:
+            for model in (self.gen_model, "llama2"):
+                payload["model"] = model
+                
+                logger.debug(f"Sending streaming request to Ollama generate API: {url}")
+                with self.session.post(url, json=payload, stream=True) as response:
+                    if response.status_code == 404 and model != "llama2":
+                        # Try to use a fallback model if specified model not found
+                        logger.warning(f"Model {self.gen_model} not found, trying llama2 as fallback...")
+                        continue
+                    
+                    if response.status_code != 200:
+                        logger.error(f"Ollama API returned status code {response.status_code}: {response.text}")
+                        raise OllamaStreamError(f"Ollama API returned status code {response.status_code}")
+                    
+                    for line in response.iter_lines():
+                        token, done = self._parse_stream_line(line)
+                        if token:
+                            yield token
+                        if done:
+                            return
+                    raise OllamaStreamError("Ollama stream ended before generation was done")
+        except OllamaStreamError:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming text from Ollama: {e}")
+            raise OllamaStreamError(f"Error generating text: {e}") from e
+    
+    def _parse_stream_line(self, line):
+        """Parse one NDJSON line of a streaming generate response into (token, done)."""
+        if not line:
+            return "", False
+        
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON parsing error in stream: {json_err} - Content: {line[:100]}")
+            return "", False
+        
+        return data.get("response", ""), data.get("done", False)
+    
+    def _build_generate_payload(self, prompt, system_prompt=None):
+        """Build the request body for the generate API."""
+        payload = {
+            "model": self.gen_model,
+            "prompt": prompt,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": False  # Explicitly disable streaming to get a complete response
+        }
+        
+        if system_prompt:
+            payload["system"] = system_prompt
+        
+        return payload
+    
+    def _parse_generate_response(self, raw_content):
+        """Extract the generated text from a non-streaming generate response body."""
+        try:
+            # Handle Ollama's response format
+            content = raw_content.decode('utf-8')
+            
+            # Some versions of Ollama might return multiple JSON objects
+            # Split by newlines and parse the first complete JSON object
+            if '\n' in content:
+                first_json = content.split('\n')[0].strip()
+                data = json.loads(first_json)
+            else:
+                data = json.loads(content)
+            
+            return data.get("response", "")
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON parsing error: {json_err} - Content: {raw_content[:100]}")
+            # Try to extract just the response text without parsing JSON
+            if '"response":"' in content:
+                # Simple string extraction as fallback
+                start = content.find('"response":"') + 12
+                end = content.find('","', start)
+                if end > start:
+                    return content[start:end]
+            return "Error: Could not parse Ollama response"
+    
     def get_embeddings(self, texts):
         """
         Get embeddings for a list of texts using Ollama API.
         If the embedding model is not available, falls back to a simple
         deterministic embedding function.
+        
+        Returns plain Python lists for compatibility with existing callers;
+        use embed_batch to get a float32 NumPy matrix instead.
         """
         if not isinstance(texts, list):
             texts = [texts]
+        
+        if not texts:
+            return []
+            
+        embeddings = self.embed_batch(texts).tolist()
+        return embeddings if len(texts) > 1 else embeddings[0]
+    
+    def embed_batch(self, texts):
+        """
+        Embed many texts at once and return them as a single matrix.
+        
+        Texts found in the embedding cache are not sent to Ollama. The rest use
+        Ollama's multi-input /api/embed endpoint when the server supports it,
+        otherwise bounded-concurrency requests to /api/embeddings over the pooled
+        session. Texts that cannot be embedded get the deterministic fallback.
+        
+        Args:
+            texts: List of texts to embed (a single string is also accepted)
             
+        Returns:
+            np.ndarray of shape (len(texts), Config.EMBEDDING_DIMENSION) and dtype float32
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        
+        matrix = np.zeros((len(texts), Config.EMBEDDING_DIMENSION), dtype=np.float32)
+        missing = self._fill_from_cache(texts, matrix)
+        
+        embedded = []
+        for start in range(0, len(missing), self.embed_batch_size):
+            positions = missing[start:start + self.embed_batch_size]
+            chunk = [texts[position] for position in positions]
+            
+            vectors = None
+            if self._batch_endpoint_available is not False:
+                vectors = self._embed_chunk_batched(chunk)
+            if vectors is None:
+                vectors = self._embed_chunk_concurrent(chunk)
+            
+            embedded.extend(self._place_vectors(texts, matrix, positions, vectors))
+        
+        self._store_in_cache(texts, matrix, embedded)
+        return matrix
+    
+    def _fill_from_cache(self, texts, matrix):
+        """
+        Copy cached embeddings into the matrix.
+        
+        Returns:
+            list: Positions of the texts that still need embedding
+        """
+        if self.embedding_cache is None or not texts:
+            return list(range(len(texts)))
+        
+        cached = self.embedding_cache.get_many(self.embed_model, matrix.shape[1], texts)
+        for position, vector in cached.items():
+            matrix[position] = vector
+        return [position for position in range(len(texts)) if position not in cached]
+    
+    def _place_vectors(self, texts, matrix, positions, vectors):
+        """
+        Write embedded vectors into the matrix, using the fallback for failed ones.
+        
+        Returns:
+            list: Positions that got a real embedding
+        """
+        embedded = []
+        for position, vector in zip(positions, vectors):
+            if vector is None or len(vector) == 0:
+                logger.warning("Using fallback deterministic embedding function")
+                vector = self._deterministic_embedding(texts[position], dimension=matrix.shape[1])
+            else:
+                embedded.append(position)
+            matrix[position] = self._fit_dimension(vector, matrix.shape[1])
+        return embedded
+    
+    def _store_in_cache(self, texts, matrix, positions):
+        """Cache real embeddings; fallbacks are left out so they are retried once Ollama is back."""
+        if self.embedding_cache is None or not positions:
+            return
+        
+        self.embedding_cache.put_many(
+            self.embed_model, matrix.shape[1],
+            [texts[position] for position in positions],
+            matrix[positions]
+        )
+    
+    def _embed_chunk_batched(self, chunk):
+        """Embed a chunk with one /api/embed call. Returns None if the call cannot be used."""
+        try:
+            url = f"{self.base_url}/api/embed"
+            payload = {
+                "model": self.embed_model,
+                "input": chunk
+            }
+            
+            logger.debug(f"Sending batch of {len(chunk)} texts to Ollama embed API: {url}")
+            response = self.session.post(url, json=payload)
+            
+            if response.status_code == 404 and self._batch_endpoint_available is None:
+                # Older Ollama servers only expose the single-input endpoint
+                logger.info("Ollama /api/embed not available, using /api/embeddings instead")
+                self._batch_endpoint_available = False
+                return None
+            
+            if response.status_code != 200:
+                logger.warning(f"Embed API failed with status {response.status_code}: {response.text}")
+                return None
+            
+            embeddings = response.json().get("embeddings", [])
+            if len(embeddings) != len(chunk):
+                logger.warning(f"Embed API returned {len(embeddings)} embeddings for {len(chunk)} texts")
+                return None
+            
+            self._batch_endpoint_available = True
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error getting batch embeddings from Ollama: {e}")
+            return None
+    
+    def _embed_chunk_concurrent(self, chunk):
+        """Embed a chunk with one /api/embeddings call per text, a few at a time."""
+        if len(chunk) == 1 or self.embed_concurrency <= 1:
+            return [self._embed_single(text) for text in chunk]
+        
+        with ThreadPoolExecutor(max_workers=min(self.embed_concurrency, len(chunk))) as executor:
+            return list(executor.map(self._embed_single, chunk))
+    
+    def _embed_single(self, text):
+        """Embed one text with the /api/embeddings endpoint. Returns None if the call fails."""
         try:
             url = f"{self.base_url}/api/embeddings"
+            payload = {
+                "model": self.embed_model,
+                "prompt": text
+            }
             
-            embeddings = []
-            for text in texts:
-                payload = {
-                    "model": self.embed_model,
-                    "prompt": text
-                }
-                
-                logger.debug(f"Sending request to Ollama embeddings API: {url}")
-                response = requests.post(url, json=payload)
-                
-                if response.status_code == 200:
-                    embedding = response.json().get("embedding", [])
-                    
-                    # Verify embedding dimension matches Config.EMBEDDING_DIMENSION
-                    embedding_dim = len(embedding)
-                    expected_dim = Config.EMBEDDING_DIMENSION
-                    
-                    if embedding_dim != expected_dim:
-                        logger.warning(f"Embedding dimension mismatch! Got {embedding_dim}, expected {expected_dim}")
-                        
-                        if embedding_dim > expected_dim:
-                            # Truncate the embedding to match expected dimension
-                            logger.info(f"Truncating embedding from {embedding_dim} to {expected_dim}")
-                            embedding = embedding[:expected_dim]
-                        else:
-                            # Extend the embedding with zeros
-                            logger.info(f"Extending embedding from {embedding_dim} to {expected_dim}")
-                            embedding.extend([0.0] * (expected_dim - embedding_dim))
-                            
-                        # Renormalize the embedding
-                        norm = np.linalg.norm(embedding)
-                        if norm > 0:
-                            embedding = [x / norm for x in embedding]
-                    
-                    embeddings.append(embedding)
-                else:
-                    logger.warning(f"Embeddings API failed with status {response.status_code}: {response.text}")
-                    logger.warning("Using fallback deterministic embedding function")
-                    
-                    # If API fails, use a fallback deterministic embedding function
-                    fallback_embedding = self._deterministic_embedding(text, dimension=Config.EMBEDDING_DIMENSION)
-                    embeddings.append(fallback_embedding)
-                
-            return embeddings if len(texts) > 1 else embeddings[0]
+            logger.debug(f"Sending request to Ollama embeddings API: {url}")
+            response = self.session.post(url, json=payload)
+            
+            if response.status_code == 200:
+                return response.json().get("embedding", [])
+            
+            logger.warning(f"Embeddings API failed with status {response.status_code}: {response.text}")
         except Exception as e:
             logger.error(f"Error getting embeddings from Ollama: {e}")
-            logger.warning("Using fallback deterministic embedding function")
-            
-            # Use fallback deterministic embedding function
-            embeddings = [self._deterministic_embedding(text, dimension=Config.EMBEDDING_DIMENSION) for text in texts]
-            return embeddings if len(texts) > 1 else embeddings[0]
+        
+        return None
+    
+    def _fit_dimension(self, embedding, dimension):
+        """Truncate or zero-pad an embedding to the expected dimension, renormalizing if changed."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding_dim = embedding.shape[0]
+        
+        if embedding_dim == dimension:
+            return embedding
+        
+        logger.warning(f"Embedding dimension mismatch! Got {embedding_dim}, expected {dimension}")
+        if embedding_dim > dimension:
+            embedding = embedding[:dimension]
+        else:
+            embedding = np.concatenate([embedding, np.zeros(dimension - embedding_dim, dtype=np.float32)])
+        
+        # Renormalize the embedding
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        
+        return embedding
     
     def _deterministic_embedding(self, text, dimension=None):
         """
@@ -175,14 +399,240 @@ class OllamaWrapper:
             
         # Create a seed based on the sum of character codes
         seed = sum(ord(c) for c in text)
-        np.random.seed(seed)
         
-        # Create a random vector with the seed
-        embedding = np.random.randn(dimension)
+        # Create a random vector with the seed (own generator, so concurrent calls stay deterministic)
+        embedding = np.random.RandomState(seed).randn(dimension)
         
         # Normalize to unit length
         norm = np.linalg.norm(embedding)
         if norm > 0:
             embedding = embedding / norm
             
-        return embedding.tolist()
\ No newline at end of file
+        return embedding.tolist()
+
+
+class AsyncOllamaWrapper(OllamaWrapper):
+    """
+    Asynchronous Ollama client for use inside the event loop.
+    
+    Shares configuration, payload building, dimension fitting and fallbacks with
+    OllamaWrapper, but performs all I/O through one pooled httpx.AsyncClient.
+    """
+    
+    def __init__(self, config=None, embedding_cache=None):
+        """Initialize the async Ollama wrapper with configuration."""
+        super().__init__(config, embedding_cache)
+        self.max_connections = self.config.get("async_max_connections", 20)
+        
+        # Created lazily so the client binds to the running event loop
+        self._client = None
+    
+    def _get_client(self):
+        """Return the shared async HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                # Generations can take a long time; only bound the connect phase
+                timeout=httpx.Timeout(None, connect=10.0)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the underlying connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def generate(self, prompt, system_prompt=None):
+        """Generate text using Ollama API without blocking the event loop."""
+        try:
+            url = f"{self.base_url}/api/generate"
+            payload = self._build_generate_payload(prompt, system_prompt)
+            client = self._get_client()
+            
+            logger.debug(f"Sending async request to Ollama generate API: {url}")
+            response = await client.post(url, json=payload)
+            
+            if response.status_code != 200:
+                logger.error(f"Ollama API returned status code {response.status_code}: {response.text}")
+                # Try to use a fallback model if specified model not found
+                if response.status_code == 404:
+                    logger.warning(f"Model {self.gen_model} not found, trying llama2 as fallback...")
+                    payload["model"] = "llama2"
+                    response = await client.post(url, json=payload)
+                    if response.status_code == 200:
+                        logger.info("Successfully used llama2 as fallback")
+                    else:
+                        logger.error(f"Fallback model also failed with status {response.status_code}")
+                        return f"Error: Ollama API returned status code {response.status_code}"
+                else:
+                    return f"Error: Ollama API returned status code {response.status_code}"
+            
+            return self._parse_generate_response(response.content)
+        except Exception as e:
+            logger.error(f"Error generating text with Ollama: {e}")
+            return f"Error generating text: {str(e)}"
+    
+    async def generate_stream(self, prompt, system_prompt=None):
+        """
+        Generate text using Ollama API, yielding tokens as they arrive.
+        
+        Args:
+            prompt: The prompt to generate from
+            system_prompt: Optional system prompt
+            
+        Yields:
+            str: Generated text fragments in order
+            
+        Raises:
+            OllamaStreamError: If the request fails or the stream ends before completion,
+                so a truncated text is never mistaken for a finished one
+        """
+        url = f"{self.base_url}/api/generate"
+        payload = self._build_generate_payload(prompt, system_prompt)
+        payload["stream"] = True
+        
+        try:
+            for model in (self.gen_model, "llama2"):
+                payload["model"] = model
+                
+                logger.debug(f"Sending async streaming request to Ollama generate API: {url}")
+                async with self._get_client().stream("POST", url, json=payload) as response:
+                    if response.status_code == 404 and model != "llama2":
+                        # Try to use a fallback model if specified model not found
+                        logger.warning(f"Model {self.gen_model} not found, trying llama2 as fallback...")
+                        continue
+                    
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        logger.error(f"Ollama API returned status code {response.status_code}: {body[:200]}")
+                        raise OllamaStreamError(f"Ollama API returned status code {response.status_code}")
+                    
+                    async for line in response.aiter_lines():
+                        token, done = self._parse_stream_line(line)
+                        if token:
+                            yield token
+                        if done:
+                            return
+                    raise OllamaStreamError("Ollama stream ended before generation was done")
+        except OllamaStreamError:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming text from Ollama: {e}")
+            raise OllamaStreamError(f"Error generating text: {e}") from e
+    
+    async def get_embeddings(self, texts):
+        """Async counterpart of OllamaWrapper.get_embeddings (returns Python lists)."""
+        if not isinstance(texts, list):
+            texts = [texts]
+        
+        if not texts:
+            return []
+        
+        matrix = await self.embed_batch(texts)
+        embeddings = matrix.tolist()
+        return embeddings if len(texts) > 1 else embeddings[0]
+    
+    async def embed_batch(self, texts):
+        """
+        Embed many texts at once and return them as a single matrix.
+        
+        Args:
+            texts: List of texts to embed (a single string is also accepted)
+            
+        Returns:
+            np.ndarray of shape (len(texts), Config.EMBEDDING_DIMENSION) and dtype float32
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        
+        matrix = np.zeros((len(texts), Config.EMBEDDING_DIMENSION), dtype=np.float32)
+        # The persistent cache is SQLite, so it is read and written in a worker thread
+        if self.embedding_cache is not None:
+            missing = await asyncio.to_thread(self._fill_from_cache, texts, matrix)
+        else:
+            missing = self._fill_from_cache(texts, matrix)
+        
+        embedded = []
+        for start in range(0, len(missing), self.embed_batch_size):
+            positions = missing[start:start + self.embed_batch_size]
+            chunk = [texts[position] for position in positions]
+            
+            vectors = None
+            if self._batch_endpoint_available is not False:
+                vectors = await self._embed_chunk_batched(chunk)
+            if vectors is None:
+                vectors = await self._embed_chunk_concurrent(chunk)
+            
+            embedded.extend(self._place_vectors(texts, matrix, positions, vectors))
+        
+        if self.embedding_cache is not None and embedded:
+            await asyncio.to_thread(self._store_in_cache, texts, matrix, embedded)
+        return matrix
+    
+    async def _embed_chunk_batched(self, chunk):
+        """Embed a chunk with one /api/embed call. Returns None if the call cannot be used."""
+        try:
+            url = f"{self.base_url}/api/embed"
+            payload = {
+                "model": self.embed_model,
+                "input": chunk
+            }
+            
+            logger.debug(f"Sending async batch of {len(chunk)} texts to Ollama embed API: {url}")
+            response = await self._get_client().post(url, json=payload)
+            
+            if response.status_code == 404 and self._batch_endpoint_available is None:
+                # Older Ollama servers only expose the single-input endpoint
+                logger.info("Ollama /api/embed not available, using /api/embeddings instead")
+                self._batch_endpoint_available = False
+                return None
+            
+            if response.status_code != 200:
+                logger.warning(f"Embed API failed with status {response.status_code}: {response.text}")
+                return None
+            
+            embeddings = response.json().get("embeddings", [])
+            if len(embeddings) != len(chunk):
+                logger.warning(f"Embed API returned {len(embeddings)} embeddings for {len(chunk)} texts")
+                return None
+            
+            self._batch_endpoint_available = True
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error getting batch embeddings from Ollama: {e}")
+            return None
+    
+    async def _embed_chunk_concurrent(self, chunk):
+        """Embed a chunk with one /api/embeddings call per text, a few at a time."""
+        semaphore = asyncio.Semaphore(max(self.embed_concurrency, 1))
+        
+        async def embed_with_limit(text):
+            async with semaphore:
+                return await self._embed_single(text)
+        
+        return await asyncio.gather(*(embed_with_limit(text) for text in chunk))
+    
+    async def _embed_single(self, text):
+        """Embed one text with the /api/embeddings endpoint. Returns None if the call fails."""
+        try:
+            url = f"{self.base_url}/api/embeddings"
+            payload = {
+                "model": self.embed_model,
+                "prompt": text
+            }
+            
+            logger.debug(f"Sending async request to Ollama embeddings API: {url}")
+            response = await self._get_client().post(url, json=payload)
+            
+            if response.status_code == 200:
+                return response.json().get("embedding", [])
+            
+            logger.warning(f"Embeddings API failed with status {response.status_code}: {response.text}")
+        except Exception as e:
+            logger.error(f"Error getting embeddings from Ollama: {e}")
+        
+        return None
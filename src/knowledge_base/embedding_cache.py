@@ -0,0 +1,314 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One cache per database file, shared by every embedder in the process
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+# Buffered last-used times kept before new ones are dropped until the next write
+MAX_PENDING_TOUCHES = 100000
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache backed by SQLite.
+
+    Vectors are stored as float32 blobs keyed by (embedding model, dimension,
+    sha256 of the text), so they survive restarts and are shared by every
+    vector store that embeds through the same file. Once the stored vectors
+    exceed the size budget, the least recently used ones are evicted.
+
+    Lookups never write: hits buffer their last-used time in memory, and the
+    buffer is written with the next put_many, so reads by several processes
+    sharing the file do not serialize on SQLite's write lock.
+    """
+
+    def __init__(self, db_path, max_bytes=512 * 1024 * 1024):
+        """
+        Open or create the cache database.
+
+        Args:
+            db_path: Path of the SQLite file
+            max_bytes: Size budget for stored vectors; least recently used ones are evicted beyond it
+        """
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_touches = {}  # (model, dimension, text hash) -> last used time not yet written
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # Wait for other processes' write transactions instead of failing with "database is locked"
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model TEXT NOT NULL,
+            dimension INTEGER NOT NULL,
+            text_hash TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (model, dimension, text_hash)
+        ) WITHOUT ROWID
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @classmethod
+    def shared(cls, db_path, max_bytes=512 * 1024 * 1024):
+        """Get the process-wide cache for a database file, opening it on first use."""
+        key = os.path.abspath(str(db_path))
+        with _shared_lock:
+            if key not in _shared_caches:
+                _shared_caches[key] = cls(db_path, max_bytes)
+            return _shared_caches[key]
+
+    @staticmethod
+    def text_hash(text):
+        """Hash a text for use as a cache key."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model, dimension, texts):
+        """
+        Look up the embeddings of several texts at once.
+
+        Args:
+            model: Embedding model name
+            dimension: Embedding dimension
+            texts: Texts to look up
+
+        Returns:
+            dict of position in texts -> float32 vector, for the texts that are cached
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        try:
+            with self._lock:
+                # Stay below SQLite's limit on bound parameters
+                for start in range(0, len(hashes), 500):
+                    chunk = list(set(hashes[start:start + 500]))
+                    rows = self._conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND dimension = ? "
+                        f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [model, dimension] + chunk
+                    ).fetchall()
+                    found.update(rows)
+
+                # Written with the next put_many
+                now = time.time()
+                for text_hash in found:
+                    if len(self._pending_touches) >= MAX_PENDING_TOUCHES:
+                        break
+                    self._pending_touches[(model, dimension, text_hash)] = now
+        except sqlite3.Error as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            found = {}
+
+        results = {
+            position: np.frombuffer(found[text_hash], dtype=np.float32)
+            for position, text_hash in enumerate(hashes) if text_hash in found
+        }
+        self.hits += len(results)
+        self.misses += len(texts) - len(results)
+        return results
+
+    def put_many(self, model, dimension, texts, vectors):
+        """
+        Store the embeddings of several texts.
+
+        Args:
+            model: Embedding model name
+            dimension: Embedding dimension
+            texts: Embedded texts
+            vectors: One vector per text
+        """
+        if not texts:
+            return
+
+        now = time.time()
+        rows = {
+            self.text_hash(text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        try:
+            with self._lock:
+                # Replacing a row frees its old size first
+                chunk_hashes = list(rows)
+                for start in range(0, len(chunk_hashes), 500):
+                    chunk = chunk_hashes[start:start + 500]
+                    self.total_bytes -= self._conn.execute(
+                        f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE model = ? AND dimension = ? "
+                        f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [model, dimension] + chunk
+                    ).fetchone()[0]
+
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, dimension, text_hash, vector, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(model, dimension, text_hash, blob, now) for text_hash, blob in rows.items()]
+                )
+                self.total_bytes += sum(len(blob) for blob in rows.values())
+                self._flush_touches()
+
+                if self.total_bytes > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing embedding cache: {e}")
+
+    def _flush_touches(self):
+        """Write the buffered last-used times of cache hits; call inside a write with the lock held."""
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE model = ? AND dimension = ? AND text_hash = ?",
+            [(used, model, dimension, text_hash)
+             for (model, dimension, text_hash), used in self._pending_touches.items()]
+        )
+        self._pending_touches = {}
+
+    def _evict(self):
+        """Delete least recently used vectors until the cache is back to 90% of its budget."""
+        target = int(self.max_bytes * 0.9)
+        while self.total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, dimension, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 500"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+
+            evicted = []
+            for model, dimension, text_hash, size in rows:
+                evicted.append((model, dimension, text_hash))
+                self.total_bytes -= size
+                if self.total_bytes <= target:
+                    break
+
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND dimension = ? AND text_hash = ?", evicted
+            )
+            logger.info(f"Evicted {len(evicted)} embeddings from cache")
+
+    def clear(self):
+        """Delete every cached embedding and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._pending_touches = {}
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self):
+        """Get statistics about the cache."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'cache_size': size,
+            'cache_bytes': self.total_bytes,
+            'cache_max_bytes': self.max_bytes,
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_ratio': self.hits / lookups if lookups > 0 else 0
+        }
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded in-memory LRU cache for query embeddings with a time to live.
+
+    Retrieval queries built from extracted email fields repeat a lot, so a
+    small cache in front of the embedder saves most query embedding calls.
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=3600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl_seconds: Seconds a cached embedding stays valid (None keeps them until evicted)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # query -> (expiry time, vector), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        """
+        Get the cached embedding of a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            The embedding, or None if it is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self._entries.move_to_end(query)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[query]
+            self.misses += 1
+            return None
+
+    def put(self, query, vector):
+        """
+        Cache the embedding of a query, evicting the least recently used one if full.
+
+        Args:
+            query: Query text
+            vector: Its embedding
+        """
+        if self.max_size <= 0:
+            return
+
+        expiry = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[query] = (expiry, np.asarray(vector, dtype=np.float32))
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached query and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self):
+        """Get statistics about the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups > 0 else 0
+            }
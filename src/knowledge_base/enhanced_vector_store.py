@@ -1,24 +1,147 @@
 import os
 import pickle
+import hashlib
 import numpy as np
 import logging
 import sqlite3
 import json
+import time
+import threading
 import faiss
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any, Union
 
 from src.config import Config
 from src.generation.llm_wrapper import OllamaWrapper
+from src.knowledge_base.index_factory import build_id_index, normalize_vectors, search_parameters, uses_inner_product
+from src.knowledge_base.embedding_cache import QueryEmbeddingCache
+from src.knowledge_base.metadata_filter import (
+    CATEGORICAL_FIELDS, CATEGORICAL_OPERATORS, NUMERIC_FIELDS, TAG_FIELD, TAG_OPERATORS,
+    package_tags, parse_duration_days, parse_price_amount
+)
 
 logger = logging.getLogger(__name__)
 
+# Bound parameters per "IN (...)" query, below SQLite's limit of 999
+SQL_BATCH_SIZE = 500
+
+# Bumped when stored packages need re-indexing by _backfill_package_attributes
+SCHEMA_VERSION = 2
+
+# Full-text condition in filters: {"text": "temples"} matches name, description and activities
+TEXT_FIELD = "text"
+
+# SQL comparison for each numeric filter operator
+SQL_OPERATORS = {"eq": "=", "ne": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+
+class PackageCache:
+    """
+    Bounded in-memory LRU cache of decoded packages keyed by package ID.
+
+    Cached packages are shared with callers, which must not modify them.
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_size=2048):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached packages
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # package ID -> package, least recently used first
+        self._lock = threading.Lock()
+
+    def get_many(self, package_ids):
+        """
+        Look up several packages at once.
+
+        Args:
+            package_ids: Package IDs to look up
+
+        Returns:
+            dict of package ID -> package, for the IDs that are cached
+        """
+        found = {}
+        with self._lock:
+            for package_id in package_ids:
+                package = self._entries.get(package_id)
+                if package is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(package_id)
+                found[package_id] = package
+                self.hits += 1
+        return found
+
+    def put_many(self, packages):
+        """
+        Cache decoded packages, evicting the least recently used ones if full.
+
+        Args:
+            packages: dict of package ID -> package
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            for package_id, package in packages.items():
+                self._entries[package_id] = package
+                self._entries.move_to_end(package_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, package_ids):
+        """Drop packages that were rewritten in the database."""
+        with self._lock:
+            for package_id in package_ids:
+                self._entries.pop(package_id, None)
+
+    def clear(self):
+        """Remove every cached package and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self):
+        """Get statistics about the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups > 0 else 0
+            }
+
+
 class EnhancedVectorStore:
-    """Enhanced vector store with improved storage and retrieval capabilities."""
+    """
+    Enhanced vector store with improved storage and retrieval capabilities.
     
-    def __init__(self, 
-                 db_path: str = "data/travel_data.db", 
+    Package embeddings are stored as float32 BLOBs in the embeddings table
+    together with a hash of the text they were computed from, so only new or
+    changed packages are ever embedded. The FAISS index labels each vector with
+    its embeddings row id; new vectors are appended to it and replaced ones
+    removed. The pickled index is a snapshot that is brought back in line with
+    the table when it is loaded.
+    
+    Country, continent, price, currency and duration are also parsed into a
+    narrow table of typed columns, with tags in a join table and a full-text
+    index over name, description and activities, so search can narrow
+    candidates in SQLite before scoring vectors.
+    """
+    
+    def __init__(self,
+                 db_path: str = "data/travel_data.db",
                  index_path: str = "data/embeddings/faiss_index.pkl",
                  ollama_client = None):
         """Initialize the enhanced vector store."""
@@ -27,7 +150,24 @@ class EnhancedVectorStore:
         self.embedder = ollama_client or OllamaWrapper()
         self.embedding_dimension = Config.EMBEDDING_DIMENSION
         self.index = None
-        self.id_mapping = []  # Maps FAISS index positions to package IDs
+        self.id_mapping = {}  # Maps FAISS ids (embeddings row ids) to package IDs
+        self.stale_ids = 0    # Replaced vectors still in an index that cannot delete them (HNSW)
+        self.embedded_texts = 0
+        self.fts_enabled = False  # Set once the full-text table exists
+        
+        # Recent query embeddings, so repeated queries skip the embedding call
+        self.query_cache = QueryEmbeddingCache(
+            max_size=Config.QUERY_EMBEDDING_CACHE.get("max_size", 1024),
+            ttl_seconds=Config.QUERY_EMBEDDING_CACHE.get("ttl_seconds", 3600)
+        )
+        
+        # Decoded packages, so hot search results skip SQLite and json.loads
+        self.package_cache = PackageCache(max_size=Config.PACKAGE_CACHE.get("max_size", 2048))
+        
+        # One read connection per thread, opened on first use
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         
         # Create database and tables if they don't exist
         self._init_database()
@@ -41,6 +181,9 @@ class EnhancedVectorStore:
             conn = sqlite3.connect(str(self.db_path))
             cursor = conn.cursor()
             
+            # WAL lets the pooled read connections search while packages are written
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Create packages table
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS packages (
@@ -69,213 +212,511 @@ class EnhancedVectorStore:
             )
             ''')
             
-            # Create embeddings table
+            # Create embeddings table; AUTOINCREMENT ids are never reused, so they
+            # double as FAISS ids
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS embeddings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 package_id TEXT UNIQUE,
                 created_at TEXT,
+                content_hash TEXT,
+                vector BLOB,
                 FOREIGN KEY (package_id) REFERENCES packages (id)
             )
             ''')
             
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Database initialized at {self.db_path}")
-        except Exception as e:
-            logger.error(f"Error initializing database: {e}")
-            raise e
-        
-        
-    def add_package(self, package: Dict, text: Optional[str] = None) -> bool:
-        """Add a package to the vector store and database."""
-        try:
-            # Generate text representation if not provided
-            if text is None:
-                text = self._generate_text_from_package(package)
-            
-            # Generate embedding
-            embedding = self.embedder.get_embeddings(text)
-            
-            # Store package in database
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            # Databases created before vectors were stored lack these columns
+            cursor.execute('PRAGMA table_info(embeddings)')
+            columns = {row[1] for row in cursor.fetchall()}
+            for column, column_type in (('content_hash', 'TEXT'), ('vector', 'BLOB')):
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE embeddings ADD COLUMN {column} {column_type}')
             
-            # Convert package to JSON
-            package_json = json.dumps(package)
-            
-            # Current timestamp
-            timestamp = datetime.now().isoformat()
+            # Create package attributes table: typed columns parsed from each package, kept
+            # apart from package_json so filters only read small rows. Its rowid is shared
+            # with the full-text table.
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS package_attributes (
+                package_id TEXT NOT NULL UNIQUE,
+                embedding_id INTEGER,
+                country TEXT COLLATE NOCASE,
+                continent TEXT COLLATE NOCASE,
+                price_amount REAL,
+                currency TEXT,
+                duration_days REAL,
+                FOREIGN KEY (package_id) REFERENCES packages (id)
+            )
+            ''')
+            for column in ('country', 'continent', 'price_amount', 'duration_days'):
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_package_attributes_{column} '
+                               f'ON package_attributes ({column})')
             
-            # Insert package
+            # Create tag tables: each package is linked to its own tags, activity names and vacation types
             cursor.execute('''
-            INSERT OR REPLACE INTO packages
-            (id, name, location, description, duration, price, package_json, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                package.get('id', str(hash(text))),
-                package.get('name', 'Unknown'),
-                package.get('location', package.get('destination', 'Unknown')),
-                package.get('description', ''),
-                package.get('duration', ''),
-                package.get('price', 0) if isinstance(package.get('price'), (int, float)) else 0,
-                package_json,
-                timestamp,
-                timestamp
-            ))
-            
-            package_id = package.get('id', str(hash(text)))
-            
-            # Insert activities if present
-            if 'activities' in package and isinstance(package['activities'], list):
-                for activity in package['activities']:
-                    if isinstance(activity, dict):
-                        activity_id = activity.get('id', str(hash(activity.get('name', ''))))
-                        cursor.execute('''
-                        INSERT OR REPLACE INTO activities
-                        (id, package_id, name, description, duration)
-                        VALUES (?, ?, ?, ?, ?)
-                        ''', (
-                            activity_id,
-                            package_id,
-                            activity.get('name', 'Unknown Activity'),
-                            activity.get('description', ''),
-                            activity.get('duration', '')
-                        ))
-            
-            # Add to embeddings table and get embedding_id
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+            ''')
             cursor.execute('''
-            INSERT OR REPLACE INTO embeddings
-            (package_id, created_at)
-            VALUES (?, ?)
-            ''', (package_id, timestamp))
-            
-            embedding_id = cursor.lastrowid
+            CREATE TABLE IF NOT EXISTS package_tags (
+                package_id TEXT NOT NULL,
+                tag_id INTEGER NOT NULL,
+                PRIMARY KEY (package_id, tag_id),
+                FOREIGN KEY (package_id) REFERENCES packages (id),
+                FOREIGN KEY (tag_id) REFERENCES tags (id)
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_package_tags_tag ON package_tags (tag_id, package_id)')
             
-            # Update package with embedding_id
-            cursor.execute('''
-            UPDATE packages 
-            SET embedding_id = ? 
-            WHERE id = ?
-            ''', (embedding_id, package_id))
+            # Create full-text index over name, description and activities
+            try:
+                cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS packages_fts
+                USING fts5(name, description, activities)
+                ''')
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Full-text search unavailable, text filters are disabled: {e}")
+                self.fts_enabled = False
             
             conn.commit()
-            conn.close()
             
-            # Update FAISS index
-            self._update_faiss_index()
+            # Fill the attributes, tags and full-text index of packages stored by earlier versions
+            if cursor.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                self._backfill_package_attributes(conn)
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                conn.commit()
             
-            return True
+            conn.close()
+            
+            logger.info(f"Database initialized at {self.db_path}")
         except Exception as e:
-            logger.error(f"Error adding package: {e}")
-            return False
+            logger.error(f"Error initializing database: {e}")
+            raise e
+    
+    
+    def add_package(self, package: Dict, text: Optional[str] = None) -> bool:
+        """Add a package to the vector store and database."""
+        return self.add_packages([package], [text] if text is not None else None)
     
     def add_packages(self, packages: List[Dict], texts: Optional[List[str]] = None) -> bool:
-        """Add multiple packages to the vector store and database."""
+        """
+        Add multiple packages to the vector store and database.
+        
+        Only packages that are new or whose text changed since they were stored
+        are embedded; their vectors are appended to the FAISS index.
+        
+        Args:
+            packages: Package dictionaries
+            texts: Optional text to embed for each package (generated if not provided)
+        
+        Returns:
+            bool: True if the packages were stored
+        """
+        return self.bulk_add_packages(packages, texts) is not None
+    
+    def bulk_add_packages(self, packages: List[Dict], texts: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Add packages with all rows prepared up front and written in one transaction.
+        
+        New and changed packages are embedded in one batch first. The stored
+        embeddings are read again once the write lock is held, so packages
+        another writer changed in the meantime are embedded then and those it
+        already stored with the same content are skipped. Embedding ids are
+        assigned in order from the table's AUTOINCREMENT sequence under the
+        lock, so packages, activities and embeddings are each written with a
+        single executemany.
+        
+        Args:
+            packages: Package dictionaries
+            texts: Optional text to embed for each package (generated if not provided)
+        
+        Returns:
+            Optional[Dict]: Counts of packages, embedded packages and rows
+                written, with timings and rows_per_sec, or None on error
+        """
         try:
+            report = {'packages': len(packages), 'embedded': 0, 'rows': 0,
+                      'embed_seconds': 0.0, 'write_seconds': 0.0, 'rows_per_sec': 0.0}
             if not packages:
-                return True
-                
+                return report
+            
             # Generate texts if not provided
             if texts is None:
                 texts = [self._generate_text_from_package(pkg) for pkg in packages]
-                
-            # Generate embeddings
-            embeddings = self.embedder.get_embeddings(texts)
             
-            # Store packages and embeddings in database
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            # Generate a unique ID if not present
+            package_ids = [package.get('id', str(hash(text))) for package, text in zip(packages, texts)]
+            content_hashes = [self._content_hash(text) for text in texts]
+            
+            stored = self._stored_embeddings(self._connection().cursor(), package_ids)
             
-            for i, package in enumerate(packages):
-                # Convert package to JSON
-                package_json = json.dumps(package)
+            # New and changed packages, the last copy of a package repeated in the batch winning
+            changed = {}
+            for i, (package_id, content_hash) in enumerate(zip(package_ids, content_hashes)):
+                if package_id not in stored or stored[package_id][1] != content_hash:
+                    changed[package_id] = i
+            positions = sorted(changed.values())
+            
+            # Generate embeddings for those packages only, before the write lock is taken
+            embed_start = time.perf_counter()
+            vectors = self.embedder.embed_batch([texts[i] for i in positions]) if positions else []
+            embedded = {package_ids[i]: vector for i, vector in zip(positions, vectors)}
+            self.embedded_texts += len(positions)
+            report['embedded'] = len(positions)
+            report['embed_seconds'] = time.perf_counter() - embed_start
+            
+            write_start = time.perf_counter()
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            try:
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute('PRAGMA temp_store=MEMORY')
+                conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+                conn.execute('BEGIN IMMEDIATE')
+                
+                # Another writer may have stored these packages since the snapshot above, so
+                # what to write is decided from a fresh read under the write lock
+                current = self._stored_embeddings(conn.cursor(), package_ids)
+                latest = {package_id: i for i, package_id in enumerate(package_ids)}
+                positions = sorted(
+                    i for package_id, i in latest.items()
+                    if package_id not in current or current[package_id][1] != content_hashes[i]
+                )
+                
+                # Packages another writer changed in the meantime were not embedded above, while
+                # those it already stored with the same content are skipped
+                late = [i for i in positions if package_ids[i] not in embedded]
+                if late:
+                    logger.info(f"Embedding {len(late)} packages changed by another writer")
+                    embedded.update(zip((package_ids[i] for i in late),
+                                        self.embedder.embed_batch([texts[i] for i in late])))
+                    self.embedded_texts += len(late)
+                    report['embedded'] += len(late)
+                vectors = [embedded[package_ids[i]] for i in positions]
+                
+                # Embedding ids continue the AUTOINCREMENT sequence, so they are never reused
+                next_id = conn.execute('''
+                SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'embeddings'), 0),
+                           COALESCE((SELECT MAX(id) FROM embeddings), 0))
+                ''').fetchone()[0] + 1
+                new_ids = {package_ids[i]: next_id + n for n, i in enumerate(positions)}
                 
                 # Current timestamp
                 timestamp = datetime.now().isoformat()
                 
-                # Generate a unique ID if not present
-                package_id = package.get('id', str(hash(texts[i])))
+                package_rows = []
+                activity_rows = []
+                for package_id, package in zip(package_ids, packages):
+                    package_rows.append((
+                        package_id,
+                        package.get('name', 'Unknown'),
+                        package.get('location', package.get('destination', 'Unknown')),
+                        package.get('description', ''),
+                        package.get('duration', ''),
+                        package.get('price', 0) if isinstance(package.get('price'), (int, float)) else 0,
+                        json.dumps(package),
+                        new_ids.get(package_id),
+                        timestamp,
+                        timestamp
+                    ))
+                    
+                    if 'activities' in package and isinstance(package['activities'], list):
+                        for activity in package['activities']:
+                            if isinstance(activity, dict):
+                                activity_rows.append((
+                                    activity.get('id', str(hash(activity.get('name', '')))),
+                                    package_id,
+                                    activity.get('name', 'Unknown Activity'),
+                                    activity.get('description', ''),
+                                    activity.get('duration', '')
+                                ))
                 
-                # Insert package
-                cursor.execute('''
-                INSERT OR REPLACE INTO packages
-                (id, name, location, description, duration, price, package_json, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    package_id,
-                    package.get('name', 'Unknown'),
-                    package.get('location', package.get('destination', 'Unknown')),
-                    package.get('description', ''),
-                    package.get('duration', ''),
-                    package.get('price', 0) if isinstance(package.get('price'), (int, float)) else 0,
-                    package_json,
-                    timestamp,
-                    timestamp
-                ))
+                embedding_rows = [
+                    (new_ids[package_ids[i]], package_ids[i], timestamp, content_hashes[i], self._vector_to_blob(vector))
+                    for i, vector in zip(positions, vectors)
+                ]
                 
-                # Insert activities if present
-                if 'activities' in package and isinstance(package['activities'], list):
-                    for activity in package['activities']:
-                        if isinstance(activity, dict):
-                            activity_id = activity.get('id', str(hash(activity.get('name', ''))))
-                            cursor.execute('''
-                            INSERT OR REPLACE INTO activities
-                            (id, package_id, name, description, duration)
-                            VALUES (?, ?, ?, ?, ?)
-                            ''', (
-                                activity_id,
-                                package_id,
-                                activity.get('name', 'Unknown Activity'),
-                                activity.get('description', ''),
-                                activity.get('duration', '')
-                            ))
+                # Insert or update packages, keeping created_at and the embedding of unchanged ones
+                conn.executemany('''
+                INSERT INTO packages
+                (id, name, location, description, duration, price, package_json, embedding_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    name = excluded.name,
+                    location = excluded.location,
+                    description = excluded.description,
+                    duration = excluded.duration,
+                    price = excluded.price,
+                    package_json = excluded.package_json,
+                    embedding_id = COALESCE(excluded.embedding_id, packages.embedding_id),
+                    updated_at = excluded.updated_at
+                ''', package_rows)
                 
-                # Add to embeddings table and get embedding_id
-                cursor.execute('''
+                conn.executemany('''
+                INSERT OR REPLACE INTO activities
+                (id, package_id, name, description, duration)
+                VALUES (?, ?, ?, ?, ?)
+                ''', activity_rows)
+                
+                # The unique package_id replaces the previous embedding of a changed package
+                conn.executemany('''
                 INSERT OR REPLACE INTO embeddings
-                (package_id, created_at)
-                VALUES (?, ?)
-                ''', (package_id, timestamp))
+                (id, package_id, created_at, content_hash, vector)
+                VALUES (?, ?, ?, ?, ?)
+                ''', embedding_rows)
                 
-                embedding_id = cursor.lastrowid
+                # Filter attributes, tags and full-text entries, from the last copy of a package repeated in the batch
+                embedding_ids = {package_id: embedding_id for package_id, (embedding_id, _) in current.items()}
+                embedding_ids.update(new_ids)
+                attribute_rows = self._write_package_attributes(conn, dict(zip(package_ids, packages)), embedding_ids)
                 
-                # Update package with embedding_id
-                cursor.execute('''
-                UPDATE packages 
-                SET embedding_id = ? 
-                WHERE id = ?
-                ''', (embedding_id, package_id))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+            self.package_cache.invalidate(package_ids)
             
-            conn.commit()
-            conn.close()
+            report['rows'] = len(package_rows) + len(activity_rows) + len(embedding_rows) + attribute_rows
+            report['write_seconds'] = time.perf_counter() - write_start
+            report['rows_per_sec'] = report['rows'] / report['write_seconds'] if report['write_seconds'] > 0 else 0.0
+            logger.info(f"Stored {len(packages)} packages ({report['embedded']} embedded): {report['rows']} rows "
+                        f"in {report['write_seconds']:.2f}s ({report['rows_per_sec']:.0f} rows/sec)")
             
-            # Update FAISS index
-            self._update_faiss_index()
+            # Update FAISS index, replacing any vector this process indexed from either snapshot
+            removed_ids = sorted({
+                snapshot[package_id][0] for package_id in latest for snapshot in (stored, current)
+                if package_id in snapshot and snapshot[package_id][0] != embedding_ids[package_id]
+            })
+            added_ids = [new_ids[package_ids[i]] for i in positions]
+            added_packages = [package_ids[i] for i in positions]
+            # Vectors another writer stored with the same content are indexed under its embedding id
+            for package_id, i in latest.items():
+                if package_id not in new_ids and package_id in embedded:
+                    added_ids.append(embedding_ids[package_id])
+                    added_packages.append(package_id)
+                    vectors.append(embedded[package_id])
+            self._update_faiss_index(added_ids, vectors, added_packages, removed_ids)
             
-            return True
+            return report
         except Exception as e:
             logger.error(f"Error adding packages: {e}")
-            return False
+            return None
     
-    def _generate_text_from_package(self, package: Dict) -> str:
-        """Generate a text representation of a package for embedding."""
-        text = f"Travel package: {package.get('name', '')}\n"
-        text += f"Destination: {package.get('location', package.get('destination', ''))}\n"
-        text += f"Description: {package.get('description', '')}\n"
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's pooled read connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only this thread uses it; close() may run on another
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, cached_statements=256)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close the pooled connections of every thread."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+    
+    def _get_packages(self, package_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get decoded packages, from the package cache or with one query for the others.
         
-        # Add activities
+        Args:
+            package_ids: Package IDs to look up
+            
+        Returns:
+            dict of package ID -> package, for the IDs that exist
+        """
+        found = self.package_cache.get_many(package_ids)
+        missing = [package_id for package_id in dict.fromkeys(package_ids) if package_id not in found]
+        
+        conn = self._connection() if missing else None
+        for start in range(0, len(missing), SQL_BATCH_SIZE):
+            batch = missing[start:start + SQL_BATCH_SIZE]
+            rows = conn.execute(
+                f'SELECT id, package_json FROM packages WHERE id IN ({",".join("?" * len(batch))})', batch
+            ).fetchall()
+            decoded = {package_id: json.loads(package_json) for package_id, package_json in rows}
+            self.package_cache.put_many(decoded)
+            found.update(decoded)
+        
+        return found
+    
+    def _content_hash(self, text: str) -> str:
+        """Hash the text of a package together with the embedding model that embeds it."""
+        model = getattr(self.embedder, 'config', {}).get('embedding_model', '')
+        return hashlib.sha256(f"{model}\n{text}".encode('utf-8')).hexdigest()
+    
+    def _stored_embeddings(self, cursor, package_ids: List[str]) -> Dict[str, Tuple[int, str]]:
+        """Map stored package IDs to their (embedding id, content hash); the hash is None without a stored vector."""
+        stored = {}
+        unique_ids = list(dict.fromkeys(package_ids))
+        for start in range(0, len(unique_ids), SQL_BATCH_SIZE):
+            batch = unique_ids[start:start + SQL_BATCH_SIZE]
+            cursor.execute(f'''
+            SELECT package_id, id, CASE WHEN vector IS NULL THEN NULL ELSE content_hash END
+            FROM embeddings
+            WHERE package_id IN ({",".join("?" * len(batch))})
+            ''', batch)
+            for package_id, embedding_id, content_hash in cursor.fetchall():
+                stored[package_id] = (embedding_id, content_hash)
+        return stored
+    
+    @staticmethod
+    def _vector_to_blob(vector) -> bytes:
+        """Serialize an embedding as float32 bytes."""
+        return np.asarray(vector, dtype=np.float32).tobytes()
+    
+    @staticmethod
+    def _blob_to_vector(blob: bytes) -> np.ndarray:
+        """Deserialize an embedding stored by _vector_to_blob."""
+        return np.frombuffer(blob, dtype=np.float32)
+    
+    @staticmethod
+    def _package_columns(package: Dict) -> Tuple:
+        """
+        Parse the typed columns of a package.
+        
+        Args:
+            package: Package dictionary
+        
+        Returns:
+            Tuple of country, continent, price_amount, currency and duration_days,
+            each None where the package does not say
+        """
+        def category(value):
+            value = str(value).strip() if value is not None else ''
+            return value if value and value.lower() != 'unknown' else None
+        
+        price = package.get('price')
+        price_amount = parse_price_amount(price)
+        duration_days = parse_duration_days(package.get('duration'))
+        return (
+            category(package.get('country')),
+            category(package.get('continent')),
+            None if np.isnan(price_amount) else price_amount,
+            category(price.get('currency')) if isinstance(price, dict) else None,
+            None if np.isnan(duration_days) else duration_days,
+        )
+    
+    @staticmethod
+    def _activity_names(package: Dict) -> List[str]:
+        """Get the names of a package's activities."""
         activities = []
         if 'activities' in package and isinstance(package['activities'], list):
             for activity in package['activities']:
                 if isinstance(activity, dict) and 'name' in activity:
-                    activities.append(activity['name'])
+                    activities.append(str(activity['name']))
                 elif isinstance(activity, str):
                     activities.append(activity)
-            
-            if activities:
-                text += f"Activities: {', '.join(activities)}\n"
+        return activities
+    
+    def _write_package_attributes(self, conn: sqlite3.Connection, packages: Dict[str, Dict],
+                                  embedding_ids: Dict[str, int]) -> int:
+        """
+        Rewrite the attributes, tag links and full-text entries of packages.
+        
+        Runs inside the caller's write transaction.
+        
+        Args:
+            conn: Connection with an open write transaction
+            packages: dict of package ID -> package
+            embedding_ids: dict of package ID -> embeddings row id, for packages that have one
+        
+        Returns:
+            int: Number of rows written
+        """
+        package_ids = list(packages)
+        
+        # Upsert, so each package keeps the rowid its full-text entry is stored under
+        conn.executemany('''
+        INSERT INTO package_attributes
+        (package_id, embedding_id, country, continent, price_amount, currency, duration_days)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (package_id) DO UPDATE SET
+            embedding_id = excluded.embedding_id,
+            country = excluded.country,
+            continent = excluded.continent,
+            price_amount = excluded.price_amount,
+            currency = excluded.currency,
+            duration_days = excluded.duration_days
+        ''', [
+            (package_id, embedding_ids.get(package_id), *self._package_columns(package))
+            for package_id, package in packages.items()
+        ])
+        
+        tags = {package_id: package_tags(package) for package_id, package in packages.items()}
+        names = sorted(set().union(*tags.values()))
+        conn.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(name,) for name in names])
+        tag_ids = {}
+        for start in range(0, len(names), SQL_BATCH_SIZE):
+            batch = names[start:start + SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            tag_ids.update(conn.execute(f'SELECT name, id FROM tags WHERE name IN ({placeholders})', batch).fetchall())
+        
+        tag_rows = [(package_id, tag_ids[name]) for package_id in package_ids for name in tags[package_id]]
+        conn.executemany('DELETE FROM package_tags WHERE package_id = ?', [(package_id,) for package_id in package_ids])
+        conn.executemany('INSERT INTO package_tags (package_id, tag_id) VALUES (?, ?)', tag_rows)
+        
+        if not self.fts_enabled:
+            return len(packages) + len(tag_rows)
+        
+        rowids = {}
+        for start in range(0, len(package_ids), SQL_BATCH_SIZE):
+            batch = package_ids[start:start + SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rowids.update(conn.execute(
+                f'SELECT package_id, rowid FROM package_attributes WHERE package_id IN ({placeholders})', batch
+            ).fetchall())
+        conn.executemany('''
+        INSERT OR REPLACE INTO packages_fts (rowid, name, description, activities)
+        VALUES (?, ?, ?, ?)
+        ''', [
+            (rowids[package_id], str(package.get('name', '')), str(package.get('description', '')),
+             ', '.join(self._activity_names(package)))
+            for package_id, package in packages.items()
+        ])
+        return 2 * len(packages) + len(tag_rows)
+    
+    def _backfill_package_attributes(self, conn: sqlite3.Connection):
+        """
+        Fill the attributes, tag links and full-text entries of every stored package.
+        
+        Args:
+            conn: Connection to the database; the caller commits
+        """
+        packages = {}
+        embedding_ids = {}
+        for package_id, package_json, embedding_id in conn.execute('''
+        SELECT p.id, p.package_json, e.id
+        FROM packages p
+        LEFT JOIN embeddings e ON p.id = e.package_id
+        '''):
+            packages[package_id] = json.loads(package_json)
+            if embedding_id is not None:
+                embedding_ids[package_id] = embedding_id
+        
+        if packages:
+            logger.info(f"Indexing attributes of {len(packages)} stored packages")
+            self._write_package_attributes(conn, packages, embedding_ids)
+    
+    def _generate_text_from_package(self, package: Dict) -> str:
+        """Generate a text representation of a package for embedding."""
+        text = f"Travel package: {package.get('name', '')}\n"
+        text += f"Destination: {package.get('location', package.get('destination', ''))}\n"
+        text += f"Description: {package.get('description', '')}\n"
+        
+        # Add activities
+        activities = self._activity_names(package)
+        if activities:
+            text += f"Activities: {', '.join(activities)}\n"
         
         # Add duration and price
         text += f"Duration: {package.get('duration', '')}\n"
@@ -290,140 +731,398 @@ class EnhancedVectorStore:
         # Add other important attributes
         if 'country' in package:
             text += f"Country: {package['country']}\n"
-            
+        
         if 'continent' in package:
             text += f"Continent: {package['continent']}\n"
-            
+        
         if 'highlights' in package and isinstance(package['highlights'], list):
             text += f"Highlights: {', '.join(package['highlights'])}\n"
-            
+        
         return text
     
-    def _update_faiss_index(self):
-        """Update the FAISS index with all embeddings."""
+    def _update_faiss_index(self, embedding_ids: List[int], vectors, package_ids: List[str],
+                            removed_ids: Optional[List[int]] = None):
+        """
+        Append new vectors to the FAISS index and drop the ones they replace.
+        
+        Args:
+            embedding_ids: Embeddings row id of each new vector
+            vectors: The new vectors
+            package_ids: Package ID of each new vector
+            removed_ids: Embeddings row ids of replaced vectors
+        """
         try:
-            # Get all packages and their embeddings
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            if self.index is None:
+                # Loading brings the index in line with the embeddings table, which holds the new vectors
+                self._load_faiss_index()
+                return
             
-            # Get all packages
-            cursor.execute('''
-            SELECT p.id, p.package_json, e.id
-            FROM packages p
-            JOIN embeddings e ON p.id = e.package_id
-            ''')
+            # Only indexed vectors need removing
+            removed_ids = [embedding_id for embedding_id in removed_ids or [] if embedding_id in self.id_mapping]
+            if removed_ids:
+                for embedding_id in removed_ids:
+                    del self.id_mapping[embedding_id]
+                try:
+                    self.index.remove_ids(np.asarray(removed_ids, dtype=np.int64))
+                except RuntimeError:
+                    # HNSW cannot delete vectors; searches skip ids missing from id_mapping
+                    self.stale_ids += len(removed_ids)
             
-            packages_data = cursor.fetchall()
-            conn.close()
+            # Another thread may already have indexed a vector stored by a concurrent writer
+            new = [(embedding_id, vector, package_id)
+                   for embedding_id, vector, package_id in zip(embedding_ids, vectors, package_ids)
+                   if embedding_id not in self.id_mapping]
+            if len(new) < len(embedding_ids):
+                embedding_ids, vectors, package_ids = ([list(column) for column in zip(*new)] if new
+                                                       else ([], [], []))
             
-            if not packages_data:
-                logger.warning("No packages found for indexing")
-                return
+            if embedding_ids:
+                self.index.add_with_ids(normalize_vectors(vectors), np.asarray(embedding_ids, dtype=np.int64))
+                self.id_mapping.update(zip(embedding_ids, package_ids))
             
-            # Generate embeddings for all packages
-            package_ids = []
-            embedding_ids = []
-            texts = []
+            threshold = Config.VECTOR_INDEX.get("compaction_threshold", 0.2)
+            if self.stale_ids > threshold * max(len(self.id_mapping), 1):
+                self._rebuild_faiss_index()
             
-            for package_id, package_json, embedding_id in packages_data:
-                package = json.loads(package_json)
-                text = self._generate_text_from_package(package)
-                texts.append(text)
-                package_ids.append(package_id)
-                embedding_ids.append(embedding_id)
+            logger.info(f"FAISS index updated: {len(embedding_ids)} vectors added, "
+                        f"{len(removed_ids)} replaced, {self.index.ntotal} in total")
+        except Exception as e:
+            logger.error(f"Error updating FAISS index: {e}")
+    
+    def _rebuild_faiss_index(self):
+        """Build a new FAISS index from the vectors stored in the embeddings table."""
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, package_id, vector FROM embeddings WHERE vector IS NOT NULL ORDER BY id')
+            rows = cursor.fetchall()
+            conn.close()
             
-            # Get embeddings
-            embeddings = self.embedder.get_embeddings(texts)
+            if not rows:
+                logger.warning("No packages found for indexing")
+                self.index = None
+                self.id_mapping = {}
+                self.stale_ids = 0
+                return
             
-            # Create a FAISS index
-            vector_dim = len(embeddings[0])
-            self.index = faiss.IndexFlatL2(vector_dim)
+            embedding_ids = [embedding_id for embedding_id, _, _ in rows]
+            vectors_np = normalize_vectors(np.vstack([self._blob_to_vector(blob) for _, _, blob in rows]))
             
-            # Add vectors to the index
-            vectors_np = np.array(embeddings).astype('float32')
-            self.index.add(vectors_np)
+            # Create, train (for IVF types) and fill an inner product index of the configured type
+            self.index = build_id_index(vectors_np, embedding_ids, metric=faiss.METRIC_INNER_PRODUCT)
+            self.id_mapping = {embedding_id: package_id for embedding_id, package_id, _ in rows}
+            self.stale_ids = 0
+            self.save_index()
             
-            # Save mapping of FAISS indices to package IDs
-            self.id_mapping = list(zip(embedding_ids, package_ids))
+            logger.info(f"FAISS index rebuilt with {len(vectors_np)} stored vectors")
+        except Exception as e:
+            logger.error(f"Error rebuilding FAISS index: {e}")
+    
+    def _embed_missing_vectors(self):
+        """Embed packages stored without a vector, e.g. by versions that did not store vectors."""
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.cursor()
+            cursor.execute('''
+            SELECT p.package_json
+            FROM packages p
+            LEFT JOIN embeddings e ON p.id = e.package_id
+            WHERE e.vector IS NULL
+            ''')
+            packages = [json.loads(package_json) for package_json, in cursor.fetchall()]
+            conn.close()
             
-            # Save the index and mapping
+            if packages:
+                logger.info(f"Embedding {len(packages)} packages stored without a vector")
+                self.add_packages(packages)
+        except Exception as e:
+            logger.error(f"Error embedding packages without a vector: {e}")
+    
+    def _sync_faiss_index(self):
+        """Append stored vectors missing from the index and remove ids no longer in the embeddings table."""
+        conn = sqlite3.connect(str(self.db_path))
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, package_id FROM embeddings WHERE vector IS NOT NULL')
+        stored = dict(cursor.fetchall())
+        
+        missing = [embedding_id for embedding_id in stored if embedding_id not in self.id_mapping]
+        removed = [embedding_id for embedding_id in self.id_mapping if embedding_id not in stored]
+        
+        vectors = []
+        for start in range(0, len(missing), SQL_BATCH_SIZE):
+            batch = missing[start:start + SQL_BATCH_SIZE]
+            cursor.execute(f'SELECT id, vector FROM embeddings WHERE id IN ({",".join("?" * len(batch))})', batch)
+            blobs = dict(cursor.fetchall())
+            vectors.extend(self._blob_to_vector(blobs[embedding_id]) for embedding_id in batch)
+        conn.close()
+        
+        if missing or removed:
+            logger.info(f"Syncing FAISS index with the database: {len(missing)} vectors added, {len(removed)} removed")
+            self._update_faiss_index(missing, vectors, [stored[embedding_id] for embedding_id in missing], removed)
+            self.save_index()
+    
+    def save_index(self):
+        """Save a snapshot of the FAISS index and its id mapping."""
+        try:
+            if self.index is None:
+                return
             self.index_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.index_path, 'wb') as f:
                 pickle.dump((self.index, self.id_mapping), f)
-                
-            logger.info(f"FAISS index updated with {len(embeddings)} vectors")
         except Exception as e:
-            logger.error(f"Error updating FAISS index: {e}")
+            logger.error(f"Error saving FAISS index: {e}")
     
-    def search(self, query: str, k: int = 5) -> List[Dict]:
-        """Search for similar packages using FAISS."""
+    def search(self, query: str, k: int = 5, min_score: Optional[float] = None,
+               filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Search for similar packages using FAISS.
+        
+        Args:
+            query: The query text
+            k: Number of packages to return
+            min_score: Optional minimum cosine similarity; weaker matches are dropped
+            filters: Optional filter evaluated in SQLite before the vector search,
+                in the syntax of filter_package_ids
+        
+        Returns:
+            List of packages, best match first
+        """
         try:
             # Load index if not already loaded
             if self.index is None:
                 self._load_faiss_index()
-                
+            
             # If still not loaded, return empty results
             if self.index is None:
                 logger.warning("FAISS index not available")
                 return []
-                
-            # Generate query embedding
-            query_embedding = self.embedder.get_embeddings(query)
-            query_np = np.array([query_embedding]).astype('float32')
             
-            # Search the index
-            distances, indices = self.index.search(query_np, min(k, self.index.ntotal))
+            # Generate query embedding, reusing a recent one for a repeated query
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is None:
+                query_embedding = self.embedder.embed_batch([query])[0]
+                self.query_cache.put(query, query_embedding)
+            query_np = normalize_vectors(query_embedding)
             
-            # Get package IDs from index results
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.id_mapping):
-                    embedding_id, package_id = self.id_mapping[idx]
-                    
-                    # Get package from database
-                    conn = sqlite3.connect(str(self.db_path))
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT package_json FROM packages WHERE id = ?', (package_id,))
-                    result = cursor.fetchone()
-                    conn.close()
-                    
-                    if result:
-                        package = json.loads(result[0])
-                        # Calculate similarity score (1 - normalized distance)
-                        similarity = 1.0 - (distances[0][i] / max(distances[0]) if max(distances[0]) > 0 else 0)
-                        results.append((package, similarity))
+            if filters:
+                # Narrow the candidates in SQLite, then score only those
+                scores, labels = self._filtered_search(query_np, k, self._filter_embedding_ids(filters))
+            else:
+                # Search the index; scores are cosine similarities, best first.
+                # Get enough to step over replaced vectors the index could not delete.
+                scores, labels = self.index.search(query_np, min(k + self.stale_ids, self.index.ntotal))
+                scores, labels = scores[0], labels[0]
             
-            # Sort by similarity (highest first)
-            results.sort(key=lambda x: x[1], reverse=True)
+            # Get package IDs from index results
+            package_ids = []
+            for score, label in zip(scores, labels):
+                # Everything after the first result below the threshold scores lower still
+                if min_score is not None and score < min_score:
+                    break
+                
+                # Approximate indexes pad missing results with -1; replaced vectors are no longer mapped
+                package_id = self.id_mapping.get(int(label))
+                if package_id is not None:
+                    package_ids.append(package_id)
             
-            # Return just the packages
-            return [pkg for pkg, _ in results]
+            # Get all packages with one query, in ranking order
+            packages = self._get_packages(package_ids)
+            return [packages[package_id] for package_id in package_ids if package_id in packages][:k]
         except Exception as e:
             logger.error(f"Error during search: {e}")
             return []
     
+    def filter_package_ids(self, filters: Dict) -> List[str]:
+        """
+        Get the IDs of packages matching a filter, evaluated in SQLite.
+        
+        Filters take the same form as OptimizedVectorStore's, all conditions combined with AND:
+            {"continent": "Asia"}
+            {"country": {"in": ["Japan", "Thailand"]}}
+            {"price_amount": {"lt": 1500}, "duration_days": {"gte": 5, "lte": 10}}
+            {"tags": "beach"} or {"tags": {"all": ["snorkeling", "diving"]}}
+        plus full-text matching over name, description and activities:
+            {"text": "temple cooking"}
+        
+        Args:
+            filters: Filter dictionary
+        
+        Returns:
+            List of matching package IDs
+        
+        Raises:
+            ValueError: If a field or operator is not supported
+        """
+        where, params = self._compile_filters(filters)
+        cursor = self._connection().execute(f'SELECT a.package_id FROM package_attributes a WHERE {where}', params)
+        return [package_id for package_id, in cursor]
+    
+    def _compile_filters(self, filters: Dict) -> Tuple[str, List]:
+        """
+        Compile a declarative filter to a condition on the package_attributes table, aliased a.
+        
+        Unknown values are NULL, so like OptimizedVectorStore's filters they match
+        "ne", "nin" and "none" conditions and no others.
+        
+        Args:
+            filters: Filter dictionary (see filter_package_ids)
+        
+        Returns:
+            Tuple of the SQL condition and its parameters
+        
+        Raises:
+            ValueError: If a field or operator is not supported
+        """
+        clauses = []
+        params = []
+        
+        for field, condition in (filters or {}).items():
+            if not isinstance(condition, dict):
+                condition = {"any": condition} if field == TAG_FIELD else {"eq": condition}
+            
+            for op, value in condition.items():
+                if field in CATEGORICAL_FIELDS:
+                    if op not in CATEGORICAL_OPERATORS:
+                        raise ValueError(f"Unsupported operator '{op}' for {field}")
+                    values = [str(v) for v in (value if op in ("in", "nin") else [value])]
+                    placeholders = ','.join('?' * len(values))
+                    if op in ("eq", "in"):
+                        clauses.append(f'a.{field} IN ({placeholders})')
+                    else:
+                        clauses.append(f'(a.{field} IS NULL OR a.{field} NOT IN ({placeholders}))')
+                    params.extend(values)
+                elif field in NUMERIC_FIELDS:
+                    if op not in SQL_OPERATORS:
+                        raise ValueError(f"Unsupported operator '{op}' for {field}")
+                    if op == "ne":
+                        clauses.append(f'(a.{field} IS NULL OR a.{field} != ?)')
+                    else:
+                        clauses.append(f'a.{field} {SQL_OPERATORS[op]} ?')
+                    params.append(float(value))
+                elif field == TAG_FIELD:
+                    if op not in TAG_OPERATORS:
+                        raise ValueError(f"Unsupported operator '{op}' for {TAG_FIELD}")
+                    tags = sorted({str(tag).lower() for tag in ([value] if isinstance(value, str) else value)})
+                    if op == "all" and not tags:
+                        continue
+                    subquery = ('SELECT pt.package_id FROM package_tags pt JOIN tags t ON t.id = pt.tag_id '
+                                f"WHERE t.name IN ({','.join('?' * len(tags))})")
+                    if op == "all":
+                        subquery += ' GROUP BY pt.package_id HAVING COUNT(*) = ?'
+                    clauses.append(f"a.package_id {'NOT IN' if op == 'none' else 'IN'} ({subquery})")
+                    params.extend(tags)
+                    if op == "all":
+                        params.append(len(tags))
+                elif field == TEXT_FIELD:
+                    if op != "eq":
+                        raise ValueError(f"Unsupported operator '{op}' for {TEXT_FIELD}")
+                    if not self.fts_enabled:
+                        raise ValueError("Full-text filters need SQLite with FTS5")
+                    # Quote every word so user text cannot inject FTS5 query syntax
+                    terms = ['"' + term.replace('"', '""') + '"' for term in str(value).split()]
+                    if terms:
+                        clauses.append('a.rowid IN (SELECT rowid FROM packages_fts WHERE packages_fts MATCH ?)')
+                        params.append(' '.join(terms))
+                else:
+                    raise ValueError(f"Unsupported filter field '{field}'")
+        
+        return ' AND '.join(clauses) or '1', params
+    
+    def _filter_embedding_ids(self, filters: Dict) -> List[int]:
+        """Get the FAISS ids (embeddings row ids) of the indexed packages matching a filter."""
+        where, params = self._compile_filters(filters)
+        cursor = self._connection().execute(f'SELECT a.embedding_id FROM package_attributes a WHERE {where}', params)
+        # Packages without an indexed vector are not mapped
+        return [embedding_id for embedding_id, in cursor if embedding_id in self.id_mapping]
+    
+    def _filtered_search(self, query_np, k: int, embedding_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a normalized query against the given FAISS ids only.
+        
+        Small candidate sets are scored exactly from their stored vectors; larger
+        ones are searched through the index with an IDSelector.
+        
+        Returns:
+            Tuple of scores and FAISS ids, best first
+        """
+        if not embedding_ids:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        
+        num_candidates = min(len(embedding_ids), k)
+        if len(embedding_ids) <= Config.VECTOR_INDEX.get("exact_filter_max_rows", 2048):
+            return self._exact_search(query_np, num_candidates, embedding_ids)
+        
+        ids_np = np.asarray(embedding_ids, dtype=np.int64)
+        selector = faiss.IDSelectorBatch(len(ids_np), faiss.swig_ptr(ids_np))
+        params = search_parameters(self.index, sel=selector)
+        scores, labels = self.index.search(query_np, num_candidates, params=params)
+        if (labels[0] >= 0).sum() < num_candidates:
+            # HNSW and IVF can miss matches of a selective filter; score them exactly instead
+            return self._exact_search(query_np, num_candidates, embedding_ids)
+        return scores[0], labels[0]
+    
+    def _exact_search(self, query_np, num_candidates: int, embedding_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a normalized query against stored vectors with one matrix product and keep the best."""
+        vectors = {}
+        cursor = self._connection().cursor()
+        for start in range(0, len(embedding_ids), SQL_BATCH_SIZE):
+            batch = embedding_ids[start:start + SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            cursor.execute(f'SELECT id, vector FROM embeddings WHERE id IN ({placeholders})', batch)
+            vectors.update(cursor.fetchall())
+        if not vectors:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        
+        ids_np = np.fromiter(vectors, dtype=np.int64, count=len(vectors))
+        vectors_np = normalize_vectors(np.vstack([self._blob_to_vector(blob) for blob in vectors.values()]))
+        scores = vectors_np @ query_np[0]
+        
+        num_candidates = min(num_candidates, len(scores))
+        top = np.argpartition(-scores, num_candidates - 1)[:num_candidates]
+        top = top[np.argsort(-scores[top])]
+        return scores[top], ids_np[top]
+    
     def _load_faiss_index(self):
-        """Load the FAISS index from disk if available."""
+        """Load the FAISS index from disk if available and bring it in line with the database."""
         try:
+            # Packages stored before vectors were kept in the database are embedded once
+            self._embed_missing_vectors()
+            if self.index is not None:
+                return
+            
             if self.index_path.exists():
                 with open(self.index_path, 'rb') as f:
-                    self.index, self.id_mapping = pickle.load(f)
-                logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+                    index, id_mapping = pickle.load(f)
+                
+                if isinstance(id_mapping, dict) and uses_inner_product(index):
+                    self.index, self.id_mapping = index, id_mapping
+                    logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+                    self._sync_faiss_index()
+                    return
+                
+                # Indexes saved before vectors were labelled by embedding id (or used L2 over raw vectors)
+                logger.info("Rebuilding FAISS index saved in an older format from the stored vectors")
             else:
                 logger.warning(f"FAISS index not found at {self.index_path}")
-                self._update_faiss_index()
+            
+            self._rebuild_faiss_index()
         except Exception as e:
             logger.error(f"Error loading FAISS index: {e}")
     
+    def get_statistics(self) -> Dict:
+        """Get statistics about the index, the query embedding cache and the package cache."""
+        return {
+            'index_size': self.index.ntotal if self.index is not None else 0,
+            'stale_ids': self.stale_ids,
+            'embedded_texts': self.embedded_texts,
+            'query_cache': self.query_cache.get_statistics(),
+            'package_cache': self.package_cache.get_statistics()
+        }
+    
     def get_all_packages(self) -> List[Dict]:
         """Get all packages from the database."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute('SELECT package_json FROM packages')
-            results = cursor.fetchall()
-            conn.close()
-            
+            results = self._connection().execute('SELECT package_json FROM packages').fetchall()
             return [json.loads(row[0]) for row in results]
         except Exception as e:
             logger.error(f"Error getting all packages: {e}")
@@ -432,15 +1131,7 @@ class EnhancedVectorStore:
     def get_package_by_id(self, package_id: str) -> Optional[Dict]:
         """Get a package by its ID."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute('SELECT package_json FROM packages WHERE id = ?', (package_id,))
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                return json.loads(result[0])
-            return None
+            return self._get_packages([package_id]).get(package_id)
         except Exception as e:
             logger.error(f"Error getting package by ID: {e}")
-            return None
\ No newline at end of file
+            return None
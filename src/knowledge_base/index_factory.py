@@ -0,0 +1,183 @@
+import logging
+import numpy as np
+import faiss
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+# IVF k-means wants roughly this many training points per cell
+MIN_POINTS_PER_CELL = 39
+
+
+def create_index(dimension, num_vectors=0, index_config=None, metric=faiss.METRIC_L2):
+    """
+    Create an empty FAISS index of the configured type.
+
+    IVF indexes size their number of cells to the data, and fall back to a flat
+    index when there are too few vectors to train on.
+
+    Args:
+        dimension: Vector dimension
+        num_vectors: Number of vectors the index will be trained on
+        index_config: Index settings, defaults to Config.VECTOR_INDEX
+        metric: FAISS metric (METRIC_L2 or METRIC_INNER_PRODUCT)
+
+    Returns:
+        A FAISS index (IVF indexes still need to be trained)
+    """
+    index_config = index_config or Config.VECTOR_INDEX
+    index_type = index_config.get("type", "flat")
+
+    if index_type not in INDEX_TYPES:
+        logger.warning(f"Unknown index type '{index_type}', using flat index")
+        index_type = "flat"
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, index_config.get("hnsw_m", 32), metric)
+        index.hnsw.efConstruction = index_config.get("ef_construction", 200)
+        index.hnsw.efSearch = index_config.get("ef_search", 64)
+        return index
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nlist = min(index_config.get("nlist", 100), num_vectors // MIN_POINTS_PER_CELL)
+        pq_m = index_config.get("pq_m", 16)
+        pq_bits = index_config.get("pq_bits", 8)
+
+        if nlist < 1 or (index_type == "ivf_pq" and num_vectors < MIN_POINTS_PER_CELL * 2 ** pq_bits):
+            logger.info(f"Only {num_vectors} vectors, too few to train {index_type}; using flat index")
+            return _flat_index(dimension, metric)
+
+        quantizer = _flat_index(dimension, metric)
+        if index_type == "ivf_pq":
+            if dimension % pq_m != 0:
+                logger.warning(f"pq_m={pq_m} does not divide dimension {dimension}, using ivf_flat instead")
+                index = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+            else:
+                index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_bits, metric)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+
+        index.nprobe = min(index_config.get("nprobe", 8), nlist)
+        return index
+
+    return _flat_index(dimension, metric)
+
+
+def build_index(vectors, dimension=None, index_config=None, metric=faiss.METRIC_L2):
+    """
+    Create, train and fill an index with all vectors.
+
+    Args:
+        vectors: 2D array of vectors
+        dimension: Vector dimension, defaults to vectors.shape[1]
+        index_config: Index settings, defaults to Config.VECTOR_INDEX
+        metric: FAISS metric (METRIC_L2 or METRIC_INNER_PRODUCT)
+
+    Returns:
+        A trained FAISS index containing the vectors
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dimension = dimension or vectors.shape[1]
+
+    index = create_index(dimension, len(vectors), index_config, metric)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def build_id_index(vectors, ids, dimension=None, index_config=None, metric=faiss.METRIC_L2):
+    """
+    Create, train and fill an index that labels vectors with caller-chosen int64 ids.
+
+    IVF indexes store ids natively; other types are wrapped in IndexIDMap2 so
+    vectors can later be added with add_with_ids and deleted with remove_ids.
+
+    Args:
+        vectors: 2D array of vectors
+        ids: int64 id for each vector
+        dimension: Vector dimension, defaults to vectors.shape[1]
+        index_config: Index settings, defaults to Config.VECTOR_INDEX
+        metric: FAISS metric (METRIC_L2 or METRIC_INNER_PRODUCT)
+
+    Returns:
+        A trained FAISS index containing the vectors under the given ids
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    ids = np.ascontiguousarray(ids, dtype=np.int64)
+    dimension = dimension or vectors.shape[1]
+
+    index = create_index(dimension, len(vectors), index_config, metric)
+    if not index.is_trained:
+        index.train(vectors)
+    if not isinstance(index, faiss.IndexIVF):
+        # IndexIDMap2.remove_ids expects the wrapped index to renumber like flat storage, so IVF keeps its own ids
+        index = faiss.IndexIDMap2(index)
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def search_parameters(index, ef_search=None, nprobe=None, sel=None):
+    """
+    Build per-query search parameters for an index.
+
+    Parameters are passed to index.search rather than set on the index, so
+    concurrent queries with different settings do not interfere.
+
+    Args:
+        index: The FAISS index that will be searched
+        ef_search: HNSW efSearch override
+        nprobe: IVF nprobe override
+        sel: Optional faiss.IDSelector limiting the search to some ids (the
+            caller must keep it alive until the search returns)
+
+    Returns:
+        faiss.SearchParameters or None if there is nothing to override
+    """
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexIDMap):
+        inner = faiss.downcast_index(inner.index)
+
+    # Typed parameters replace the index's own settings, so fill in its defaults
+    if isinstance(inner, faiss.IndexHNSW) and (ef_search is not None or sel is not None):
+        ef_search = inner.hnsw.efSearch if ef_search is None else ef_search
+        return faiss.SearchParametersHNSW(efSearch=int(ef_search), sel=sel)
+
+    if isinstance(inner, faiss.IndexIVF) and (nprobe is not None or sel is not None):
+        nprobe = inner.nprobe if nprobe is None else nprobe
+        return faiss.SearchParametersIVF(nprobe=int(min(nprobe, inner.nlist)), sel=sel)
+
+    if sel is not None:
+        return faiss.SearchParameters(sel=sel)
+
+    return None
+
+
+def normalize_vectors(vectors):
+    """
+    L2-normalize vectors so inner product search returns cosine similarity.
+
+    Args:
+        vectors: 1D vector or 2D array of vectors
+
+    Returns:
+        float32 2D array of unit-length rows (all-zero rows are left as is)
+    """
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def uses_inner_product(index):
+    """Check whether an index scores by inner product (cosine on normalized vectors)."""
+    return index is not None and index.metric_type == faiss.METRIC_INNER_PRODUCT
+
+
+def _flat_index(dimension, metric):
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        return faiss.IndexFlatIP(dimension)
+    return faiss.IndexFlatL2(dimension)
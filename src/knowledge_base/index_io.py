@@ -0,0 +1,110 @@
+import os
+import logging
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+
+def index_file_paths(store_path):
+    """
+    Get the FAISS index and vector file paths that sit next to a store file.
+
+    Args:
+        store_path: Path of the store's pickle file (e.g. data/embeddings/vector_store.pkl)
+
+    Returns:
+        tuple: (index path ending in .faiss, vectors path ending in .npy)
+    """
+    base = os.path.splitext(str(store_path))[0]
+    return f"{base}.faiss", f"{base}.npy"
+
+
+def save_index_files(store_path, index, vectors):
+    """
+    Write a FAISS index and its float32 vector matrix next to a store file.
+
+    Files are written to a temporary name and renamed into place, so processes
+    that have the previous files memory-mapped keep reading a consistent copy.
+
+    Args:
+        store_path: Path of the store's pickle file
+        index: The FAISS index to write (may be None)
+        vectors: 2D array of vectors backing the index
+
+    Returns:
+        bool: True if the files were written
+    """
+    index_path, vectors_path = index_file_paths(store_path)
+
+    if index is None or len(vectors) == 0:
+        # Nothing to persist; remove stale files so they are not loaded later
+        for path in (index_path, vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return False
+
+    try:
+        tmp_index_path = f"{index_path}.tmp"
+        faiss.write_index(index, tmp_index_path)
+
+        tmp_vectors_path = f"{vectors_path}.tmp"
+        with open(tmp_vectors_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+
+        os.replace(tmp_index_path, index_path)
+        os.replace(tmp_vectors_path, vectors_path)
+
+        logger.info(f"Saved FAISS index ({index.ntotal} vectors) to {index_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving FAISS index files: {e}")
+        return False
+
+
+def load_index_files(store_path, mmap=True, expected_count=None):
+    """
+    Open a FAISS index and its vectors written by save_index_files.
+
+    With mmap enabled the index is opened with faiss.IO_FLAG_MMAP and the vectors
+    with np.load(mmap_mode='r'), so worker processes share the same pages and
+    nothing is copied at startup.
+
+    Args:
+        store_path: Path of the store's pickle file
+        mmap: Whether to memory-map the files instead of reading them
+        expected_count: Number of vectors the index should hold, defaults to the
+            number of rows in the vectors file
+
+    Returns:
+        tuple: (index, vectors), or (None, None) if the files are missing or inconsistent
+    """
+    index_path, vectors_path = index_file_paths(store_path)
+
+    if not (os.path.exists(index_path) and os.path.exists(vectors_path)):
+        return None, None
+
+    try:
+        vectors = np.load(vectors_path, mmap_mode='r' if mmap else None)
+
+        index = None
+        if mmap:
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP)
+            except Exception as e:
+                # Not every index type supports mmap in every FAISS version
+                logger.warning(f"Could not memory-map FAISS index, reading it instead: {e}")
+        if index is None:
+            index = faiss.read_index(index_path)
+
+        if expected_count is None:
+            expected_count = len(vectors)
+        if index.ntotal != expected_count:
+            logger.warning(f"FAISS index has {index.ntotal} vectors but {expected_count} were expected, ignoring files")
+            return None, None
+
+        logger.info(f"Opened FAISS index with {index.ntotal} vectors from {index_path}")
+        return index, vectors
+    except Exception as e:
+        logger.error(f"Error loading FAISS index files: {e}")
+        return None, None
@@ -0,0 +1,307 @@
+import re
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = ("continent", "country")
+NUMERIC_FIELDS = ("price_amount", "duration_days")
+TAG_FIELD = "tags"
+
+# Operators accepted in {"field": {"op": value}} conditions
+NUMERIC_OPERATORS = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "lt": np.less,
+    "lte": np.less_equal,
+    "gt": np.greater,
+    "gte": np.greater_equal,
+}
+CATEGORICAL_OPERATORS = ("eq", "ne", "in", "nin")
+TAG_OPERATORS = ("any", "all", "none")
+
+# Vacation types tagged the same way generate_text_representation marks them
+TYPE_KEYWORDS = {
+    "beach": ("beach",),
+    "mountain": ("mountain", "hik"),
+    "city": ("city", "museum"),
+}
+
+
+def parse_price_amount(price):
+    """
+    Get the numeric amount of a package price.
+
+    Args:
+        price: A number, a {"amount": ...} dict or a string such as "$1,200"
+
+    Returns:
+        float amount, or NaN if there is none
+    """
+    if isinstance(price, dict):
+        price = price.get('amount')
+    if isinstance(price, (int, float)):
+        return float(price)
+    if isinstance(price, str):
+        match = re.search(r'\d[\d,]*(?:\.\d+)?', price)
+        if match:
+            return float(match.group().replace(',', ''))
+    return np.nan
+
+
+def parse_duration_days(duration):
+    """
+    Get the length of a package in days.
+
+    Args:
+        duration: A number of days or a string such as "7 days", "6 nights" or "2 weeks"
+
+    Returns:
+        float number of days, or NaN if there is none
+    """
+    if isinstance(duration, (int, float)):
+        return float(duration)
+    if isinstance(duration, str):
+        match = re.search(r'(\d+(?:\.\d+)?)\s*(day|night|week)?', duration.lower())
+        if match:
+            days = float(match.group(1))
+            return days * 7 if match.group(2) == 'week' else days
+    return np.nan
+
+
+def package_tags(document):
+    """
+    Get the lowercase tags of a package: its own tags, activity names and vacation types.
+
+    Args:
+        document: Package dictionary
+
+    Returns:
+        set of tags
+    """
+    tags = set()
+    if isinstance(document.get('tags'), list):
+        tags.update(str(tag).lower() for tag in document['tags'])
+
+    activities = []
+    if isinstance(document.get('activities'), list):
+        for activity in document['activities']:
+            if isinstance(activity, dict) and 'name' in activity:
+                activities.append(str(activity['name']).lower())
+            elif isinstance(activity, str):
+                activities.append(activity.lower())
+    tags.update(activities)
+
+    text = " ".join([str(document.get('description', '')).lower()] + activities)
+    for vacation_type, keywords in TYPE_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            tags.add(vacation_type)
+
+    return tags
+
+
+def extract_metadata(document):
+    """
+    Get the filterable metadata of a package.
+
+    Args:
+        document: Package dictionary
+
+    Returns:
+        dict with continent, country, price_amount, duration_days and tags
+    """
+    def category(value):
+        value = str(value or '').strip().lower()
+        return value if value and value != 'unknown' else None
+
+    return {
+        'continent': category(document.get('continent')),
+        'country': category(document.get('country')),
+        'price_amount': parse_price_amount(document.get('price')),
+        'duration_days': parse_duration_days(document.get('duration')),
+        'tags': package_tags(document),
+    }
+
+
+class MetadataColumns:
+    """
+    Columnar package metadata kept row-aligned with a vector store's vectors.
+
+    Categorical fields are stored as integer codes, numeric fields as float
+    arrays (NaN when unknown) and tags as an inverted index of rows per tag, so
+    a declarative filter compiles to a handful of vectorized NumPy operations.
+
+    Filters are dictionaries whose conditions are all combined with AND:
+        {"continent": "Asia"}
+        {"country": {"in": ["Japan", "Thailand"]}}
+        {"price_amount": {"lt": 1500}, "duration_days": {"gte": 5, "lte": 10}}
+        {"tags": "beach"} or {"tags": {"any": ["snorkeling", "diving"]}}
+    """
+
+    def __init__(self):
+        """Create empty columns."""
+        self.present = np.zeros(0, dtype=bool)  # Rows holding a document
+        self.codes = {field: np.zeros(0, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.vocab = {field: {} for field in CATEGORICAL_FIELDS}  # value -> code
+        self.numbers = {field: np.zeros(0, dtype=np.float64) for field in NUMERIC_FIELDS}
+        self.row_tags = []   # Tags of each row
+        self.tag_rows = {}   # tag -> set of rows
+
+    @classmethod
+    def from_documents(cls, documents):
+        """Build columns for a list of documents (None entries are empty rows)."""
+        columns = cls()
+        columns.append(documents)
+        return columns
+
+    def __len__(self):
+        return len(self.present)
+
+    def append(self, documents):
+        """Add one row per document at the end."""
+        start = len(self)
+        count = len(documents)
+
+        self.present = np.concatenate([self.present, np.zeros(count, dtype=bool)])
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field] = np.concatenate([self.codes[field], np.full(count, -1, dtype=np.int32)])
+        for field in NUMERIC_FIELDS:
+            self.numbers[field] = np.concatenate([self.numbers[field], np.full(count, np.nan)])
+        self.row_tags.extend(frozenset() for _ in range(count))
+
+        self.set_rows(range(start, start + count), documents)
+
+    def set_rows(self, rows, documents):
+        """Overwrite the metadata of existing rows."""
+        for row, document in zip(rows, documents):
+            if document is None:
+                self.clear_rows([row])
+                continue
+
+            metadata = extract_metadata(document)
+            self.present[row] = True
+            for field in CATEGORICAL_FIELDS:
+                self.codes[field][row] = self._code(field, metadata[field])
+            for field in NUMERIC_FIELDS:
+                self.numbers[field][row] = metadata[field]
+
+            self._set_tags(row, metadata['tags'])
+
+    def clear_rows(self, rows):
+        """Mark rows as holding no document, so no filter matches them."""
+        rows = list(rows)
+        self.present[rows] = False
+        for row in rows:
+            self._set_tags(row, frozenset())
+
+    def take(self, rows):
+        """Get new columns holding only the given rows, in order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = MetadataColumns()
+        columns.present = self.present[rows]
+        columns.codes = {field: codes[rows] for field, codes in self.codes.items()}
+        columns.vocab = {field: dict(vocab) for field, vocab in self.vocab.items()}
+        columns.numbers = {field: numbers[rows] for field, numbers in self.numbers.items()}
+        columns.row_tags = [self.row_tags[row] for row in rows]
+        for new_row, tags in enumerate(columns.row_tags):
+            for tag in tags:
+                columns.tag_rows.setdefault(tag, set()).add(new_row)
+        return columns
+
+    def mask(self, filters):
+        """
+        Compile a declarative filter to a boolean row mask.
+
+        Args:
+            filters: Filter dictionary (see class docstring)
+
+        Returns:
+            numpy bool array with one entry per row
+
+        Raises:
+            ValueError: If a field or operator is not supported
+        """
+        mask = self.present.copy()
+
+        for field, condition in (filters or {}).items():
+            if not isinstance(condition, dict):
+                condition = {"any": condition} if field == TAG_FIELD else {"eq": condition}
+
+            for op, value in condition.items():
+                if field in CATEGORICAL_FIELDS:
+                    mask &= self._categorical_mask(field, op, value)
+                elif field in NUMERIC_FIELDS:
+                    if op not in NUMERIC_OPERATORS:
+                        raise ValueError(f"Unsupported operator '{op}' for {field}")
+                    mask &= NUMERIC_OPERATORS[op](self.numbers[field], float(value))
+                elif field == TAG_FIELD:
+                    mask &= self._tag_mask(op, value)
+                else:
+                    raise ValueError(f"Unsupported filter field '{field}'")
+
+        return mask
+
+    def _categorical_mask(self, field, op, value):
+        if op not in CATEGORICAL_OPERATORS:
+            raise ValueError(f"Unsupported operator '{op}' for {field}")
+
+        values = value if op in ("in", "nin") else [value]
+        codes = [self.vocab[field][str(v).lower()] for v in values if str(v).lower() in self.vocab[field]]
+        matches = np.isin(self.codes[field], codes)
+        return matches if op in ("eq", "in") else ~matches
+
+    def _tag_mask(self, op, value):
+        if op not in TAG_OPERATORS:
+            raise ValueError(f"Unsupported operator '{op}' for {TAG_FIELD}")
+
+        tags = [value] if isinstance(value, str) else list(value)
+        combined = np.ones(len(self), dtype=bool) if op == "all" else np.zeros(len(self), dtype=bool)
+
+        for tag in tags:
+            rows = self.tag_rows.get(str(tag).lower(), ())
+            tag_mask = np.zeros(len(self), dtype=bool)
+            tag_mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+            if op == "all":
+                combined &= tag_mask
+            else:
+                combined |= tag_mask
+
+        return ~combined if op == "none" else combined
+
+    def _code(self, field, value):
+        if value is None:
+            return -1
+        return self.vocab[field].setdefault(value, len(self.vocab[field]))
+
+    def _set_tags(self, row, tags):
+        for tag in self.row_tags[row] - tags:
+            self.tag_rows[tag].discard(row)
+            if not self.tag_rows[tag]:
+                del self.tag_rows[tag]
+        for tag in tags - self.row_tags[row]:
+            self.tag_rows.setdefault(tag, set()).add(row)
+        self.row_tags[row] = frozenset(tags)
+
+    def to_dict(self):
+        """Get a plain dictionary of the columns for pickling."""
+        return {
+            'present': self.present,
+            'codes': self.codes,
+            'vocab': self.vocab,
+            'numbers': self.numbers,
+            'row_tags': self.row_tags,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore columns saved with to_dict."""
+        columns = cls()
+        columns.present = data['present']
+        columns.codes = data['codes']
+        columns.vocab = data['vocab']
+        columns.numbers = data['numbers']
+        columns.row_tags = data['row_tags']
+        for row, tags in enumerate(columns.row_tags):
+            for tag in tags:
+                columns.tag_rows.setdefault(tag, set()).add(row)
+        return columns
@@ -0,0 +1,191 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def details_path(store_path):
+    """
+    Get the path of the detail database that sits next to a store file.
+
+    Args:
+        store_path: Path of the store's pickle file (e.g. data/embeddings/vector_store.pkl)
+
+    Returns:
+        str: Path ending in _details.db
+    """
+    return f"{os.path.splitext(str(store_path))[0]}_details.db"
+
+
+def split_package(package, fields=None):
+    """
+    Split a package into its hot record and its cold enrichment fields.
+
+    Args:
+        package: Package dictionary
+        fields: Cold field names (defaults to Config.PACKAGE_DETAILS["fields"])
+
+    Returns:
+        tuple: (package without the cold fields, dict of the cold fields it had)
+    """
+    fields = fields or Config.PACKAGE_DETAILS["fields"]
+    if not any(field in package for field in fields):
+        return package, {}
+
+    hot = {key: value for key, value in package.items() if key not in fields}
+    cold = {field: package[field] for field in fields if package.get(field) is not None}
+    return hot, cold
+
+
+class PackageDetailStore:
+    """
+    Cold storage for bulky package enrichment (destination guides, weather, local info).
+
+    Each field of each package is stored as its own JSON row keyed by
+    (package ID, field), so callers load only the fields they use, and
+    get_slice extracts part of a field inside SQLite, e.g. the first 500
+    characters of a 50 KB guide, without reading the rest into Python.
+    """
+
+    def __init__(self, db_path):
+        """
+        Open or create the detail database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS package_details (
+            package_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (package_id, field)
+        ) WITHOUT ROWID
+        ''')
+        self._conn.commit()
+
+    def put_many(self, details):
+        """
+        Store the cold fields of several packages, replacing the fields they had.
+
+        Args:
+            details: dict of package ID -> dict of field -> value
+        """
+        if not details:
+            return
+
+        try:
+            with self._lock:
+                self._conn.executemany("DELETE FROM package_details WHERE package_id = ?",
+                                       [(str(package_id),) for package_id in details])
+                self._conn.executemany(
+                    "INSERT INTO package_details (package_id, field, data) VALUES (?, ?, ?)",
+                    [
+                        (str(package_id), field, json.dumps(value, ensure_ascii=False))
+                        for package_id, fields in details.items()
+                        for field, value in fields.items()
+                    ]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error storing package details: {e}")
+
+    def get(self, package_id, fields=None):
+        """
+        Load some or all cold fields of a package.
+
+        Args:
+            package_id: Package ID
+            fields: Field names to load (all stored fields if None)
+
+        Returns:
+            dict of field -> value, for the fields the package has
+        """
+        query = "SELECT field, data FROM package_details WHERE package_id = ?"
+        params = [str(package_id)]
+        if fields is not None:
+            query += f" AND field IN ({','.join('?' * len(fields))})"
+            params.extend(fields)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading details of package {package_id}: {e}")
+            return {}
+        return {field: json.loads(data) for field, data in rows}
+
+    def get_slice(self, package_id, field, path="$", max_chars=None):
+        """
+        Load part of one cold field, extracted inside SQLite.
+
+        Args:
+            package_id: Package ID
+            field: Field name, e.g. "destination_guide"
+            path: JSON path within the field, e.g. "$.extract" or "$.daily"
+            max_chars: Optional length limit for string values
+
+        Returns:
+            The value at path (a string, number, dict or list), or None if missing
+        """
+        value = "json_extract(data, ?)"
+        if max_chars is not None:
+            value = f"CASE WHEN json_type(data, ?) = 'text' THEN substr({value}, 1, {int(max_chars)}) ELSE {value} END"
+            params = [path, path, path]
+        else:
+            params = [path]
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT {value}, json_type(data, ?) FROM package_details WHERE package_id = ? AND field = ?",
+                    params + [path, str(package_id), field]
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading {field} of package {package_id}: {e}")
+            return None
+
+        if row is None or row[0] is None:
+            return None
+        # Objects and arrays come back as JSON text
+        return json.loads(row[0]) if row[1] in ("object", "array") else row[0]
+
+    def remove(self, package_ids):
+        """
+        Delete the cold fields of packages.
+
+        Args:
+            package_ids: Package IDs
+        """
+        try:
+            with self._lock:
+                self._conn.executemany("DELETE FROM package_details WHERE package_id = ?",
+                                       [(str(package_id),) for package_id in package_ids])
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error removing package details: {e}")
+
+    def get_statistics(self):
+        """Get the number of packages with details and the stored size."""
+        with self._lock:
+            packages, total_bytes = self._conn.execute(
+                "SELECT COUNT(DISTINCT package_id), COALESCE(SUM(LENGTH(data)), 0) FROM package_details"
+            ).fetchone()
+        return {'detail_packages': packages, 'detail_bytes': total_bytes}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,209 @@
+import re
+import math
+import logging
+from collections import Counter
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Words too common in emails and package texts to help ranking
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "our", "the", "to", "us", "we", "with", "you", "your"
+])
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental BM25 inverted index over document texts.
+
+    Documents are keyed by integer ids (the vector store's FAISS ids). Each
+    document occupies a slot; postings map a term to {slot: term frequency}
+    and are turned into NumPy arrays on first use, so a query costs one
+    vectorized update per query term.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.slots = {}         # document id -> slot
+        self.slot_ids = []      # slot -> document id (-1 when removed)
+        self.doc_lengths = []   # slot -> number of tokens (0 when removed)
+        self.postings = {}      # term -> {slot: term frequency}
+        self.slot_terms = []    # slot -> terms of the document, for removal
+        self.total_length = 0
+        self._arrays = {}       # term -> (slots, term frequencies) as NumPy arrays
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, doc_id, text):
+        """
+        Index a document, replacing any earlier text under the same id.
+
+        Args:
+            doc_id: Integer document id
+            text: Text to index
+        """
+        if doc_id in self.slots:
+            self.remove(doc_id)
+
+        counts = Counter(tokenize(text))
+        slot = len(self.slot_ids)
+        self.slots[doc_id] = slot
+        self.slot_ids.append(doc_id)
+        self.doc_lengths.append(sum(counts.values()))
+        self.slot_terms.append(tuple(counts))
+        self.total_length += self.doc_lengths[slot]
+
+        for term, frequency in counts.items():
+            self.postings.setdefault(term, {})[slot] = frequency
+            self._arrays.pop(term, None)
+
+    def remove(self, doc_id):
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id: Integer document id
+
+        Returns:
+            bool: True if the document was indexed
+        """
+        slot = self.slots.pop(doc_id, None)
+        if slot is None:
+            return False
+
+        for term in self.slot_terms[slot]:
+            postings = self.postings[term]
+            del postings[slot]
+            self._arrays.pop(term, None)
+            if not postings:
+                del self.postings[term]
+
+        self.total_length -= self.doc_lengths[slot]
+        self.doc_lengths[slot] = 0
+        self.slot_terms[slot] = ()
+        self.slot_ids[slot] = -1
+
+        # Reclaim slots once most of them are dead
+        if len(self.slot_ids) > 64 and len(self.slots) < len(self.slot_ids) // 2:
+            self._compact()
+        return True
+
+    def is_keyword_query(self, query, max_terms):
+        """
+        Check whether a query is a short list of words that all occur in the index.
+
+        Such queries (a destination or activity name) are answered well by BM25
+        alone, without a query embedding.
+
+        Args:
+            query: Query text
+            max_terms: Largest number of distinct terms a keyword query may have
+
+        Returns:
+            bool
+        """
+        terms = set(tokenize(query))
+        return 0 < len(terms) <= max_terms and all(term in self.postings for term in terms)
+
+    def search(self, query, k=None):
+        """
+        Rank documents against a query with BM25.
+
+        Args:
+            query: Query text
+            k: Number of results to return, or None for every matching document
+
+        Returns:
+            List of (document id, score) tuples, best first
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.slots:
+            return []
+
+        num_docs = len(self.slots)
+        avg_length = self.total_length / num_docs if num_docs else 1.0
+        lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        scores = np.zeros(len(self.slot_ids), dtype=np.float32)
+
+        for term in terms:
+            arrays = self._postings_array(term)
+            if arrays is None:
+                continue
+            slots, frequencies = arrays
+            idf = math.log(1 + (num_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[slots] / avg_length)
+            scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        matches = np.flatnonzero(scores > 0)
+        if k is not None and len(matches) > k:
+            matches = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        matches = matches[np.argsort(-scores[matches])]
+
+        return [(self.slot_ids[slot], float(scores[slot])) for slot in matches]
+
+    def _postings_array(self, term):
+        if term not in self.postings:
+            return None
+        if term not in self._arrays:
+            postings = self.postings[term]
+            self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            )
+        return self._arrays[term]
+
+    def _compact(self):
+        """Renumber live documents into consecutive slots."""
+        new_slots = {slot: new_slot for new_slot, slot in enumerate(sorted(self.slots.values()))}
+
+        self.postings = {
+            term: {new_slots[slot]: frequency for slot, frequency in postings.items()}
+            for term, postings in self.postings.items()
+        }
+        self.doc_lengths = [self.doc_lengths[slot] for slot in new_slots]
+        self.slot_terms = [self.slot_terms[slot] for slot in new_slots]
+        self.slot_ids = [self.slot_ids[slot] for slot in new_slots]
+        self.slots = {doc_id: new_slots[slot] for doc_id, slot in self.slots.items()}
+        self._arrays = {}
+
+    def to_dict(self):
+        """Get a plain dictionary of the index for pickling."""
+        return {
+            'k1': self.k1,
+            'b': self.b,
+            'slot_ids': self.slot_ids,
+            'doc_lengths': self.doc_lengths,
+            'postings': self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore an index saved with to_dict."""
+        index = cls(k1=data.get('k1', 1.2), b=data.get('b', 0.75))
+        index.slot_ids = data['slot_ids']
+        index.doc_lengths = data['doc_lengths']
+        index.postings = data['postings']
+        index.slots = {doc_id: slot for slot, doc_id in enumerate(index.slot_ids) if doc_id != -1}
+        index.total_length = sum(index.doc_lengths)
+        index.slot_terms = [[] for _ in index.slot_ids]
+        for term, postings in index.postings.items():
+            for slot in postings:
+                index.slot_terms[slot].append(term)
+        return index
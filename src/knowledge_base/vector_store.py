@@ -4,6 +4,8 @@ import numpy as np
 import logging
 from src.config import Config
 from src.generation.llm_wrapper import OllamaWrapper
+from src.knowledge_base.index_io import save_index_files, load_index_files
+from src.knowledge_base.index_factory import build_index, normalize_vectors, uses_inner_product
 import faiss
 
 logger = logging.getLogger(__name__)
@@ -13,12 +15,12 @@ class VectorStore:
     
     def __init__(self, ollama_client=None):
         """Initialize the vector store."""
-        self.vectors = []
+        self.embedding_dimension = Config.EMBEDDING_DIMENSION
+        self.vectors = np.zeros((0, self.embedding_dimension), dtype=np.float32)
         self.documents = []
         self.embedder = ollama_client or OllamaWrapper()
         self.store_path = Config.VECTOR_STORE_PATH
         self.index = None
-        self.embedding_dimension = Config.EMBEDDING_DIMENSION
         
     def add_documents(self, documents, texts=None):
         """
@@ -32,10 +34,11 @@ class VectorStore:
             texts = [str(doc) for doc in documents]
         
         try:
-            embeddings = self.embedder.get_embeddings(texts)
+            # Normalize once at insert so the inner product index scores by cosine similarity
+            embeddings = normalize_vectors(self.embedder.embed_batch(texts))
             
             # Add to our store
-            self.vectors.extend(embeddings)
+            self.vectors = np.vstack([self.vectors, embeddings])
             self.documents.extend(documents)
             
             # Update the FAISS index
@@ -49,18 +52,12 @@ class VectorStore:
     def _update_index(self):
         """Update or create the FAISS index with current vectors."""
         try:
-            # Convert list of vectors to numpy array
-            if not self.vectors:
+            if len(self.vectors) == 0:
                 logger.warning("No vectors to index")
                 return
                 
-            vectors_np = np.array(self.vectors).astype('float32')
-            
-            # Create a new index
-            self.index = faiss.IndexFlatL2(vectors_np.shape[1])
-            
-            # Add vectors to the index
-            self.index.add(vectors_np)
+            # Create, train (for IVF types) and fill a new inner product index of the configured type
+            self.index = build_index(self.vectors, metric=faiss.METRIC_INNER_PRODUCT)
             logger.info(f"Updated FAISS index with {len(self.vectors)} vectors")
         except Exception as e:
             logger.error(f"Error updating FAISS index: {e}")
@@ -78,7 +75,7 @@ class VectorStore:
         Returns:
             List of (document, score) tuples
         """
-        if not self.vectors:
+        if len(self.vectors) == 0:
             logger.warning("Vector store is empty. No results to return.")
             return []
         
@@ -106,26 +103,19 @@ class VectorStore:
                     
                 query_embedding = query_embedding_np.tolist()
             
-            # Convert to numpy array
-            query_np = np.array([query_embedding]).astype('float32')
+            # Normalize the query so inner products are cosine similarities
+            query_np = normalize_vectors(query_embedding)
             
             # If FAISS index exists, use it for fast search
             if self.index is not None:
-                # Search using FAISS
-                distances, indices = self.index.search(query_np, min(k, len(self.vectors)))
+                # Search using FAISS; results come back best first
+                scores, indices = self.index.search(query_np, min(k, len(self.vectors)))
                 
-                # Convert distances to similarity scores (1 - normalized distance)
-                # FAISS uses L2 distance by default, so we convert to a similarity score
-                max_dist = np.max(distances) if distances.size > 0 else 1.0
-                if max_dist == 0:
-                    max_dist = 1.0
-                    
                 results = []
-                for i, idx in enumerate(indices[0]):
-                    if idx < len(self.documents):  # Ensure index is valid
-                        # Convert distance to similarity score (1 = identical, 0 = completely different)
-                        similarity = 1.0 - (distances[0][i] / max_dist)
-                        results.append((self.documents[idx], similarity))
+                for score, idx in zip(scores[0], indices[0]):
+                    # Approximate indexes pad missing results with -1
+                    if 0 <= idx < len(self.documents):
+                        results.append((self.documents[idx], float(score)))
                 
                 return results
             else:
@@ -218,8 +208,11 @@ class VectorStore:
         """Save the vector store to disk."""
         try:
             os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            
+            # Vectors and the FAISS index go to memory-mappable files next to the pickle
+            save_index_files(self.store_path, self.index, self.vectors)
             with open(self.store_path, 'wb') as f:
-                pickle.dump((self.vectors, self.documents), f)
+                pickle.dump((None, self.documents), f)
             logger.info(f"Vector store saved to {self.store_path}")
             return True
         except Exception as e:
@@ -231,12 +224,24 @@ class VectorStore:
         try:
             if os.path.exists(self.store_path):
                 with open(self.store_path, 'rb') as f:
-                    self.vectors, self.documents = pickle.load(f)
+                    vectors, self.documents = pickle.load(f)
                 logger.info(f"Vector store loaded from {self.store_path} with {len(self.documents)} documents")
                 
-                # Initialize FAISS index after loading vectors
-                if self.vectors:
-                    self._update_index()
+                if vectors is None:
+                    # Open the persisted index and vectors memory-mapped, without rebuilding
+                    self.index, self.vectors = load_index_files(self.store_path)
+                    if self.index is None:
+                        logger.warning(f"FAISS index files for {self.store_path} are missing or inconsistent")
+                        self.vectors = np.zeros((0, self.embedding_dimension), dtype=np.float32)
+                    elif not uses_inner_product(self.index):
+                        # Stores saved before cosine scoring used an L2 index over raw vectors
+                        self.vectors = normalize_vectors(self.vectors)
+                        self._update_index()
+                else:
+                    # Older stores pickled the vectors as a list; build the index from them
+                    self.vectors = normalize_vectors(vectors).reshape(-1, self.embedding_dimension)
+                    if len(self.vectors):
+                        self._update_index()
                 
                 return True
             else:
@@ -1,9 +1,13 @@
 import os
 import sys
 import json
+import asyncio
 import logging
+import argparse
 from pathlib import Path
 
+import numpy as np
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,11 +20,13 @@ logger = logging.getLogger(__name__)
 project_dir = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_dir))
 
+from src.config import Config
 from src.email_processing.extractor import EmailExtractor
+from src.email_processing.rule_extractor import build_gazetteer
 from src.knowledge_base.vector_store import VectorStore
 from src.retrieval.retriever import Retriever
 from enhanced_proposal_generator import ProposalGenerator
-from src.generation.llm_wrapper import OllamaWrapper
+from src.generation.llm_wrapper import OllamaWrapper, AsyncOllamaWrapper
 from src.utils.data_cleanup import clean_country_data
 from standardized_data_schema import standardize_packages, package_to_dict
 from optimized_vector_store import OptimizedVectorStore
@@ -249,8 +255,260 @@ def process_email(email_text, retriever, proposal_generator, top_k=3):
             'proposal': "Error generating proposal."
         }
 
-def main():
+def load_batch_emails(input_path):
+    """
+    Read emails to process from a JSONL file.
+    
+    Each line is an object with the email text under "email" or "body" and an
+    optional "id"; lines without an id are numbered from 1.
+    
+    Returns:
+        list: (id, email text) tuples
+    """
+    emails = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping invalid JSON on line {line_number} of {input_path}: {e}")
+                continue
+            email_text = (record.get('email') or record.get('body')) if isinstance(record, dict) else None
+            if not email_text:
+                logger.warning(f"Skipping line {line_number} of {input_path}: no email text")
+                continue
+            emails.append((str(record.get('id', line_number)), email_text))
+    return emails
+
+def load_batch_checkpoint(output_path):
+    """Get the ids of emails already processed successfully in an earlier run's output."""
+    done = set()
+    if not Path(output_path).exists():
+        return done
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Line cut off by an interrupted run
+                continue
+            if 'error' not in record:
+                done.add(str(record.get('id')))
+    return done
+
+async def run_batch_pipeline(emails, output_path, extractor, retriever, proposal_generator,
+                             workers, top_k=3, queue_size=32, checkpoint_every=10):
+    """
+    Process emails through extraction, retrieval and generation stages.
+    
+    Each stage has its own pool of workers connected by bounded queues, so a
+    slow stage holds back the ones before it instead of buffering everything.
+    Results are appended to output_path as they finish, in completion order.
+    
+    Args:
+        emails: (id, email text) tuples
+        output_path: JSONL file results are appended to
+        extractor: EmailExtractor
+        retriever: Retriever
+        proposal_generator: ProposalGenerator
+        workers: Dict with the number of "extract", "retrieve" and "generate" workers
+        top_k: Number of packages per email
+        queue_size: Capacity of the queues between stages
+        checkpoint_every: Results written between fsyncs of the output file
+        
+    Returns:
+        list: One job dict per email with its id, stage timings and outcome
+    """
+    extract_queue = asyncio.Queue(maxsize=queue_size)
+    retrieve_queue = asyncio.Queue(maxsize=queue_size)
+    generate_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue()
+    jobs = []
+    
+    async def extract(job):
+        # Answered from the cache, the email skips the remaining stages; cache I/O runs in worker threads
+        job['result'] = await asyncio.to_thread(response_cache.get, job['email'])
+        if job['result'] is None:
+            job['extracted_info'] = await extractor.extract_from_email_async(job['email'])
+            job['result'] = await asyncio.to_thread(response_cache.get_semantic, job['extracted_info'])
+        if job['result'] is not None:
+            job['cached'] = True
+            return True
+        return False
+    
+    async def retrieve(job):
+        job['query'] = retriever.build_query(job['extracted_info'])
+        packages = await retriever.retrieve_relevant_packages_async(job['query'], top_k=top_k)
+        job['packages'] = clean_country_data(packages) if packages else packages
+        return False
+    
+    async def generate(job):
+        proposal = await proposal_generator.generate_proposal_async(job['extracted_info'], job['packages'])
+        timings = job['timings']
+        job['result'] = {
+            'extracted_info': job['extracted_info'],
+            'query': job['query'],
+            'recommended_packages': job['packages'],
+            'proposal': proposal,
+            'timings': {
+                'extraction_ms': timings['extract'] * 1000,
+                'retrieval_ms': timings['retrieve'] * 1000,
+                'generation_ms': (time.perf_counter() - job['stage_start']) * 1000,
+                'total_ms': (time.perf_counter() - job['start']) * 1000
+            }
+        }
+        await asyncio.to_thread(response_cache.put, job['email'], job['result'])
+        return True
+    
+    async def stage_worker(name, handler, in_queue, out_queue):
+        while True:
+            job = await in_queue.get()
+            if job is None:
+                return
+            job['stage_start'] = time.perf_counter()
+            job.setdefault('start', job['stage_start'])
+            try:
+                finished = await handler(job)
+            except Exception as e:
+                logger.error(f"Error in {name} stage for email {job['id']}: {e}")
+                job['error'] = f"{name}: {e}"
+                finished = True
+            job['timings'][name] = time.perf_counter() - job['stage_start']
+            await (write_queue if finished else out_queue).put(job)
+    
+    async def run_stage(name, handler, in_queue, out_queue, next_workers):
+        await asyncio.gather(*[stage_worker(name, handler, in_queue, out_queue)
+                               for _ in range(workers[name])])
+        # Tell the next stage's workers that no more jobs are coming
+        for _ in range(next_workers):
+            await out_queue.put(None)
+    
+    async def feed():
+        for email_id, email_text in emails:
+            job = {'id': email_id, 'email': email_text, 'timings': {}, 'cached': False}
+            jobs.append(job)
+            await extract_queue.put(job)
+        for _ in range(workers['extract']):
+            await extract_queue.put(None)
+    
+    async def write():
+        written = 0
+        with open(output_path, 'a', encoding='utf-8') as f:
+            while True:
+                job = await write_queue.get()
+                if job is None:
+                    break
+                job['latency'] = time.perf_counter() - job['start']
+                if 'error' in job:
+                    record = {'id': job['id'], 'error': job['error']}
+                else:
+                    record = {'id': job['id'], 'cached': job['cached'], **job['result']}
+                f.write(json.dumps(record, default=str) + "\n")
+                f.flush()
+                written += 1
+                if written % checkpoint_every == 0:
+                    # Everything written so far survives a crash and is skipped on resume
+                    os.fsync(f.fileno())
+                # Drop the email text and intermediate data once written
+                for key in ('email', 'result', 'extracted_info', 'packages'):
+                    job.pop(key, None)
+            os.fsync(f.fileno())
+    
+    writer = asyncio.ensure_future(write())
+    await asyncio.gather(
+        feed(),
+        run_stage('extract', extract, extract_queue, retrieve_queue, workers['retrieve']),
+        run_stage('retrieve', retrieve, retrieve_queue, generate_queue, workers['generate']),
+        run_stage('generate', generate, generate_queue, write_queue, 0)
+    )
+    await write_queue.put(None)
+    await writer
+    return jobs
+
+def summarize_batch(jobs, elapsed):
+    """Log throughput and latency percentiles of a batch run."""
+    succeeded = [job for job in jobs if 'error' not in job]
+    cached = sum(1 for job in succeeded if job['cached'])
+    
+    logger.info("\n=== Batch Summary ===")
+    logger.info(f"Emails: {len(jobs)} ({len(succeeded) - cached} processed, {cached} from cache, "
+                f"{len(jobs) - len(succeeded)} failed)")
+    logger.info(f"Elapsed: {elapsed:.1f}s, throughput: {len(jobs) / max(elapsed, 1e-9):.2f} emails/s")
+    
+    def log_percentiles(label, seconds):
+        if seconds:
+            p50, p90, p99 = np.percentile(np.array(seconds) * 1000, [50, 90, 99])
+            logger.info(f"{label:<12} p50 {p50:9.1f} ms   p90 {p90:9.1f} ms   p99 {p99:9.1f} ms")
+    
+    log_percentiles("end to end", [job['latency'] for job in jobs if 'latency' in job])
+    for stage in ('extract', 'retrieve', 'generate'):
+        log_percentiles(stage, [job['timings'][stage] for job in succeeded
+                                if not job['cached'] and stage in job['timings']])
+
+def run_batch(args, packages, vector_store):
+    """Process a JSONL file of emails with the batch pipeline (--batch)."""
+    input_path = Path(args.batch)
+    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_results.jsonl")
+    
+    emails = load_batch_emails(input_path)
+    if args.no_resume and output_path.exists():
+        output_path.unlink()
+    done = load_batch_checkpoint(output_path)
+    pending = [(email_id, email_text) for email_id, email_text in emails if email_id not in done]
+    logger.info(f"Batch: {len(emails)} emails in {input_path}, {len(emails) - len(pending)} already done, "
+                f"{len(pending)} to process -> {output_path}")
+    if not pending:
+        return
+    
+    workers = {
+        'extract': args.extract_workers,
+        'retrieve': args.retrieve_workers,
+        'generate': args.generate_workers
+    }
+    
+    async def run():
+        # One connection pool shared by every stage
+        async_ollama = AsyncOllamaWrapper()
+        vector_store.async_embedder = async_ollama
+        extractor = EmailExtractor(async_ollama_client=async_ollama, known_destinations=build_gazetteer(packages))
+        proposal_generator = ProposalGenerator(async_ollama_client=async_ollama, detail_store=vector_store.detail_store)
+        try:
+            return await run_batch_pipeline(
+                pending, output_path, extractor, Retriever(vector_store), proposal_generator, workers,
+                top_k=args.top_k, queue_size=Config.BATCH["queue_size"],
+                checkpoint_every=Config.BATCH["checkpoint_every"]
+            )
+        finally:
+            await async_ollama.aclose()
+    
+    start_time = time.perf_counter()
+    jobs = asyncio.run(run())
+    summarize_batch(jobs, time.perf_counter() - start_time)
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Travel RAG system')
+    parser.add_argument('--batch', metavar='INPUT_JSONL',
+                        help='Process the emails in a JSONL file instead of the example emails')
+    parser.add_argument('--output', metavar='OUTPUT_JSONL',
+                        help='Where batch results are written (default: <input>_results.jsonl)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Start the batch over instead of skipping emails already in the output')
+    parser.add_argument('--extract-workers', type=int, default=Config.BATCH["extract_workers"],
+                        help='Concurrent extractions in batch mode')
+    parser.add_argument('--retrieve-workers', type=int, default=Config.BATCH["retrieve_workers"],
+                        help='Concurrent retrievals in batch mode')
+    parser.add_argument('--generate-workers', type=int, default=Config.BATCH["generate_workers"],
+                        help='Concurrent proposal generations in batch mode')
+    parser.add_argument('--top-k', type=int, default=3, help='Packages per email')
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main entry point for the travel RAG system."""
+    args = parse_args(argv)
+    
     # Set paths
     base_dir = Path(__file__).resolve().parent.parent
     data_dir = base_dir / "data" / "synthetic"
@@ -288,6 +546,10 @@ def main():
         sys.exit(1)
     logger.info(f"Loaded {len(packages)} travel packages.")
     
+    if args.batch:
+        run_batch(args, packages, initialize_vector_store(packages))
+        return
+    
     emails = load_example_emails(emails_path)
     if not emails:
         logger.warning("No example emails found.")
@@ -307,7 +569,7 @@ def main():
     
     # Create retriever and proposal generator
     retriever = Retriever(vector_store)
-    proposal_generator = ProposalGenerator()
+    proposal_generator = ProposalGenerator(detail_store=vector_store.detail_store)
     
     # Update example email to be more specific about beach
     if emails and emails[0].get('subject') == "Looking for a family vacation":
@@ -364,8 +626,8 @@ def main():
     
     # Show cache statistics
     logger.info("\n=== Cache Statistics ===")
-    logger.info(f"Response cache entries: {len(response_cache.cache)}")
-    logger.info(f"Destination cache entries: {len(destination_cache.destinations)}")
+    logger.info(f"Response cache entries: {len(response_cache)}")
+    logger.info(f"Destination cache entries: {len(destination_cache)}")
     
     
     logger.info("Travel RAG System initialized successfully.")
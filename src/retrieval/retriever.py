@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from src.config import Config
 from src.email_processing.extractor import EmailExtractor
 from src.knowledge_base.vector_store import VectorStore
 
@@ -7,9 +9,17 @@ logger = logging.getLogger(__name__)
 class Retriever:
     """Retrieves relevant travel packages based on customer needs."""
     
-    def __init__(self, vector_store=None):
-        """Initialize the retriever with a vector store."""
+    def __init__(self, vector_store=None, retrieval_mode=None):
+        """
+        Initialize the retriever with a vector store.
+        
+        Args:
+            vector_store: Store to search (defaults to VectorStore)
+            retrieval_mode: "dense", "keyword" or "hybrid" (defaults to Config.RETRIEVAL["mode"]);
+                stores without keyword search always use dense search
+        """
         self.vector_store = vector_store or VectorStore()
+        self.retrieval_mode = retrieval_mode or Config.RETRIEVAL.get("mode", "dense")
         
     def build_query(self, extracted_info):
         """
@@ -78,11 +88,129 @@ class Retriever:
         Returns:
             list: List of relevant travel packages
         """
-        results = self.vector_store.similarity_search(query, k=top_k*2)  # Get more results to rerank
+        results = self._search(query, k=top_k*2)  # Get more results to rerank
+        return self._rerank_results(query, results, top_k)
+    
+    async def retrieve_relevant_packages_async(self, query, top_k=3):
+        """
+        Async variant of retrieve_relevant_packages.
+        
+        Stores without a native async search are run in a worker thread so the
+        event loop is never blocked.
+        
+        Args:
+            query: The search query
+            top_k: Number of results to return
+            
+        Returns:
+            list: List of relevant travel packages
+        """
+        if self.retrieval_mode == "keyword" and hasattr(self.vector_store, 'keyword_search'):
+            # BM25 needs no embedding call and takes well under a millisecond
+            results = self.vector_store.keyword_search(query, k=top_k*2)
+        elif self.retrieval_mode == "hybrid" and hasattr(self.vector_store, 'hybrid_search_async'):
+            results = await self.vector_store.hybrid_search_async(query, k=top_k*2)
+        elif hasattr(self.vector_store, 'similarity_search_async'):
+            results = await self.vector_store.similarity_search_async(query, k=top_k*2)
+        else:
+            results = await asyncio.to_thread(self._search, query, top_k*2)
+        return self._rerank_results(query, results, top_k)
+    
+    def retrieve_many(self, extracted_infos, top_k=3):
+        """
+        Retrieve packages for several customers at once.
+
+        Queries are embedded in one batched call and searched together when the
+        vector store supports batch_hybrid_search or batch_similarity_search;
+        otherwise they are searched one by one.
+
+        Args:
+            extracted_infos: List of dictionaries with extracted email information
+            top_k: Number of packages to return per customer
+
+        Returns:
+            list: One list of relevant travel packages per entry in extracted_infos
+        """
+        queries = [self.build_query(extracted_info) for extracted_info in extracted_infos]
+        if not queries:
+            return []
+
+        if self.retrieval_mode == "hybrid" and hasattr(self.vector_store, 'batch_hybrid_search'):
+            results = self.vector_store.batch_hybrid_search(queries, k=top_k*2)
+        elif self.retrieval_mode != "keyword" and hasattr(self.vector_store, 'batch_similarity_search'):
+            results = self.vector_store.batch_similarity_search(queries, k=top_k*2)
+        else:
+            results = [self._search(query, k=top_k*2) for query in queries]
+
+        return [
+            self._rerank_results(query, doc_score_pairs, top_k)
+            for query, doc_score_pairs in zip(queries, results)
+        ]
+
+    async def retrieve_many_async(self, extracted_infos, top_k=3):
+        """
+        Async variant of retrieve_many.
+
+        Stores without batch_hybrid_search_async or batch_similarity_search_async
+        fall back to retrieve_many in a worker thread.
+
+        Args:
+            extracted_infos: List of dictionaries with extracted email information
+            top_k: Number of packages to return per customer
+
+        Returns:
+            list: One list of relevant travel packages per entry in extracted_infos
+        """
+        queries = [self.build_query(extracted_info) for extracted_info in extracted_infos]
+        if not queries:
+            return []
+
+        if self.retrieval_mode == "hybrid" and hasattr(self.vector_store, 'batch_hybrid_search_async'):
+            results = await self.vector_store.batch_hybrid_search_async(queries, k=top_k*2)
+        elif self.retrieval_mode != "keyword" and hasattr(self.vector_store, 'batch_similarity_search_async'):
+            results = await self.vector_store.batch_similarity_search_async(queries, k=top_k*2)
+        else:
+            return await asyncio.to_thread(self.retrieve_many, extracted_infos, top_k)
+
+        return [
+            self._rerank_results(query, doc_score_pairs, top_k)
+            for query, doc_score_pairs in zip(queries, results)
+        ]
+
+    def _search(self, query, k):
+        """
+        Search the vector store with the configured retrieval mode.
         
-        # Extract documents and scores
-        doc_score_pairs = results
+        Args:
+            query: The search query
+            k: Number of results to return
+            
+        Returns:
+            list: List of (document, score) tuples, best first
+        """
+        if self.retrieval_mode == "keyword" and hasattr(self.vector_store, 'keyword_search'):
+            return self.vector_store.keyword_search(query, k=k)
+        if self.retrieval_mode == "hybrid" and hasattr(self.vector_store, 'hybrid_search'):
+            return self.vector_store.hybrid_search(query, k=k)
+        return self.vector_store.similarity_search(query, k=k)
+
+    def _rerank_results(self, query, doc_score_pairs, top_k):
+        """
+        Boost results that match the vacation type asked for in the query.
         
+        Boosts are on the scale of cosine similarity. Fused and BM25 scores
+        have a different range (reciprocal-rank scores are around 0.016-0.033),
+        so the boosts are scaled to the spread of the candidates' scores and
+        reorder results instead of overriding the fused ranking.
+        
+        Args:
+            query: The search query
+            doc_score_pairs: List of (document, score) tuples from the vector store
+            top_k: Number of results to return
+            
+        Returns:
+            list: List of relevant travel packages
+        """
         # Check if we're looking for a specific type of vacation
         is_beach_query = 'beach' in query.lower() or 'seaside' in query.lower() or 'ocean' in query.lower()
         is_mountain_query = 'mountain' in query.lower() or 'hiking' in query.lower() or 'nature' in query.lower()
@@ -91,6 +219,7 @@ class Retriever:
         if is_beach_query or is_mountain_query or is_city_query:
             # Re-rank results based on vacation type
             reranked_results = []
+            boost_scale = self._boost_scale(doc_score_pairs)
             
             for doc, score in doc_score_pairs:
                 # Check package type
@@ -127,20 +256,39 @@ class Retriever:
                     elif any(('museum' in act or 'sight' in act) for act in activities):
                         type_boost = 0.3
                 
-                # Apply boost
-                reranked_results.append((doc, score + type_boost))
+                # Apply boost; ties go to the better type match
+                reranked_results.append((doc, score + type_boost * boost_scale, type_boost))
             
             # Sort by new score
-            reranked_results.sort(key=lambda x: x[1], reverse=True)
+            reranked_results.sort(key=lambda x: (x[1], x[2]), reverse=True)
             
             # Take top_k results
-            packages = [doc for doc, _ in reranked_results[:top_k]]
+            packages = [doc for doc, _, _ in reranked_results[:top_k]]
         else:
             # Just take top results without reranking
             packages = [doc for doc, _ in doc_score_pairs[:top_k]]
         
         return packages
     
+    def _boost_scale(self, doc_score_pairs):
+        """
+        Get the factor that puts the type boosts on the scale of the search scores.
+        
+        Args:
+            doc_score_pairs: List of (document, score) tuples from the vector store
+            
+        Returns:
+            float: 1.0 for cosine similarity scores, otherwise the spread of the scores
+        """
+        fused = (
+            (self.retrieval_mode == "hybrid" and hasattr(self.vector_store, 'hybrid_search'))
+            or (self.retrieval_mode == "keyword" and hasattr(self.vector_store, 'keyword_search'))
+        )
+        if not fused:
+            return 1.0
+        scores = [score for _, score in doc_score_pairs]
+        return max(scores) - min(scores) if scores else 0.0
+    
     def get_packages_from_email(self, email_text, top_k=3):
         """
         Process an email and retrieve relevant packages.
@@ -1,6 +1,8 @@
+import os
 import json
 import uuid
 import logging
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -320,4 +322,32 @@ def merge_package_sources(sources: List[str], output_path: str) -> bool:
             return False
     except Exception as e:
         logger.error(f"Error merging package sources: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def write_json_atomic(file_path, data: Any, **dump_kwargs) -> None:
+    """
+    Write JSON to a file so readers never see a partial file.
+
+    The data is written to a temporary file next to the target, flushed to
+    disk and renamed over it. The temporary name is unique per process and
+    thread, so concurrent writers of the same file do not clobber each
+    other's temporary file; the last rename wins.
+
+    Args:
+        file_path: File to write
+        data: JSON-serializable data
+        **dump_kwargs: Extra arguments for json.dump (e.g. indent)
+    """
+    path = Path(file_path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
@@ -0,0 +1,136 @@
+#tests/test_cache_concurrency.py
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from response_caching_system import ResponseCache
+
+WORKERS = int(os.environ.get("CACHE_STRESS_WORKERS", 4))
+ITERATIONS = int(os.environ.get("CACHE_STRESS_ITERATIONS", 50))
+SHARED_KEYS = 10
+
+
+def _worker(cache_dir, backend, worker_id, iterations, errors):
+    """Hammer one cache directory: write own and shared keys, read everyone's."""
+    try:
+        cache = ResponseCache(cache_dir=cache_dir, max_size=20, backend=backend)
+        for i in range(iterations):
+            cache.put(f"worker {worker_id} email {i}", {"worker": worker_id, "i": i, "proposal": "x" * 500})
+            # Every worker rewrites the same keys
+            shared = i % SHARED_KEYS
+            cache.put(f"shared email {shared}", {"shared": shared, "proposal": "y" * 500})
+
+            data = cache.get(f"worker {worker_id} email {i}")
+            if data is None or data["i"] != i:
+                errors.put(f"worker {worker_id}: lost own entry {i}")
+            data = cache.get(f"shared email {shared}")
+            if data is None or data["shared"] != shared:
+                errors.put(f"worker {worker_id}: bad shared entry {shared}: {data}")
+            # Read whatever other workers have written so far
+            for other in range(WORKERS):
+                data = cache.get(f"worker {other} email {i // 2}")
+                if data is not None and data["worker"] != other:
+                    errors.put(f"worker {worker_id}: entry of worker {other} holds {data}")
+    except Exception as e:
+        errors.put(f"worker {worker_id}: {type(e).__name__}: {e}")
+
+
+class TestCacheConcurrency(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _run_processes(self, backend):
+        ctx = multiprocessing.get_context("spawn")
+        errors = ctx.Queue()
+        processes = [
+            ctx.Process(target=_worker, args=(self.cache_dir, backend, worker_id, ITERATIONS, errors))
+            for worker_id in range(WORKERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120)
+            self.assertEqual(process.exitcode, 0)
+
+        messages = []
+        while not errors.empty():
+            messages.append(errors.get())
+        self.assertEqual(messages, [])
+
+        # A fresh cache sees every entry written by every worker
+        cache = ResponseCache(cache_dir=self.cache_dir, backend=backend)
+        self.assertEqual(len(cache), WORKERS * ITERATIONS + SHARED_KEYS)
+        for worker_id in range(WORKERS):
+            for i in range(ITERATIONS):
+                self.assertEqual(cache.get(f"worker {worker_id} email {i}")["i"], i)
+
+        # No temporary files left behind
+        self.assertEqual([p for p in os.listdir(self.cache_dir) if p.endswith(".tmp")], [])
+
+    def test_sqlite_backend_across_processes(self):
+        self._run_processes("sqlite")
+
+    def test_json_backend_across_processes(self):
+        self._run_processes("json")
+        # Every file is a complete JSON document
+        for path in Path(self.cache_dir).glob("*.json"):
+            with open(path) as f:
+                json.load(f)
+
+    def test_threads_share_one_cache(self):
+        cache = ResponseCache(cache_dir=self.cache_dir, max_size=20, max_bytes=20000, backend="sqlite")
+        failures = []
+
+        def run(thread_id):
+            try:
+                for i in range(ITERATIONS):
+                    cache.put(f"thread {thread_id} email {i}", {"i": i, "proposal": "z" * 500})
+                    if cache.get(f"thread {thread_id} email {i}")["i"] != i:
+                        failures.append((thread_id, i))
+                    cache.get_statistics()
+            except Exception as e:
+                failures.append((thread_id, repr(e)))
+
+        threads = [threading.Thread(target=run, args=(thread_id,)) for thread_id in range(WORKERS * 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        self.assertEqual(len(cache), WORKERS * 2 * ITERATIONS)
+        self.assertLessEqual(len(cache.cache), 20)
+        self.assertLessEqual(cache.memory_bytes, 20000)
+        self.assertEqual(cache.memory_bytes, sum(cache.entry_sizes.values()))
+
+    def test_sqlite_hits_do_not_write(self):
+        cache = ResponseCache(cache_dir=self.cache_dir, backend="sqlite")
+        cache.put("hello", {"proposal": "x", "extracted_info": {"destination": "Paris"}})
+        observer = sqlite3.connect(str(cache.backend.db_path))
+        version = observer.execute("PRAGMA data_version").fetchone()[0]
+
+        for _ in range(5):
+            self.assertIsNotNone(cache.get("hello"))
+            self.assertIsNotNone(cache.get_semantic({"destination": "Paris"}))
+
+        # data_version changes when another connection commits
+        self.assertEqual(observer.execute("PRAGMA data_version").fetchone()[0], version)
+        self.assertEqual(cache.backend.get_statistics()["access_counts"], {"10-19": 1})
+        observer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
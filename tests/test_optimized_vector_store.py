@@ -0,0 +1,195 @@
+#tests/test_optimized_vector_store.py
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config
+from src.knowledge_base.metadata_filter import MetadataColumns
+from optimized_vector_store import OptimizedVectorStore
+
+CONTINENTS = ["Europe", "Asia", "Africa", "South America"]
+
+
+class StubEmbedder:
+    """Returns a unit vector seeded by each text, so equal texts embed to equal vectors."""
+
+    config = Config.OLLAMA
+
+    def embed_batch(self, texts):
+        vectors = np.stack([
+            np.random.RandomState(int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16))
+            .randn(Config.EMBEDDING_DIMENSION)
+            for text in texts
+        ]).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_documents(count, description="A relaxing trip"):
+    return [
+        {
+            "id": f"pkg-{i}",
+            "name": f"Package {i}",
+            "destination": f"City {i}",
+            "continent": CONTINENTS[i % len(CONTINENTS)],
+            "description": f"{description} number {i}",
+            "price": f"${500 + 100 * i}",
+            "duration": f"{3 + i % 5} days",
+            "activities": [{"name": "Snorkeling" if i % 2 else "Hiking"}],
+        }
+        for i in range(count)
+    ]
+
+
+class OptimizedVectorStoreTests:
+    """Update, removal, compaction and persistence checks, run for each index type below."""
+
+    index_type = None
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_path = str(Path(self.temp_dir) / "store.pkl")
+        # Compaction is triggered explicitly, never from a background thread
+        self.index_config = dict(Config.VECTOR_INDEX, type=self.index_type, compaction_threshold=1e9)
+        self.store = self.open_store()
+        self.documents = make_documents(12)
+        self.assertTrue(self.store.add_documents([dict(document) for document in self.documents]))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def open_store(self):
+        return OptimizedVectorStore(store_path=self.store_path, ollama_client=StubEmbedder(),
+                                    index_config=self.index_config)
+
+    def search_all(self, store, document):
+        """Search with the text a document was embedded from, returning every live result."""
+        return store.similarity_search(store.generate_text_representation(document), k=len(store.documents))
+
+    def assert_current_vectors(self, store, results):
+        """Each result must score against the vector currently stored for its document."""
+        query = StubEmbedder().embed_batch([self.query])[0]
+        for document, score in results:
+            row = store.document_ids[document["id"]]
+            self.assertAlmostEqual(score, float(store.vectors[row] @ query), places=4)
+
+    def assert_aligned(self, store):
+        """Rows of documents, vectors, labels and metadata columns must describe the same documents."""
+        rows = len(store.documents)
+        self.assertEqual(len(store.vectors), rows)
+        self.assertEqual(len(store.labels), rows)
+        self.assertEqual(len(store.metadata), rows)
+        self.assertEqual(store.label_rows, {int(label): row for row, label in enumerate(store.labels)
+                                            if store.documents[row] is not None})
+        self.assertEqual(store.document_ids, {document["id"]: row for row, document in enumerate(store.documents)
+                                              if document is not None})
+
+        # Removed rows are masked by present; the other columns only matter for live rows
+        expected = MetadataColumns.from_documents(store.documents)
+        np.testing.assert_array_equal(store.metadata.present, expected.present)
+        live = np.flatnonzero(expected.present)
+        for field, codes in store.metadata.codes.items():
+            values = {code: value for value, code in store.metadata.vocab[field].items()}
+            expected_values = {code: value for value, code in expected.vocab[field].items()}
+            self.assertEqual([values.get(code) for code in codes[live].tolist()],
+                             [expected_values.get(code) for code in expected.codes[field][live].tolist()])
+        for field, numbers in store.metadata.numbers.items():
+            np.testing.assert_array_equal(numbers[live], expected.numbers[field][live])
+        self.assertEqual(store.metadata.row_tags, expected.row_tags)
+
+        for document in store.get_documents():
+            row = store.document_ids[document["id"]]
+            self.assertEqual(int(np.argmax(store.vectors @ store.vectors[row])), row)
+
+    def test_updated_document_never_returns_old_vector(self):
+        old = self.store.documents[self.store.document_ids["pkg-3"]]
+        self.query = self.store.generate_text_representation(old)
+        self.assertAlmostEqual(self.search_all(self.store, old)[0][1], 1.0, places=4)
+
+        self.assertTrue(self.store.add_documents([dict(self.documents[3], description="A brand new itinerary")]))
+
+        results = self.search_all(self.store, old)
+        self.assertEqual(len(results), len(self.documents))
+        self.assertEqual(len({document["id"] for document, _ in results}), len(self.documents))
+        self.assert_current_vectors(self.store, results)
+        self.assertLess(dict((d["id"], s) for d, s in results)["pkg-3"], 0.99)
+
+    def test_removed_document_is_never_returned(self):
+        removed = self.store.documents[self.store.document_ids["pkg-5"]]
+        self.query = self.store.generate_text_representation(removed)
+        self.store.remove_document("pkg-5")
+
+        results = self.search_all(self.store, removed)
+        self.assertNotIn("pkg-5", [document["id"] for document, _ in results])
+        self.assertEqual(len(results), len(self.documents) - 1)
+        self.assertNotIn("pkg-5", [d["id"] for d, _ in self.store.keyword_search("number 5", k=20)])
+        self.assertNotIn("pkg-5", [d["id"] for d, _ in self.store.similarity_search(
+            self.query, k=20, filters={"continent": removed["continent"]})])
+
+        self.store.compact()
+        results = self.search_all(self.store, removed)
+        self.assertNotIn("pkg-5", [document["id"] for document, _ in results])
+        self.assert_current_vectors(self.store, results)
+
+    def test_compact_keeps_rows_aligned(self):
+        self.query = "Package 8"
+        self.store.remove_document("pkg-0")
+        self.store.remove_document("pkg-7")
+        self.assertTrue(self.store.add_documents([dict(self.documents[4], description="Changed"),
+                                                  *make_documents(14)[12:]]))
+        self.store.remove_document("pkg-12")
+
+        self.store.compact()
+
+        self.assertEqual(len(self.store.documents), len(self.documents) - 1)
+        self.assertNotIn(None, self.store.documents)
+        self.assertEqual(self.store.stale_labels, 0)
+        self.assert_aligned(self.store)
+        self.assertEqual(self.store.index.ntotal, len(self.store.documents))
+        self.assert_current_vectors(self.store, self.store.similarity_search(self.query, k=20))
+
+        asia = self.store.similarity_search(self.query, k=20, filters={"continent": "Asia"})
+        self.assertEqual(sorted(d["id"] for d, _ in asia),
+                         sorted(d["id"] for d in self.store.get_documents() if d["continent"] == "Asia"))
+
+    def test_save_load_round_trip_keeps_ids(self):
+        self.query = "Package 2"
+        self.assertTrue(self.store.add_documents([dict(self.documents[2], description="Changed")]))
+        self.store.remove_document("pkg-9")
+        self.assertTrue(self.store.save())
+
+        loaded = self.open_store()
+        self.assertEqual(loaded.document_ids, self.store.document_ids)
+        np.testing.assert_array_equal(loaded.labels, self.store.labels)
+        self.assertEqual(loaded.label_rows, self.store.label_rows)
+        self.assertEqual(loaded.next_label, self.store.next_label)
+        self.assertEqual(loaded.stale_labels, self.store.stale_labels)
+        self.assert_aligned(loaded)
+
+        expected = [(d["id"], round(s, 4)) for d, s in self.store.similarity_search(self.query, k=20)]
+        self.assertEqual([(d["id"], round(s, 4)) for d, s in loaded.similarity_search(self.query, k=20)], expected)
+
+        # Ids keep increasing after a reload, so no dead id comes back to life
+        self.assertTrue(loaded.add_documents([dict(self.documents[6], description="Changed again")]))
+        self.assertGreaterEqual(loaded.labels[loaded.document_ids["pkg-6"]], self.store.next_label)
+        results = loaded.similarity_search(self.query, k=20)
+        self.assertNotIn("pkg-9", [d["id"] for d, _ in results])
+        self.assert_current_vectors(loaded, results)
+
+
+class TestFlatIndex(OptimizedVectorStoreTests, unittest.TestCase):
+    index_type = "flat"
+
+
+class TestHNSWIndex(OptimizedVectorStoreTests, unittest.TestCase):
+    index_type = "hnsw"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#tests/test_rule_extractor.py
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.email_processing.extractor import EmailExtractor
+from src.email_processing.rule_extractor import RuleBasedExtractor, build_gazetteer
+
+DESTINATIONS = build_gazetteer([
+    {'destination': "Paris, France"},
+    {'destination': "Rome, Italy"},
+    {'destination': "New York City"},
+])
+
+
+class RecordingLLM:
+    """Answers extraction prompts with a fixed response and records them."""
+
+    def __init__(self, response=""):
+        self.response = response
+        self.prompts = []
+
+    def generate(self, prompt, system_prompt=None):
+        self.prompts.append(prompt)
+        return self.response
+
+
+class TestRuleBasedExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = RuleBasedExtractor(DESTINATIONS)
+
+    def test_complete_email(self):
+        fields = self.rules.extract("We'd love to visit Rome, Italy for 10 days. Our budget is $4,500. "
+                                    "There will be 3 of us, leaving June 12th.")
+        self.assertEqual(fields['destination'], ("Rome, Italy", 0.95))
+        self.assertEqual(fields['duration'], ("10 days", 0.9))
+        self.assertEqual(fields['budget'], ("$4500", 0.9))
+        self.assertEqual(fields['num_travelers'], ("3", 0.9))
+        self.assertEqual(fields['travel_date'][0], "June 12th")
+
+    def test_longest_destination_wins(self):
+        fields = self.rules.extract("A week in New York City please.")
+        self.assertEqual(fields['destination'], ("New York City", 0.95))
+        self.assertEqual(fields['duration'], ("7 days", 0.9))
+
+    def test_conflicting_destinations_are_not_confident(self):
+        destination, confidence = self.rules.extract("Paris or Rome, we can't decide.")['destination']
+        self.assertLess(confidence, 0.8)
+
+    def test_budget_keeps_currency(self):
+        self.assertEqual(self.rules.extract("Our budget is 4000 euros.")['budget'][0], "€4000")
+        self.assertEqual(self.rules.extract("We can spend £3k.")['budget'][0], "£3000")
+        self.assertEqual(self.rules.extract("Up to 2,500 USD.")['budget'][0], "$2500")
+
+    def test_per_person_budget_is_not_confident(self):
+        value, confidence = self.rules.extract("About $800 per person.")['budget']
+        self.assertEqual(value, "$800")
+        self.assertLess(confidence, 0.8)
+
+    def test_couple_and_solo_travelers(self):
+        self.assertEqual(self.rules.extract("My wife and I want to travel.")['num_travelers'][0], "2")
+        self.assertEqual(self.rules.extract("I'm travelling solo.")['num_travelers'][0], "1")
+
+    def test_may_alone_is_not_a_date(self):
+        self.assertNotIn('travel_date', self.rules.extract("We may go to Paris."))
+
+    def test_mentioned_fields(self):
+        mentioned = self.rules.mentioned_fields("I have a nut allergy and need a wheelchair-accessible hotel. "
+                                                "A direct flight would be great.")
+        self.assertEqual(mentioned, {'allergy', 'hotel_pref', 'optional_details', 'flight_pref'})
+        self.assertEqual(self.rules.mentioned_fields("Paris for 5 days, $3000, 2 people."), set())
+
+
+class TestFastPathDecision(unittest.TestCase):
+
+    def setUp(self):
+        self.llm = RecordingLLM()
+        self.extractor = EmailExtractor(ollama_client=self.llm, known_destinations=DESTINATIONS)
+
+    def test_llm_skipped_when_nothing_else_is_mentioned(self):
+        result = self.extractor.extract_from_email("Paris for 5 days, budget $3000, 2 people.")
+        self.assertEqual(self.llm.prompts, [])
+        self.assertEqual(result['destination'], "Paris")
+        self.assertEqual(result['travelers'], "2")
+        self.assertEqual(self.extractor.get_statistics()['resolved_without_llm'], 1)
+
+    def test_llm_asked_for_details_rules_cannot_extract(self):
+        self.llm.response = ("allergy: nuts\n"
+                             "hotel_pref: wheelchair-accessible hotel\n"
+                             "optional_details: wheelchair access")
+        result = self.extractor.extract_from_email(
+            "Paris for 5 days, budget $3000, 2 people. I have a nut allergy and need a wheelchair-accessible hotel.")
+        self.assertEqual(len(self.llm.prompts), 1)
+        prompt = self.llm.prompts[0]
+        for field in ('allergy', 'hotel_pref', 'flight_pref', 'optional_details', 'travel_date'):
+            self.assertIn(f"{field}:", prompt)
+        # Confidently resolved fields are not asked for again
+        self.assertNotIn("destination:", prompt)
+        self.assertEqual(result['allergy'], "nuts")
+        self.assertEqual(result['hotel_pref'], "wheelchair-accessible hotel")
+        self.assertEqual(result['destination'], "Paris")
+        self.assertEqual(self.extractor.get_statistics()['resolved_without_llm'], 0)
+
+    def test_llm_asked_when_a_required_field_is_missing(self):
+        self.extractor.extract_from_email("Paris for 5 days please.")
+        self.assertEqual(len(self.llm.prompts), 1)
+        self.assertIn("budget:", self.llm.prompts[0])
+
+    def test_llm_value_wins_over_weak_rule_match(self):
+        self.llm.response = "destination: Rome"
+        result = self.extractor.extract_from_email("Paris or Rome for 5 days, $3000, 2 people.")
+        self.assertEqual(result['destination'], "Rome")
+
+
+if __name__ == "__main__":
+    unittest.main()